@@ -1,7 +1,7 @@
 import sys 
 
 from .classes import input_class
-from .functions import general, translate, rotate, create_geom, various, rdkit_module, output
+from .functions import general, output
 
 
 #                    ██████╗ ███████╗ ██████╗ ███╗   ███╗     ██████╗ ██████╗ ██████╗ ███████╗                
@@ -30,16 +30,23 @@ def main():
         inp = input_class.input_class()
         general.read_command_line(sys.argv, inp)
 
-        # Select and execute the appropriate task
+        # Select and execute the appropriate task. Task modules are imported here, and the
+        # heavy backends (gmsh, ASE, RDKit, py3Dmol, matplotlib) inside the functions that use
+        # them, so each run only loads what its task needs
         if inp.translate:
+            from .functions import translate
             translate.select_case(inp)
         elif inp.rotate:
+            from .functions import rotate
             rotate.select_case(inp)
         elif inp.create_geom:
+            from .functions import create_geom
             create_geom.select_case(inp)
         elif inp.small_tasks:
+            from .functions import various
             various.select_case(inp)
         elif inp.rdkit:
+            from .functions import rdkit_module
             rdkit_module.select_case(inp) 
         else:
             output.error("No valid task specified. Use -h for help.")
@@ -59,7 +59,8 @@ class input_class:
       self.rdkit_max_iters = 200
       self.rdkit_confs = 50
    
-      self.rdkit_confs_prune_rms = 0.30      
+      self.rdkit_confs_prune_rms = 0.30
+      self.rdkit_confs_traj = False      
 
       # -- Small tasks
       self.small_tasks = False
@@ -69,6 +70,8 @@ class input_class:
       self.translate_controlled_distance = False
       self.translate_1 = False
       self.translate_center = False
+      self.translate_scan = False
+      self.translate_place = False
      
       self.move_geom_to_000   = False
       self.move_geom_1_to_000 = False
@@ -90,6 +93,10 @@ class input_class:
       self.direction = 1.0
       self.dimer_distance = 0.0
 
+      self.place_grid   = []
+      self.place_target = 0.0
+      self.place_cutoff = 0.0
+
       # -- Minimum distance
       self.min_dist = False
       
@@ -97,6 +104,11 @@ class input_class:
       self.rotate = False
       self.rotate_angles = False
       self.rotate_1      = False
+      self.rotate_scan   = False
+      self.rotate_min_dist = False
+
+      self.scan_axes = ''
+      self.n_procs   = 1
 
       self.angles = []
 
@@ -111,11 +123,19 @@ class input_class:
       # -- Specular geometry
       self.geom_specular = False
 
+      # -- XYZ <-> .geomb conversion
+      self.convert = False
+      self.convert_precision = 'float64'
+
+      # -- Bulk lattice cache
+      self.cache = False
+      self.cache_task = ''
+
       # -- Generate structure geometry
       self.create_dimer = False
       self.create_bowtie = False
       self.create_geom = False
-      self.create_ase_bulk = False
+      self.create_bulk = False
       self.gen_3d_mesh = False
       self.gen_3d_mesh_sphere = False
       self.gen_3d_mesh_rod = False
@@ -161,13 +181,17 @@ class input_class:
       self.radius     = 0.0
       self.radius_in  = 0.0
       self.radius_out = 0.0
+      self.sweep_radii = []
       self.X_length = 0.0
       self.Y_length = 0.0
       self.sphere_center = [0.0,0.0,0.0]
 
       self.xyz_output = ''
+      self.mol_output = None
       self.mesh_output = ''
       self.tmp_folder = ''
+      self.bulk_atoms = []
+      self.bulk_xyz = None
       self.alloy_string = ''
       self.atomtype = ''
       self.atomtype_in = ''
@@ -212,53 +236,86 @@ class input_class:
          general.check_file_exists(self.geom1_file)
          general.check_file_exists(self.geom2_file)
 
-         general.check_file_extension(self.geom1_file,'.xyz')
-         general.check_file_extension(self.geom2_file,'.xyz')
+         general.check_geom_file_extension(self.geom1_file)
+         general.check_geom_file_extension(self.geom2_file)
 
-         general.check_dir_axis(self)
+         general.check_dir_axis(self, allow_vector=True)
+
+      elif (self.translate_place):
+         general.check_file_exists(self.geom1_file)
+         general.check_file_exists(self.geom2_file)
+
+         general.check_geom_file_extension(self.geom1_file)
+         general.check_geom_file_extension(self.geom2_file)
+
+         if (self.place_target < 0.0 or self.place_cutoff < 0.0): output.error('The target gap and the contact cutoff must be positive.')
+         if (self.n_procs < 1): output.error('The number of processes must be at least 1.')
 
       elif (self.translate_1):
          general.check_file_exists(self.geom_file)
-         general.check_file_extension(self.geom_file,'.xyz')
+         general.check_geom_file_extension(self.geom_file)
 
-         general.check_dir_axis(self)
+         general.check_dir_axis(self, allow_vector=True)
 
       elif (self.rotate_angles):
          general.check_file_exists(self.angles_input)
          self.read_input(what='angles')
 
          general.check_file_exists(self.geom_file)
-         general.check_file_extension(self.geom_file,'.xyz')
+         general.check_geom_file_extension(self.geom_file)
 
-         general.check_dir_axis(self)
+         general.check_dir_axis(self, allow_vector=True)
+
+      elif (self.rotate_min_dist):
+         general.check_file_exists(self.angles_input)
+         self.read_input(what='angles')
+
+         general.check_file_exists(self.geom1_file)
+         general.check_file_exists(self.geom2_file)
+
+         general.check_geom_file_extension(self.geom1_file)
+         general.check_geom_file_extension(self.geom2_file)
+
+         if (not 1 <= len(self.scan_axes) <= 3 or
+             len(set(self.scan_axes)) != len(self.scan_axes) or
+             not set(self.scan_axes) <= set('xyz')): output.error(f'Invalid scan axes "{self.scan_axes}": use 1 to 3 of x, y, z (e.g. "xz").')
+
+         if (self.n_procs < 1): output.error('The number of processes must be at least 1.')
 
       elif (self.rotate_1):
          general.check_file_exists(self.geom_file)
-         general.check_file_extension(self.geom_file,'.xyz')
+         general.check_geom_file_extension(self.geom_file)
 
-         general.check_dir_axis(self)
+         general.check_dir_axis(self, allow_vector=True)
 
       elif (self.min_dist):
          general.check_file_exists(self.geom1_file)
          general.check_file_exists(self.geom2_file)
 
-         general.check_file_extension(self.geom1_file,'.xyz')
-         general.check_file_extension(self.geom2_file,'.xyz')
+         general.check_geom_file_extension(self.geom1_file)
+         general.check_geom_file_extension(self.geom2_file)
 
       elif (self.merge):
          general.check_file_exists(self.geom1_file)
          general.check_file_exists(self.geom2_file)
 
-         general.check_file_extension(self.geom1_file,'.xyz')
-         general.check_file_extension(self.geom2_file,'.xyz')
+         general.check_geom_file_extension(self.geom1_file)
+         general.check_geom_file_extension(self.geom2_file)
 
       elif (self.geom_center):
          general.check_file_exists(self.geom_file)
-         general.check_file_extension(self.geom_file,'.xyz')
+         general.check_geom_file_extension(self.geom_file)
 
       elif (self.geom_specular):
          general.check_file_exists(self.geom_file)
-         general.check_file_extension(self.geom_file,'.xyz')
+         general.check_geom_file_extension(self.geom_file)
+
+      elif (self.convert):
+         general.check_file_exists(self.geom_file)
+         general.check_geom_file_extension(self.geom_file)
+
+      elif (self.cache):
+         general.check_accepted_parameters(self.cache_task, ['stats', 'clear'], label='Cache task')
 
       elif (self.rdkit):
          general.check_file_exists(self.rdkit_mol_file)
@@ -295,9 +352,7 @@ class input_class:
              not self.gen_pencil            and
              not self.gen_pentbipyramid): output.error("Create geom option not recognised.")
 
-         if self.create_ase_bulk:
-            general.check_file_exists(self.geom_file)
-            general.check_file_extension(self.geom_file,'.xyz')
+         if self.create_bulk and self.bulk_xyz is None: output.error("Bulk lattice was not generated.")
 
 
    # ------------------------------------------- #
@@ -1,11 +1,88 @@
+import os
 import numpy as np
 import random
 
 from geom.classes import parameters
+from geom.classes import spatial_index
+from geom.classes import shape
 
-from geom.functions import output
-from ase.cluster import Icosahedron, Octahedron, Decahedron
+from geom.functions import output, xyz_io, geomb_io
 
+# Element table shared by all molecules: atoms are stored as codes into it. It starts
+# with the metals of `parameters` (as typed in the command line and capitalized, as in
+# XYZ files) and grows with any other label the first time it is seen.
+ELEMENT_DTYPE = np.uint16
+
+_elements      = []
+_element_codes = {}
+_element_array = np.empty(0, dtype=object)
+
+# -------------------------------------------------------------------------------------
+def register_elements(labels):
+   """
+   Adds new atom labels to the element table.
+
+   Args:
+       labels (iterable[str]): Atom labels; those already in the table are skipped.
+
+   Returns:
+       None
+   """
+
+   global _element_array
+
+   new_labels = [label for label in dict.fromkeys(labels) if label not in _element_codes]
+   if not new_labels: return
+
+   if len(_elements) + len(new_labels) > np.iinfo(ELEMENT_DTYPE).max + 1:
+      output.error('Too many different atom labels.')
+
+   for label in new_labels:
+      _element_codes[label] = len(_elements)
+      _elements.append(label)
+
+   _element_array = np.array(_elements, dtype=object)
+# -------------------------------------------------------------------------------------
+def element_code(label):
+   """
+   Code of one atom label in the element table.
+   """
+
+   if label not in _element_codes: register_elements([label])
+
+   return _element_codes[label]
+# -------------------------------------------------------------------------------------
+def element_codes(labels):
+   """
+   Codes of a sequence of atom labels.
+
+   Args:
+       labels (iterable[str]): Atom labels.
+
+   Returns:
+       numpy.ndarray: Element codes (N,) of dtype `ELEMENT_DTYPE`.
+   """
+
+   labels = list(labels)
+   register_elements(set(labels))
+
+   return np.fromiter(map(_element_codes.__getitem__, labels), dtype=ELEMENT_DTYPE, count=len(labels))
+# -------------------------------------------------------------------------------------
+def element_labels(codes):
+   """
+   Atom labels of an array of element codes.
+
+   Args:
+       codes (numpy.ndarray): Element codes.
+
+   Returns:
+       numpy.ndarray: Labels as an object array with the shape of `codes`.
+   """
+
+   return _element_array[codes]
+# -------------------------------------------------------------------------------------
+register_elements([label for atomtype in parameters.parameters().metal_atomtypes for label in (atomtype, atomtype.capitalize())])
+# -------------------------------------------------------------------------------------
 class molecule:
    """
    Represents a molecular system and provides methods for geometry transformations, filtering, and nanostructure creation.
@@ -24,39 +101,162 @@ class molecule:
        - `classes.parameters`: Provides lattice constants and structural parameters.
 
    Attributes:
-       atoms (list[str]): List of atom types in the molecule.
+       codes (numpy.ndarray): Element code of every atom (see `element_codes`).
+       atoms (list[str]): List of atom types in the molecule (view of `codes`; assigning
+           a list re-encodes it).
        nAtoms (int): Number of atoms in the molecule.
-       xyz_center (numpy.ndarray): Coordinates of the geometrical center.
-       xyz_min (numpy.ndarray): Minimum coordinate values along each axis.
-       xyz_max (numpy.ndarray): Maximum coordinate values along each axis.
+       xyz (numpy.ndarray): 3×N array of atomic coordinates.
+       xyz_center (numpy.ndarray): Coordinates of the geometrical center (read-only, lazy).
+       xyz_min (numpy.ndarray): Minimum coordinate values along each axis (read-only, lazy).
+       xyz_max (numpy.ndarray): Maximum coordinate values along each axis (read-only, lazy).
+       version (int): Counter bumped on every change of the coordinates.
+       xyz_index (spatial_index): Cached spatial index of the coordinates (built on demand).
+       regions (numpy.ndarray): Region ID of every atom of a layered particle (0 = core,
+           1 = first shell, ...), or None.
+
+   Notes:
+       - Atom types are a structure-of-arrays element-code column rather than a list of
+         strings, so filters and merges are fancy indexing and the class uses `__slots__`.
+       - The center and the coordinate limits are reduced from `xyz` on first access and
+         cached until `version` changes. Assigning `xyz` bumps the version; code editing
+         `xyz` in place must call `mark_modified`.
    """
 
+   __slots__ = ('codes', 'nAtoms', '_xyz', '_version', '_derived', 'xyz_index', 'regions')
+
    def __init__(self):
       """
       Initializes a molecule object with default attributes.
 
       Attributes Initialized:
-          - `atoms` (list[str]): List to store atom types.
+          - `codes` (numpy.ndarray): Element codes of the atoms.
           - `nAtoms` (int): Number of atoms in the molecule.
           - `xyz` (numpy.ndarray): 3×N array storing atomic coordinates.
-          - `xyz_center` (numpy.ndarray): Coordinates of the geometrical center.
-          - `xyz_min` (numpy.ndarray): Minimum coordinate values along each axis.
-          - `xyz_max` (numpy.ndarray): Maximum coordinate values along each axis.
+          - `xyz_index` (spatial_index): Cached spatial index, None until requested.
+          - `regions` (numpy.ndarray): Region IDs, None unless set by `filter_xyz_in_regions`.
 
       Notes:
-          - `xyz_center`, `xyz_min`, and `xyz_max` are initialized as zero arrays.
+          - `xyz_center`, `xyz_min`, and `xyz_max` are zero arrays while there are no atoms.
           - The molecule object is updated when geometry is read from an XYZ file.
       """
        
-      self.atoms = []
+      self.codes = np.zeros(0, dtype=ELEMENT_DTYPE)
 
       self.nAtoms = 0
 
+      self._version = 0
+      self._derived = {}
+
       self.xyz = np.zeros((3,self.nAtoms))
- 
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
+
+      self.xyz_index = None
+
+      self.regions = None
+
+   # --------------------------------- #
+   # ------- Atom labels (view) ------- #
+
+   @property
+   def atoms(self):
+      """
+      Atom labels as a list (built from `codes`; edit `codes` for in-place changes).
+      """
+
+      return element_labels(self.codes).tolist()
+
+   @atoms.setter
+   def atoms(self, atoms):
+      self.codes = element_codes(atoms)
+
+   @staticmethod
+   def element_table():
+      """
+      Labels of the element table, indexed by code.
+      """
+
+      return list(_elements)
+
+   # -------------------------------------------------- #
+   # ------- Coordinates and derived properties ------- #
+
+   @property
+   def xyz(self):
+      """
+      Atomic coordinates with shape (3, N).
+      """
+
+      return self._xyz
+
+   @xyz.setter
+   def xyz(self, xyz):
+      self._xyz = xyz
+      self.mark_modified()
+
+   @property
+   def version(self):
+      """
+      Coordinate version, bumped by every assignment of `xyz` and by `mark_modified`.
+      """
+
+      return self._version
+
+   def mark_modified(self):
+      """
+      Invalidates the cached center and coordinate limits after an in-place change of `xyz`.
+
+      Returns:
+          None
+      """
+
+      self._version += 1
+
+   def derived(self, name, reduction):
+      """
+      Returns a per-axis reduction of the coordinates, cached for the current version.
+
+      Args:
+          name (str): Cache key.
+          reduction (callable): NumPy reduction taking an `axis` argument (e.g. `np.mean`).
+
+      Returns:
+          numpy.ndarray: Read-only (3,) array; zeros for an empty geometry.
+      """
+
+      cached = self._derived.get(name)
+
+      if cached is None or cached[0] != self._version:
+         if self._xyz.shape[1] == 0:
+            value = np.zeros(3)
+         else:
+            value = np.array(reduction(self._xyz, axis=1), dtype=float)
+         value.flags.writeable = False
+         cached = self._derived[name] = (self._version, value)
+
+      return cached[1]
+
+   @property
+   def xyz_center(self):
+      """
+      Geometrical center of the coordinates (3,).
+      """
+
+      return self.derived('center', np.mean)
+
+   @property
+   def xyz_min(self):
+      """
+      Minimum coordinate values along each axis (3,).
+      """
+
+      return self.derived('min', np.min)
+
+   @property
+   def xyz_max(self):
+      """
+      Maximum coordinate values along each axis (3,).
+      """
+
+      return self.derived('max', np.max)
 
    # ----------------------------------------- #
    # ------- Translate geometry to 000 ------- #
@@ -69,71 +269,101 @@ class molecule:
           None: Updates the molecule's atomic coordinates in place.
       """
 
-      for i in range(self.nAtoms):
-         self.xyz[0][i] = self.xyz[0][i] - self.xyz_center[0] 
-         self.xyz[1][i] = self.xyz[1][i] - self.xyz_center[1]
-         self.xyz[2][i] = self.xyz[2][i] - self.xyz_center[2]
+      self.xyz -= self.xyz_center[:, np.newaxis]
 
    # ----------------------------- #
    # ------- Read geometry ------- #
    
    def read_geom(self, geom_file, translate_geom_to_000):
       """
-      Reads an XYZ file and stores atomic coordinates.
+      Reads an XYZ (or binary `.geomb`) file and stores atomic coordinates.
   
       Args:
-          geom_file (str): Path to the XYZ file containing the molecular geometry.
+          geom_file (str): Path to the XYZ or `.geomb` file containing the molecular geometry.
           translate_geom_to_000 (bool): If True, translates the molecular geometry to the origin.
   
       Returns:
           molecule: The molecule object with updated atomic coordinates.
   
       Notes:
-          - Computes the geometrical center of the structure.
-          - Stores the minimum and maximum coordinates for bounding box calculations.
+          - The geometrical center and the bounding box are computed on first access.
           - Can output a translated structure if `translate_geom_to_000` is set to True.
+          - The atom block is parsed in one pass by `xyz_io.read_xyz`.
+          - `.geomb` coordinates are memory-mapped copy-on-write (`geomb_io.read_geomb`):
+            they are read from disk on access and changes never reach the file.
       """
 
-      with open(geom_file, 'r') as infile:
-         self.nAtoms = int(infile.readline())
-         infile.readline()
-       
-         if self.nAtoms <= 0: output.error('Corrupt geometry file "' + geom_file + '"')
-    
-         self.atoms = []
-         self.xyz = np.zeros((3,self.nAtoms))
-       
-         i = 0
-         for line in infile:
-            line = line.split()
-
-            self.atoms.append(line[0])
-            self.xyz[0][i] = float(line[1])
-            self.xyz[1][i] = float(line[2])
-            self.xyz[2][i] = float(line[3])
+      try:
+         if geom_file.endswith('.geomb'):
+            symbols, codes, self.xyz, _ = geomb_io.read_geomb_codes(geom_file)
+            self.codes = element_codes(symbols)[codes]
+         else:
+            self.atoms, self.xyz = xyz_io.read_xyz(geom_file)
+      except ValueError:
+         output.error('Corrupt geometry file "' + geom_file + '"')
 
-            i += 1
-
-            if i > self.nAtoms: output.error('Corrupt geometry file "' + geom_file + '"')
-
-      # Calculate geometrical center
-      self.xyz_center[0] = np.mean(self.xyz[0,:]) 
-      self.xyz_center[1] = np.mean(self.xyz[1,:]) 
-      self.xyz_center[2] = np.mean(self.xyz[2,:]) 
+      self.nAtoms = len(self.codes)
+      self.xyz_index = None
 
       # Translate geometrical center to 000 and save, if requested  
       if (translate_geom_to_000):
          self.trans_geom_center_to_000()
-         output.print_geom(self,geom_file[:-4]+'_000')
+         stem = geom_file[:-3] if geom_file.endswith(('.gz', '.xz')) else geom_file
+         output.print_geom(self,os.path.splitext(stem)[0]+'_000')
+
+      return(self)
+
+
+   # ------------------------------------------------ #
+   # ------- Read frames of a multi-frame XYZ ------- #
+
+   @staticmethod
+   def read_frames(geom_file):
+      """
+      Lazily reads the frames of a multi-frame XYZ file (e.g. a rotation or distance scan).
 
-      # Save maximun/minimum coordinates limits
-      self.xyz_max[0] = np.max(self.xyz[0,:])
-      self.xyz_max[1] = np.max(self.xyz[1,:])
-      self.xyz_max[2] = np.max(self.xyz[2,:])
+      Args:
+          geom_file (str): Path to the XYZ file.
+
+      Yields:
+          molecule: One molecule per frame.
 
-      self.xyz_min[0] = np.min(self.xyz[0,:])
-      self.xyz_min[1] = np.min(self.xyz[1,:])
-      self.xyz_min[2] = np.min(self.xyz[2,:])
+      Notes:
+          - Frames are parsed one at a time by `xyz_io.iter_xyz`, so memory use does not
+            grow with the number of frames.
+      """
+
+      try:
+         for atoms, xyz, comment in xyz_io.iter_xyz(geom_file):
+            yield molecule().set_geom(atoms, xyz)
+      except ValueError:
+         output.error('Corrupt geometry file "' + geom_file + '"')
+
+
+   # ------------------------------------------ #
+   # ------- Set geometry from memory ------- #
+
+   def set_geom(self, atoms, xyz):
+      """
+      Stores atomic labels and coordinates already held in memory (e.g., a generated bulk).
+
+      Args:
+          atoms (list[str]): Atomic labels.
+          xyz (np.ndarray): Atomic coordinates with shape (3, N). A copy is stored.
+
+      Returns:
+          molecule: The molecule object with updated atomic coordinates.
+
+      Notes:
+          - The center and coordinate limits are computed lazily, as in `read_geom`.
+      """
+
+      self.nAtoms = len(atoms)
+      if self.nAtoms <= 0: output.error('Empty geometry')
+
+      self.atoms = atoms
+      self.xyz   = np.array(xyz, dtype=float, order='C')
+      self.xyz_index = None
 
       return(self)
 
@@ -155,7 +385,7 @@ class molecule:
           - This function is mainly used in core-shell structure creation.
       """
 
-      self.atoms = [new_atomtype] * self.nAtoms
+      self.codes = np.full(self.nAtoms, element_code(new_atomtype), dtype=ELEMENT_DTYPE)
        
       return(self)
 
@@ -191,14 +421,10 @@ class molecule:
       self.xyz = self.xyz[:, keep_atoms]
       self.nAtoms = len(keep_atoms)
 
-      if len(self.atoms) == len(xyz_rows):
-         self.atoms = [self.atoms[i] for i in keep_atoms]
+      if len(self.codes) == len(xyz_rows):
+         self.codes = self.codes[keep_atoms]
       else:
-         self.atoms = self.atoms[:self.nAtoms]
-
-      self.xyz_center = np.mean(self.xyz, axis=1)
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
+         self.codes = self.codes[:self.nAtoms]
 
       return(self)
 
@@ -219,15 +445,90 @@ class molecule:
   
       Notes:
           - Positive and negative direction factors determine the translation axis.
+          - Cached coordinate limits are shifted rather than recomputed: rounding is
+            monotonic, so they equal the limits of the translated coordinates exactly.
       """
 
-      for i in range(self.nAtoms):
-         self.xyz[0,i] = self.xyz[0,i] + dir_factor[0] * shift  
-         self.xyz[1,i] = self.xyz[1,i] + dir_factor[1] * shift 
-         self.xyz[2,i] = self.xyz[2,i] + dir_factor[2] * shift 
+      vector = np.array([dir_factor[0] * shift, dir_factor[1] * shift, dir_factor[2] * shift])
+
+      bounds = {name: self._derived[name] for name in ('min', 'max')
+                if name in self._derived and self._derived[name][0] == self._version
+                and self._xyz.dtype == np.float64}
+
+      self.xyz += vector[:, np.newaxis]
+
+      for name, (_, value) in bounds.items():
+         value = value + vector
+         value.flags.writeable = False
+         self._derived[name] = (self._version, value)
+
+      # Keep the cached spatial index in sync without rebuilding it
+      if self.xyz_index is not None:
+         self.xyz_index.translate(vector)
    
       return(self)
 
+   # ----------------------------------------------------- #
+   # ------- Apply an affine transform to geometry ------- #
+
+   def transformed(self, affine, out=None):
+      """
+      Applies an affine transform (rotation, translation, reflection, ...) to the geometry.
+
+      Args:
+          affine (transform): Transform to apply (see `classes.transform`).
+          out (molecule, optional): Molecule receiving the result. Its coordinate buffer
+              is reused when it has the right shape; passing the molecule itself
+              transforms it in place. Defaults to a new molecule.
+
+      Returns:
+          molecule: The transformed molecule (`out` if given).
+
+      Notes:
+          - The coordinates are transformed in a single pass; only the element codes
+            and regions are copied, never the whole object.
+      """
+
+      if out is None: out = molecule()
+
+      buffer = None
+      if out is self:
+         buffer = self.xyz
+      elif out.xyz.shape == self.xyz.shape and out.xyz.dtype == np.float64 and out.xyz.flags.writeable:
+         buffer = out.xyz
+
+      if out is not self:
+         out.codes = self.codes.copy()
+         out.nAtoms = self.nAtoms
+         out.regions = None if self.regions is None else self.regions.copy()
+         out.xyz_index = None
+
+      out.xyz = affine.apply(self.xyz, buffer)
+
+      return(out)
+
+   # ----------------------------------------- #
+   # ------- Spatial index of geometry ------- #
+
+   def get_spatial_index(self):
+      """
+      Returns the spatial index of the current coordinates, building it if needed.
+
+      Returns:
+          spatial_index: Cell-grid index answering min-distance and nearest-neighbour queries.
+
+      Notes:
+          - The index is cached and reused while the coordinates are unchanged
+            (e.g. the fixed molecule of a controlled translation).
+          - `translate_geom` shifts the cached index; any other change of `xyz`
+            is detected and triggers a rebuild.
+      """
+
+      if self.xyz_index is None or not self.xyz_index.describes(self.xyz):
+         self.xyz_index = spatial_index.spatial_index(self.xyz)
+
+      return(self.xyz_index)
+
    # ----------------------------------------------------- #
    # ------- Slice Z coordinates below a threshold ------- #
 
@@ -262,16 +563,11 @@ class molecule:
       self.nAtoms = len(x_filtered)
       
       # If atoms list exists, filter it too
-      if hasattr(self, 'atoms') and self.atoms is not None and len(self.atoms) == len(x):
-          self.atoms = [self.atoms[i] for i in range(len(condition)) if condition[i]]
+      if len(self.codes) == len(x):
+          self.codes = self.codes[condition]
       else:
           # If no atom list exists, create a default one
-          self.atoms = [inp.atomtype] * self.nAtoms
-      
-      # Reinitialize arrays
-      self.xyz_center = np.zeros(3)
-      self.xyz_min = np.zeros(3)
-      self.xyz_max = np.zeros(3)
+          self.change_atomtype(inp.atomtype)
       
       # Update coordinates
       self.xyz = np.zeros((3, self.nAtoms))
@@ -279,13 +575,6 @@ class molecule:
       self.xyz[1, :] = y_filtered
       self.xyz[2, :] = z_filtered
       
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-      
-      # Save maximum/minimum coordinate limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-      
       return self
 
    # ------------------------------------------------ #
@@ -323,22 +612,11 @@ class molecule:
    
       # Update the atom list and geometry based on filtered data
       self.nAtoms = len(x_filtered)
-      self.atoms = [inp.atomtype] * self.nAtoms  # Atom types remain consistent
-   
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
+      self.change_atomtype(inp.atomtype)  # Atom types remain consistent
    
       self.xyz = np.zeros((3, self.nAtoms))
       self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
    
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-   
-      # Save maximum/minimum coordinate limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-   
       return self
 
    # ---------------------------------------------- #
@@ -369,22 +647,11 @@ class molecule:
    
       # Update the atom list and geometry based on filtered data
       self.nAtoms = len(x_filtered)
-      self.atoms = [inp.atomtype] * self.nAtoms  # Atom types remain consistent
-   
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
+      self.change_atomtype(inp.atomtype)  # Atom types remain consistent
    
       self.xyz = np.zeros((3, self.nAtoms))
       self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
    
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-   
-      # Save maximum/minimum coordinate limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-   
       return self
 
    # ---------------------------------------------- #
@@ -415,22 +682,11 @@ class molecule:
    
       # Update the atom list and geometry based on filtered data
       self.nAtoms = len(x_filtered)
-      self.atoms = [inp.atomtype] * self.nAtoms  # Atom types remain consistent
-   
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
+      self.change_atomtype(inp.atomtype)  # Atom types remain consistent
    
       self.xyz = np.zeros((3, self.nAtoms))
       self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
    
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-   
-      # Save maximum/minimum coordinate limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-   
       return self 
 
    # -------------------------------------------------- #
@@ -478,22 +734,11 @@ class molecule:
    
       # Update the atom list and geometry based on filtered data
       self.nAtoms = len(x_filtered)
-      self.atoms = [inp.atomtype] * self.nAtoms  # Atom types remain consistent
-   
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
+      self.change_atomtype(inp.atomtype)  # Atom types remain consistent
    
       self.xyz = np.zeros((3, self.nAtoms))
       self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
    
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-   
-      # Save maximum/minimum coordinate limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-   
       return self
 
 
@@ -515,56 +760,179 @@ class molecule:
           - If dangling atoms remain after 3 iterations, an error is raised.
       """
 
-      #debug
-      #print("  Removing dangling C atoms on generated structure...")
-      #print("")
-   
-      def get_neighbors(atom_index, cutoff=1.5):
-          """Find neighbors of an atom within a distance cutoff."""
-          distances = np.linalg.norm(self.xyz.T - self.xyz.T[atom_index], axis=1)
-          neighbors = np.where((distances > 0) & (distances <= cutoff))[0]
-          return neighbors
-   
       max_iterations = 3
-      for iteration in range(max_iterations):
-          dangling_atoms = []
-          for i in range(self.nAtoms):
-              neighbors = get_neighbors(i)
-              if len(neighbors) < 2:  # Dangling bond if fewer than 2 neighbors
-                  dangling_atoms.append(i)
-   
-          # If no dangling atoms are found, exit the loop
-          if not dangling_atoms:
-              #debug
-              #print("")
-              #print(f"  --> All dangling bonds removed after {iteration + 1} iteration(s).")
-              return self
+
+      n_dangling = self.remove_undercoordinated_atoms(cutoff=1.5, min_neighbors=2, max_iterations=max_iterations)
+
+      if n_dangling > 0:
+          output.error(f"{n_dangling} dangling bonds on generated graphene sheet could not be eliminated after {max_iterations} iterations.")
    
-          # Remove dangling atoms
-          keep_atoms = np.setdiff1d(np.arange(self.nAtoms), dangling_atoms)
+      return self
+
+   # ------------------------------------------------------ #
+   # ------- Neighbor list within a cutoff distance ------- #
+
+   def get_neighbor_list(self, cutoff):
+      """
+      Builds the neighbor list of every atom within a cutoff distance.
+
+      Args:
+          cutoff (float): Neighbor cutoff distance in Angstroms.
+
+      Returns:
+          tuple:
+              - numpy.ndarray: Offsets (nAtoms + 1,); the neighbors of atom i are
+                `indices[indptr[i]:indptr[i+1]]`.
+              - numpy.ndarray: Neighbor atom indices.
+
+      Notes:
+          - Two atoms are neighbors if 0 < distance <= cutoff (coincident atoms are not counted).
+          - All pairs are found in one vectorized pass over the spatial index.
+      """
+
+      q, i, d = self.get_spatial_index().pairs_within(self.xyz, cutoff)
+
+      neighbor = d > 0
+      q, i = q[neighbor], i[neighbor]
+
+      indptr = np.zeros(self.nAtoms + 1, dtype=np.int64)
+      indptr[1:] = np.cumsum(np.bincount(q, minlength=self.nAtoms))
+
+      return(indptr, i)
+
+   # ---------------------------------------------- #
+   # ------- Remove under-coordinated atoms ------- #
+
+   def remove_undercoordinated_atoms(self, cutoff, min_neighbors, max_iterations):
+      """
+      Iteratively removes atoms with fewer than `min_neighbors` neighbors.
+  
+      Args:
+          cutoff (float): Neighbor cutoff distance in Angstroms.
+          min_neighbors (int): Minimum number of neighbors an atom must keep.
+          max_iterations (int): Maximum number of removal passes.
+  
+      Returns:
+          int: Number of under-coordinated atoms left after `max_iterations` passes.
+  
+      Notes:
+          - The neighbor list is built once; removing atoms only decrements the
+            coordination numbers of their neighbors, so each pass is O(removed atoms).
+          - Every pass removes all atoms that are under-coordinated at its start,
+            exactly as recomputing the neighbors from scratch would.
+      """
+
+      indptr, indices = self.get_neighbor_list(cutoff)
+      coordination = np.diff(indptr)
+      alive = np.ones(self.nAtoms, dtype=bool)
+
+      for iteration in range(max_iterations):
+          dangling_atoms = np.flatnonzero(alive & (coordination < min_neighbors))
+
+          if len(dangling_atoms) == 0: break
+
+          # Remove dangling atoms and update the coordination of their neighbors
+          alive[dangling_atoms] = False
+          counts = indptr[dangling_atoms + 1] - indptr[dangling_atoms]
+          offsets = np.repeat(np.cumsum(counts) - counts, counts)
+          neighbors = indices[np.repeat(indptr[dangling_atoms], counts) + np.arange(offsets.size) - offsets]
+          coordination -= np.bincount(neighbors, minlength=self.nAtoms)
+
+      n_dangling = np.count_nonzero(alive & (coordination < min_neighbors))
+
+      if not np.all(alive):
+          keep_atoms = np.flatnonzero(alive)
           self.xyz = self.xyz[:, keep_atoms]
           self.nAtoms = len(keep_atoms)
-          self.atoms = [self.atoms[i] for i in keep_atoms]
-   
-          # Recalculate geometry
-          self.xyz_center = np.mean(self.xyz, axis=1)
-          self.xyz_max = np.max(self.xyz, axis=1)
-          self.xyz_min = np.min(self.xyz, axis=1)
-   
-          #debug
-          #print(f"  - Iteration {iteration + 1}: Removed {len(dangling_atoms)} dangling atom(s).")
-   
-      # If dangling bonds remain after 3 iterations, raise an error
-      dangling_atoms = []
-      for i in range(self.nAtoms):
-          neighbors = get_neighbors(i)
-          if len(neighbors) < 2:
-              dangling_atoms.append(i)
-   
-      if dangling_atoms:
-          output.error(f"{len(dangling_atoms)} dangling bonds on generated graphene sheet could not be eliminated after {max_iterations} iterations.")
-   
-      return self
+          self.codes = self.codes[keep_atoms]
+
+      return(n_dangling)
+
+
+   # ------------------------------------- #
+   # ------- Keep a subset of atoms ------- #
+
+   def keep_atoms(self, selection, atomtype):
+      """
+      Keeps only the selected atoms and relabels them.
+
+      Args:
+          selection (numpy.ndarray): Boolean mask (N,) or atom indices, in the order to keep.
+          atomtype (str): Atom type assigned to every kept atom.
+
+      Returns:
+          molecule: The molecule object with updated atomic coordinates.
+
+      Notes:
+          - The geometrical center and coordinate limits are recomputed on next access.
+      """
+
+      x_filtered = self.xyz[0, selection]
+      y_filtered = self.xyz[1, selection]
+      z_filtered = self.xyz[2, selection]
+
+      # Fill previous geometry with current structure
+      self.nAtoms = len(x_filtered)
+
+      self.change_atomtype(atomtype)
+
+      self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
+      self.xyz_index = None
+      self.regions = None
+
+      return(self)
+
+
+   # ----------------------------------------- #
+   # ------- Filter XYZ within a solid ------- #
+
+   def filter_xyz_in_shape(self, inp, solid):
+      """
+      Filters atoms in the molecular geometry, keeping only those inside a CSG solid.
+
+      Args:
+          inp (input_class): The input parameters containing the atomic type.
+          solid (shape): Constructive solid geometry expression (see `classes.shape`).
+
+      Returns:
+          molecule: The molecule object with updated atomic coordinates.
+
+      Notes:
+          - The whole expression is evaluated in one pass over the coordinates; atoms of
+            unions are ordered as if each operand had been filtered and merged in turn.
+      """
+
+      return(self.keep_atoms(solid.select(self.xyz), inp.atomtype))
+
+
+   # -------------------------------------------------------- #
+   # ------- Label core and shells of a layered solid ------- #
+
+   def filter_xyz_in_regions(self, solids, atomtypes):
+      """
+      Keeps the atoms of a layered particle and labels its core and shells in one pass.
+
+      Args:
+          solids (list[shape]): Nested solids from the core outwards; the last one is the
+              whole particle (see `shape.label_regions`).
+          atomtypes (list[str]): Atom type of every region.
+
+      Returns:
+          molecule: The molecule object with updated atomic coordinates and `regions`.
+
+      Notes:
+          - Atoms are ordered core first, then each shell, and every atom belongs to the
+            innermost solid containing it, so no deep copies or pairwise subtractions and
+            merges are needed.
+      """
+
+      selection, regions = shape.label_regions(self.xyz, solids)
+
+      self.keep_atoms(selection, atomtypes[0])
+      self.codes = element_codes(atomtypes)[regions]
+      self.regions = regions
+
+      return(self)
 
 
    # ---------------------------------------- #
@@ -586,40 +954,10 @@ class molecule:
           - This function is commonly used to create spherical nanoparticles.
       """
 
-      x = self.xyz[0, :]
-      y = self.xyz[1, :]
-      z = self.xyz[2, :]
-      
       # Condition for points to be within the sphere 
-      condition = ((x-inp.sphere_center[0])**2 + 
-                   (y-inp.sphere_center[1])**2 + 
-                   (z-inp.sphere_center[2])**2 <= (inp.radius)**2)
-
-      x_filtered = self.xyz[0, condition]
-      y_filtered = self.xyz[1, condition]
-      z_filtered = self.xyz[2, condition]
-
-      # Fill previous geometry with current structure
-      self.nAtoms = len(x_filtered)
-
-      self.atoms = []
-      self.atoms = [inp.atomtype] * self.nAtoms
-
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
-
-      self.xyz = np.zeros((3,self.nAtoms))
-      self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
-
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
+      condition = shape.in_sphere(self.xyz, inp.sphere_center, inp.radius)
 
-      # Save maximum/minimum coordinates limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-
-      return(self)
+      return(self.keep_atoms(condition, inp.atomtype))
 
 
    # ------------------------------------------ #
@@ -641,10 +979,6 @@ class molecule:
           - Used for generating rod-like nanostructures, such as metallic nanorods.
       """
 
-      x = self.xyz[0, :]
-      y = self.xyz[1, :]
-      z = self.xyz[2, :]
-       
       # Compute base radius from the rod width
       # and length subtracting the radius of the spheres at the extremes
       inp.sphere_center = [0.0,0.0,0.0]
@@ -652,52 +986,9 @@ class molecule:
       length = inp.rod_length - inp.rod_width 
 
       # Condition for points to be within the cylinder 
-      if inp.main_axis == "x":
-        condition = (
-            ((y - inp.sphere_center[1])**2 + (z - inp.sphere_center[2])**2 <= radius**2) &
-            (x >= inp.sphere_center[0] - length/2.0) &
-            (x <= inp.sphere_center[0] + length/2.0)
-        )
-
-      elif inp.main_axis == "y":
-          condition = (
-              ((x - inp.sphere_center[0])**2 + (z - inp.sphere_center[2])**2 <= radius**2) &
-              (y >= inp.sphere_center[1] - length/2.0) &
-              (y <= inp.sphere_center[1] + length/2.0)
-          )
-
-      elif inp.main_axis == "z":
-          condition = (
-              ((x - inp.sphere_center[0])**2 + (y - inp.sphere_center[1])**2 <= radius**2) &
-              (z >= inp.sphere_center[2] - length/2.0) &
-              (z <= inp.sphere_center[2] + length/2.0)
-          )
-
-      x_filtered = self.xyz[0, condition]
-      y_filtered = self.xyz[1, condition]
-      z_filtered = self.xyz[2, condition]
-
-      # Fill previous geometry with current structure
-      self.nAtoms = len(x_filtered)
-
-      self.atoms = []
-      self.atoms = [inp.atomtype] * self.nAtoms
-
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
-
-      self.xyz = np.zeros((3,self.nAtoms))
-      self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
+      condition = shape.in_cylinder(self.xyz, inp.main_axis, radius, length, inp.sphere_center)
 
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-
-      # Save maximum/minimum coordinates limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-
-      return(self)
+      return(self.keep_atoms(condition, inp.atomtype))
 
    # ----------------------------------------------------- #
    # ------- Filter XYZ within elliptic paraboloid ------- #
@@ -721,43 +1012,11 @@ class molecule:
           - Used for modeling paraboloidal nanostructures, such as scanning probe tips.
       """
 
-      x = self.xyz[0, :]
-      y = self.xyz[1, :]
-      z = self.xyz[2, :]
-      
-      # Calculate the paraboloid limit for each (x, y)
-      paraboloid_limit = inp.elliptic_parabola_a * x**2 + inp.elliptic_parabola_b * y**2 + inp.elliptic_parabola_c
-
       # Condition for points to be within the paraboloid 
-      condition = ((z >= inp.z_min) &
-                   (z <= inp.z_max) &
-                   (z >= paraboloid_limit))
-
-      x_filtered = self.xyz[0, condition]
-      y_filtered = self.xyz[1, condition]
-      z_filtered = self.xyz[2, condition]
-
-      # Fill previous geometry with current structure
-      self.nAtoms = len(x_filtered)
-
-      self.atoms = []
-      self.atoms = [inp.atomtype] * self.nAtoms
+      condition = shape.in_elliptic_paraboloid(self.xyz, inp.elliptic_parabola_a, inp.elliptic_parabola_b,
+                                               inp.elliptic_parabola_c, inp.z_min, inp.z_max)
 
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
-
-      self.xyz = np.zeros((3,self.nAtoms))
-      self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
-
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-
-      # Save maximum/minimum coordinates limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-
-      return(self)
+      return(self.keep_atoms(condition, inp.atomtype))
 
 
    # ----------------------------------------------------- #
@@ -785,46 +1044,10 @@ class molecule:
           - The pyramid structure is defined using four planes and a set of center points.
       """
 
-      x = self.xyz[0, :]
-      y = self.xyz[1, :]
-      z = self.xyz[2, :]
-
       # Condition for points to be within the pyramid
-      condition = (
-          (centers["center_1"][2] <= z) & (z <= centers["center_5"][2]) &
-          (centers["center_4"][0] <= x) & (x <= centers["center_1"][0]) &
-          (centers["center_3"][1] <= y) & (y <= centers["center_4"][1]) &
-          (planes["n_125"][0][0] * x + planes["n_125"][0][1] * y + planes["n_125"][0][2] * z >= -planes["n_125"][1]) &
-          (planes["n_235"][0][0] * x + planes["n_235"][0][1] * y + planes["n_235"][0][2] * z >= -planes["n_235"][1]) &
-          (planes["n_345"][0][0] * x + planes["n_345"][0][1] * y + planes["n_345"][0][2] * z >= -planes["n_345"][1]) &
-          (planes["n_415"][0][0] * x + planes["n_415"][0][1] * y + planes["n_415"][0][2] * z >= -planes["n_415"][1])
-      )
+      condition = shape.in_pyramid(self.xyz, centers, planes)
 
-      x_filtered = x[condition]
-      y_filtered = y[condition]
-      z_filtered = z[condition]
-
-      # Fill previous geometry with current structure
-      self.nAtoms = len(x_filtered)
-
-      self.atoms = []
-      self.atoms = [inp.atomtype] * self.nAtoms
-
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
-
-      self.xyz = np.zeros((3,self.nAtoms))
-      self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
-
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-
-      # Save maximum/minimum coordinates limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-
-      return(self)
+      return(self.keep_atoms(condition, inp.atomtype))
 
    # --------------------------------------------------------- #
    # ------- Filter XYZ within pentagonal-base pyramid ------- #
@@ -852,54 +1075,10 @@ class molecule:
           - If the base is not on the XY plane, translate the structure.
       """
 
-      x = self.xyz[0, :]
-      y = self.xyz[1, :]
-      z = self.xyz[2, :]
-      tol = 1e-8  # small numerical slack to avoid precision issues
-
       # Condition for points to be within the pentagonal pyramid
-      condition = (
-          # Axis-aligned bounds (from all 6 reference points)
-          (min(centers["center_1"][2], centers["center_2"][2], centers["center_3"][2], centers["center_4"][2], centers["center_5"][2], centers["center_6"][2]) <= z) &
-          (z <= max(centers["center_1"][2], centers["center_2"][2], centers["center_3"][2], centers["center_4"][2], centers["center_5"][2], centers["center_6"][2])) &
-          (min(centers["center_1"][0], centers["center_2"][0], centers["center_3"][0], centers["center_4"][0], centers["center_5"][0], centers["center_6"][0]) <= x) &
-          (x <= max(centers["center_1"][0], centers["center_2"][0], centers["center_3"][0], centers["center_4"][0], centers["center_5"][0], centers["center_6"][0])) &
-          (min(centers["center_1"][1], centers["center_2"][1], centers["center_3"][1], centers["center_4"][1], centers["center_5"][1], centers["center_6"][1]) <= y) &
-          (y <= max(centers["center_1"][1], centers["center_2"][1], centers["center_3"][1], centers["center_4"][1], centers["center_5"][1], centers["center_6"][1])) &
-
-          # Five lateral faces: (n · r + d) <= tol  -->  nx*x + ny*y + nz*z <= -d + tol
-          (planes["n_126"][0][0] * x + planes["n_126"][0][1] * y + planes["n_126"][0][2] * z <= -planes["n_126"][1] + tol) &
-          (planes["n_236"][0][0] * x + planes["n_236"][0][1] * y + planes["n_236"][0][2] * z <= -planes["n_236"][1] + tol) &
-          (planes["n_346"][0][0] * x + planes["n_346"][0][1] * y + planes["n_346"][0][2] * z <= -planes["n_346"][1] + tol) &
-          (planes["n_456"][0][0] * x + planes["n_456"][0][1] * y + planes["n_456"][0][2] * z <= -planes["n_456"][1] + tol) &
-          (planes["n_516"][0][0] * x + planes["n_516"][0][1] * y + planes["n_516"][0][2] * z <= -planes["n_516"][1] + tol)
-      )
+      condition = shape.in_pentagonal_pyramid(self.xyz, centers, planes)
 
-      x_filtered = x[condition]
-      y_filtered = y[condition]
-      z_filtered = z[condition]
-
-      # Fill previous geometry with current structure
-      self.nAtoms = len(x_filtered)
-
-      self.atoms = []
-      self.atoms = [inp.atomtype] * self.nAtoms
-
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
-
-      self.xyz = np.zeros((3,self.nAtoms))
-      self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
-
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-
-      # Save maximum/minimum coordinates limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-
-      return(self)
+      return(self.keep_atoms(condition, inp.atomtype))
 
 
    # -------------------------------------- #
@@ -932,39 +1111,10 @@ class molecule:
           - Typically used to shape nano-cones or probe-like structures.
       """
 
-      x = self.xyz[0, :]
-      y = self.xyz[1, :]
-      z = self.xyz[2, :]
- 
       # Condition for points inside the cone
-      condition = (x**2 + y**2 <= (inp.radius / inp.z_max)**2 * z**2) & (z >= 0) & (z <= inp.z_max)
-      
-      # Select the points that satisfy the condition
-      x_filtered = x[condition]
-      y_filtered = y[condition]
-      z_filtered = z[condition]
-      
-      # Fill previous geometry with current structure
-      self.nAtoms = len(x_filtered)
-
-      self.atoms = []
-      self.atoms = [inp.atomtype] * self.nAtoms
+      condition = shape.in_cone(self.xyz, inp.radius, inp.z_max)
 
-      self.xyz_center = np.zeros(3)
-      self.xyz_min    = np.zeros(3)
-      self.xyz_max    = np.zeros(3)
-
-      self.xyz = np.zeros((3,self.nAtoms))
-      self.xyz = np.vstack((x_filtered, y_filtered, z_filtered))
-
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-
-      # Save maximum/minimum coordinates limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-
-      return(self)
+      return(self.keep_atoms(condition, inp.atomtype))
 
 
    # --------------------------------- #
@@ -986,30 +1136,43 @@ class molecule:
        lattice_constant = param.lattice_constant.get(inp.atomtype)
 
        # Convert radius to number of shells
-       #noshells = round((2 * inp.radius) / (np.sqrt(2) * lattice_constant))  # Correct scaling for FCC growth
-       noshells = round((2 * inp.radius) / (np.sqrt(2) * lattice_constant)) + 1  # Ensure full layer growth
+       noshells = self.icosahedra_noshells(inp)
 
        # Generate icosahedral cluster using ASE
+       from ase.cluster import Icosahedron
        icosahedron = Icosahedron(symbol=inp.atomtype.capitalize(), noshells=noshells, latticeconstant=lattice_constant)
 
        # Extract atom coordinates and store
        positions = icosahedron.get_positions()
 
        self.nAtoms = len(positions) 
-       self.atoms = [inp.atomtype] * self.nAtoms  # Assign atom type to all atoms
+       self.change_atomtype(inp.atomtype)  # Assign atom type to all atoms
 
        # Store positions
        self.xyz = np.zeros((3, self.nAtoms))
        self.xyz = positions.T  # Transpose so shape matches (3, nAtoms)
 
-       # Calculate geometrical center
-       self.xyz_center = np.mean(self.xyz, axis=1)
+       return self
 
-       # Save max/min coordinate limits
-       self.xyz_max = np.max(self.xyz, axis=1)
-       self.xyz_min = np.min(self.xyz, axis=1)
+   @staticmethod
+   def icosahedra_noshells(inp):
+       """
+       Number of ASE icosahedron shells for `inp.radius`.
+       """
 
-       return self
+       param = parameters.parameters()
+       lattice_constant = param.lattice_constant.get(inp.atomtype)
+
+       #noshells = round((2 * inp.radius) / (np.sqrt(2) * lattice_constant))  # Correct scaling for FCC growth
+       return round((2 * inp.radius) / (np.sqrt(2) * lattice_constant)) + 1  # Ensure full layer growth
+
+   @staticmethod
+   def icosahedra_natoms(noshells):
+       """
+       Atoms of an icosahedron of `noshells` shells, (10n³ - 15n² + 11n - 3) / 3 (magic numbers 1, 13, 55, ...); ASE emits them shell by shell, so they are its first atoms.
+       """
+
+       return (10*noshells**3 - 15*noshells**2 + 11*noshells - 3) // 3
 
 
    # ----------------------------------- #
@@ -1031,14 +1194,10 @@ class molecule:
       lattice_constant = param.lattice_constant.get(inp.atomtype)
    
       # Calculate cutoff ang length based on radius
-      cutoff = ((inp.radius * 2) / (np.sqrt(2) * lattice_constant)) + 1.00  # Add a small buffer
-      length = int(2 * cutoff + 1)  # Convert to ASE-compatible parameter
-
-      # Convert radius to ASE-compatible cutoff value
-      max_cutoff = (length - 1) / 2
-      cutoff = min(cutoff, max_cutoff)  # Ensure cutoff does not exceed the limit
+      length, cutoff = self.cuboctahedra_parameters(inp)
 
       # Generate cuboctahedral cluster using ASE
+      from ase.cluster import Octahedron
       cuboctahedron = Octahedron(symbol=inp.atomtype.capitalize(), length=length, cutoff=cutoff, latticeconstant=lattice_constant)
    
       # Extract atom coordinates
@@ -1046,21 +1205,32 @@ class molecule:
    
       # Store data inside self
       self.nAtoms = len(positions)
-      self.atoms = [inp.atomtype] * self.nAtoms  # Assign atom type to all atoms
+      self.change_atomtype(inp.atomtype)  # Assign atom type to all atoms
    
       # Store positions
       self.xyz = np.zeros((3, self.nAtoms))
       self.xyz = positions.T  # Transpose so shape matches (3, nAtoms)
    
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
-   
-      # Save max/min coordinate limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
-   
       return self  # Return updated object
 
+   @staticmethod
+   def cuboctahedra_parameters(inp):
+      """
+      ASE octahedron (length, cutoff) of the cuboctahedron for `inp.radius`.
+      """
+
+      param = parameters.parameters()
+      lattice_constant = param.lattice_constant.get(inp.atomtype)
+
+      cutoff = ((inp.radius * 2) / (np.sqrt(2) * lattice_constant)) + 1.00  # Add a small buffer
+      length = int(2 * cutoff + 1)  # Convert to ASE-compatible parameter
+
+      # Convert radius to ASE-compatible cutoff value
+      max_cutoff = (length - 1) / 2
+      cutoff = min(cutoff, max_cutoff)  # Ensure cutoff does not exceed the limit
+
+      return length, cutoff
+
 
    # -------------------------------- #
    # ------- Create decahedra ------- #
@@ -1081,10 +1251,11 @@ class molecule:
       lattice_constant = param.lattice_constant.get(inp.atomtype)
 
       # Convert radius to ASE-compatible p, q, r values
-      p = q = round((2 * inp.radius) / (np.sqrt(2) * lattice_constant))  + 1 # Add a small buffer 
+      p = q = self.decahedra_size(inp)
       r = 0  # No Marks re-entrance (standard decahedron)
 
       # Generate decahedral cluster using ASE
+      from ase.cluster import Decahedron
       decahedron = Decahedron(symbol=inp.atomtype.capitalize(), p=p, q=q, r=r, latticeconstant=lattice_constant)
 
       # Extract atom coordinates
@@ -1092,31 +1263,37 @@ class molecule:
 
       # Store data inside self
       self.nAtoms = len(positions)
-      self.atoms = [inp.atomtype] * self.nAtoms  # Assign atom type to all atoms
+      self.change_atomtype(inp.atomtype)  # Assign atom type to all atoms
 
       # Store positions
       self.xyz = np.zeros((3, self.nAtoms))
       self.xyz = positions.T  # Transpose so shape matches (3, nAtoms)
 
-      # Calculate geometrical center
-      self.xyz_center = np.mean(self.xyz, axis=1)
+      return self  # Return updated object
+
+   @staticmethod
+   def decahedra_size(inp):
+      """
+      ASE decahedron p (= q) parameter for `inp.radius`.
+      """
 
-      # Save max/min coordinate limits
-      self.xyz_max = np.max(self.xyz, axis=1)
-      self.xyz_min = np.min(self.xyz, axis=1)
+      param = parameters.parameters()
+      lattice_constant = param.lattice_constant.get(inp.atomtype)
 
-      return self  # Return updated object
+      return round((2 * inp.radius) / (np.sqrt(2) * lattice_constant))  + 1 # Add a small buffer 
 
    
    # ----------------------------------- #
    # ------- Create random alloy ------- #
 
-   def create_alloy(self, inp):
+   def create_alloy(self, inp, indices=None):
       """
       Generates an alloy by randomly substituting a percentage of atoms.
   
       Args:
           inp (input_class): The input parameters containing alloy composition.
+          indices (numpy.ndarray, optional): Atoms eligible for substitution, e.g. one
+              region of a core-shell particle. Defaults to all atoms.
   
       Returns:
           molecule: The modified molecule with alloyed atoms.
@@ -1127,16 +1304,18 @@ class molecule:
       """
 
       # Number of atoms to replace 
-      replace_indices = [i for i, atom in enumerate(self.atoms)]
-      n_replace = int(self.nAtoms * (inp.alloy_perc / 100.0))
+      if indices is None:
+         replace_indices = list(range(self.nAtoms))
+      else:
+         replace_indices = [int(i) for i in indices]
+      n_replace = int(len(replace_indices) * (inp.alloy_perc / 100.0))
 
       if n_replace > 0:
          # Randomly select indices to replace
          selected_indices = random.sample(replace_indices, n_replace)
 
          # Replace the selected atoms with the alloy type
-         for idx in selected_indices:
-             self.atoms[idx] = inp.atomtype_alloy.lower()
+         self.codes[selected_indices] = element_code(inp.atomtype_alloy.lower())
 
          #debug
          #print(f"Replaced {n_replace} {inp.atomtype} atoms with {inp.atomtype_alloy}")
@@ -1163,57 +1342,14 @@ class molecule:
           - If dangling atoms remain after 3 iterations, an error is raised.
       """
 
-      #debug
-      #print("  Removing dangling metal atoms on generated structure...")
-      #print("")
-
       param = parameters.parameters()
       cutoff_distance = param.min_dist.get(inp.atomtype) + 0.1 # Add small buffer
 
-      def get_neighbors_metal(atom_index, cutoff):
-          """Find neighbors of an atom within a distance cutoff."""
-          distances = np.linalg.norm(self.xyz.T - self.xyz.T[atom_index], axis=1)
-          neighbors = np.where((distances > 0) & (distances <= cutoff))[0]
-          return neighbors
-
       max_iterations = 3
-      for iteration in range(max_iterations):
-          dangling_atoms = []
-          for i in range(self.nAtoms):
-              neighbors = get_neighbors_metal(i, cutoff_distance)
-              if len(neighbors) == 0:  # No neighbors found
-                  dangling_atoms.append(i)
-
-          # If no dangling atoms are found, exit the loop
-          if not dangling_atoms:
-              #debug
-              #print("")
-              #print(f"  --> All dangling bonds removed after {iteration + 1} iteration(s).")
-              return self
-
-          # Remove dangling atoms
-          keep_atoms = np.setdiff1d(np.arange(self.nAtoms), dangling_atoms)
-          self.xyz = self.xyz[:, keep_atoms]
-          self.nAtoms = len(keep_atoms)
-          self.atoms = [self.atoms[i] for i in keep_atoms]
 
-          # Recalculate geometry
-          self.xyz_center = np.mean(self.xyz, axis=1)
-          self.xyz_max = np.max(self.xyz, axis=1)
-          self.xyz_min = np.min(self.xyz, axis=1)
+      n_dangling = self.remove_undercoordinated_atoms(cutoff=cutoff_distance, min_neighbors=1, max_iterations=max_iterations)
 
-          #debug
-          #print(f"  - Iteration {iteration + 1}: Removed {len(dangling_atoms)} dangling atom(s).")
-
-      # If dangling bonds remain after 3 iterations, raise an error
-      dangling_atoms = []
-      for i in range(self.nAtoms):
-          neighbors = get_neighbors_metal(i, cutoff_distance)
-          if len(neighbors) < 1:
-              dangling_atoms.append(i)
-
-      if dangling_atoms:
-          output.error(f"{len(dangling_atoms)} dangling atoms on generated metal structure could not be eliminated after {max_iterations} iterations.")
+      if n_dangling > 0:
+          output.error(f"{n_dangling} dangling atoms on generated metal structure could not be eliminated after {max_iterations} iterations.")
 
       return self
-
@@ -1,3 +1,5 @@
+import os
+
 
 class parameters:
    """
@@ -11,6 +13,16 @@ class parameters:
        convergence (float): Convergence threshold for numerical operations.
        convergence_step (float): Step size for convergence calculations.
        min_dist_translate (float): Minimum allowable distance for translation operations.
+       spatial_index_cell_size (float): Edge of the leaf cells of the spatial index.
+       spatial_index_chunk (int): Number of query points processed at once by the spatial index.
+       transform_batch_size (int): Coordinates (geometries × atoms) transformed at once by a batched transform.
+       scratch_dir (str or None): Parent folder of the per-run scratch directories (None = system temporary folder).
+       bulk_cache_dir (str): Folder of the persistent bulk lattice cache.
+       bulk_cache_size (int): Size cap of the bulk lattice cache in bytes (0 disables it).
+       result_store_dir (str): Folder of the persistent store of create results.
+       result_store_size (int): Size cap of the result store in bytes (0 disables it).
+       graphene_bond_length (float): C-C bond length used to build graphene ribbons.
+       carbon_mass (float): Atomic mass of carbon, used to center bulk graphene on its center of mass.
 
        lattice_constant (dict): Lattice constants (in Ångströms) for various elements.
            - Keys: Atomic symbols (e.g., "Ag", "Au", "C").
@@ -60,6 +72,29 @@ class parameters:
       # General parameters (units = Angstroms)
       self.min_dist_translate = 1.0
 
+      # Spatial index: leaf cell edge (Angstroms) and number of query points processed at once
+      self.spatial_index_cell_size = 4.0
+      self.spatial_index_chunk     = 4096
+
+      # Batched transforms: transformed atoms per batch (small enough to stay in cache)
+      self.transform_batch_size = 1 << 16
+
+      # Scratch directories: parent folder (GEOM_SCRATCH, or the system temporary folder if unset)
+      self.scratch_dir = os.environ.get('GEOM_SCRATCH') or None
+
+      # Bulk lattice cache: folder and size cap in bytes (GEOM_CACHE_DIR, GEOM_CACHE_SIZE; 0 disables it)
+      cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+      self.bulk_cache_dir  = os.environ.get('GEOM_CACHE_DIR') or os.path.join(cache_home, 'geom', 'bulk')
+      self.bulk_cache_size = int(float(os.environ.get('GEOM_CACHE_SIZE', 1 << 30)))
+
+      # Result store of create commands: folder and size cap in bytes (GEOM_STORE_DIR, GEOM_STORE_SIZE; 0 disables it)
+      self.result_store_dir  = os.environ.get('GEOM_STORE_DIR') or os.path.join(cache_home, 'geom', 'results')
+      self.result_store_size = int(float(os.environ.get('GEOM_STORE_SIZE', 1 << 30)))
+
+      # Graphene bulk: C-C bond length (Angstroms) and carbon atomic mass (amu)
+      self.graphene_bond_length = 1.42
+      self.carbon_mass          = 12.011
+
       # Lattice parameters of metals / graphene (units = Angstroms)
       self.lattice_constant = {
           "ag": 4.08000, "au": 4.08000, "al": 4.05000, "ni": 3.52000, "cu": 3.61000,
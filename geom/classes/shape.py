@@ -0,0 +1,318 @@
+import numpy as np
+
+class shape:
+   """
+   Constructive solid geometry (CSG) expression over atomic coordinates.
+
+   Primitives (sphere, cylinder, cone, elliptic paraboloid, pyramids and half-spaces)
+   wrap the inside predicates below, which are the same ones used by the
+   `molecule.filter_xyz_in_*` methods. They combine with `|` (union), `&`
+   (intersection) and `-` (difference), and a whole expression is evaluated as
+   boolean masks over a single set of coordinates, so composite particles do not
+   need pairwise merges of separately filtered copies of the bulk.
+
+   Attributes:
+       predicate (callable): Inside test xyz -> boolean mask (primitives only).
+       operator (str): None for primitives, or "union", "intersection", "difference".
+       operands (list[shape]): Sub-expressions combined by `operator`.
+   """
+
+   def __init__(self, predicate=None, operator=None, operands=()):
+      """
+      Creates a primitive (from `predicate`) or a composite (from `operator` and `operands`).
+
+      Args:
+          predicate (callable, optional): Function returning the inside mask of a (3, N) array.
+          operator (str, optional): "union", "intersection" or "difference".
+          operands (iterable[shape], optional): Sub-expressions.
+      """
+
+      self.predicate = predicate
+      self.operator  = operator
+      self.operands  = list(operands)
+
+   # --------------------------------- #
+   # ------- Boolean operators ------- #
+
+   def __or__(self, other):
+      return shape(operator='union', operands=self._flatten('union') + other._flatten('union'))
+
+   def __and__(self, other):
+      return shape(operator='intersection', operands=self._flatten('intersection') + other._flatten('intersection'))
+
+   def __sub__(self, other):
+      return shape(operator='difference', operands=[self, other])
+
+   def _flatten(self, operator):
+      """
+      Operands to splice into an associative operation of the same kind.
+      """
+
+      return self.operands if self.operator == operator else [self]
+
+   # --------------------------------- #
+   # ------- Evaluate on atoms ------- #
+
+   def contains(self, xyz):
+      """
+      Evaluates the expression on a set of coordinates.
+
+      Args:
+          xyz (numpy.ndarray): 3×N array of atomic coordinates.
+
+      Returns:
+          numpy.ndarray: Boolean mask (N,), True for atoms inside the solid.
+      """
+
+      if self.operator is None:
+         return np.asarray(self.predicate(xyz), dtype=bool)
+
+      masks = [operand.contains(xyz) for operand in self.operands]
+
+      if self.operator == 'union':        return np.logical_or.reduce(masks)
+      if self.operator == 'intersection': return np.logical_and.reduce(masks)
+
+      return masks[0] & ~masks[1]
+
+   def select(self, xyz):
+      """
+      Indices of the atoms inside the solid.
+
+      Args:
+          xyz (numpy.ndarray): 3×N array of atomic coordinates.
+
+      Returns:
+          numpy.ndarray: Atom indices, grouped by the first union operand that claims them
+          and in input order within each group.
+
+      Notes:
+          - The grouping is the atom order that `tools.merge_geoms` produced when the
+            operands were filtered separately and merged left to right.
+      """
+
+      if self.operator != 'union':
+         return np.flatnonzero(self.contains(xyz))
+
+      claimed = np.zeros(xyz.shape[1], dtype=bool)
+      parts = []
+      for operand in self.operands:
+         indices = operand.select(xyz)
+         indices = indices[~claimed[indices]]
+         claimed[indices] = True
+         parts.append(indices)
+
+      return np.concatenate(parts)
+
+   # -------------------------- #
+   # ------- Primitives ------- #
+
+   @staticmethod
+   def sphere(center, radius):
+      """
+      Sphere of `radius` around `center`.
+      """
+
+      return shape(lambda xyz: in_sphere(xyz, center, radius))
+
+   @staticmethod
+   def cylinder(main_axis, radius, length, center=(0.0, 0.0, 0.0)):
+      """
+      Flat-ended cylinder of `radius` and `length` along `main_axis` ("x", "y" or "z").
+      """
+
+      return shape(lambda xyz: in_cylinder(xyz, main_axis, radius, length, center))
+
+   @staticmethod
+   def rod(main_axis, length, width):
+      """
+      Rod centered at the origin: cylinder capped by two spheres of diameter `width`,
+      with total extent `length` along `main_axis`.
+
+      Notes:
+          - Operands are ordered cylinder, + cap, - cap, as the former rod merges.
+      """
+
+      axis = {'x': 0, 'y': 1, 'z': 2}[main_axis]
+      center_1 = [0.0, 0.0, 0.0]
+      center_2 = [0.0, 0.0, 0.0]
+      center_1[axis] = +((length - width) / 2.0)
+      center_2[axis] = -((length - width) / 2.0)
+
+      return (shape.cylinder(main_axis, width / 2.0, length - width) |
+              shape.sphere(center_1, width / 2.0) |
+              shape.sphere(center_2, width / 2.0))
+
+   @staticmethod
+   def cone(radius, z_max):
+      """
+      Cone with the apex at the origin and base of `radius` at z = z_max.
+      """
+
+      return shape(lambda xyz: in_cone(xyz, radius, z_max))
+
+   @staticmethod
+   def elliptic_paraboloid(a, b, c, z_min, z_max):
+      """
+      Elliptic paraboloid z >= a*x^2 + b*y^2 + c between z_min and z_max.
+      """
+
+      return shape(lambda xyz: in_elliptic_paraboloid(xyz, a, b, c, z_min, z_max))
+
+   @staticmethod
+   def pyramid(centers, planes):
+      """
+      Square-base pyramid (see `in_pyramid`).
+      """
+
+      return shape(lambda xyz: in_pyramid(xyz, centers, planes))
+
+   @staticmethod
+   def pentagonal_pyramid(centers, planes):
+      """
+      Pentagonal-base pyramid (see `in_pentagonal_pyramid`).
+      """
+
+      return shape(lambda xyz: in_pentagonal_pyramid(xyz, centers, planes))
+
+   @staticmethod
+   def half_space(normal, rhs):
+      """
+      Half-space n·r + rhs <= 0; intersections of half-spaces give convex polyhedra.
+      """
+
+      return shape(lambda xyz: normal[0] * xyz[0] + normal[1] * xyz[1] + normal[2] * xyz[2] + rhs <= 0.0)
+# -------------------------------------------------------------------------------------
+def label_regions(xyz, solids):
+   """
+   Labels the atoms of a layered particle with nested solids in a single pass.
+
+   Args:
+       xyz (numpy.ndarray): 3×N array of atomic coordinates.
+       solids (list[shape]): Nested solids from the core outwards; the last one is the
+           whole particle.
+
+   Returns:
+       tuple:
+           - numpy.ndarray: Indices of the atoms of the particle, core first, then each shell.
+           - numpy.ndarray: Region ID of every returned atom (0 = core, 1 = first shell, ...).
+
+   Notes:
+       - Every atom belongs to the innermost solid containing it. The atom order is the
+         one obtained by filtering each inner solid out of the outer particle and
+         subtracting it from the next shell.
+   """
+
+   particle = solids[-1].select(xyz)
+   inside = xyz[:, particle]
+
+   claimed = np.zeros(len(particle), dtype=bool)
+   parts, regions = [], []
+   for i, solid in enumerate(solids[:-1]):
+      indices = solid.select(inside)
+      indices = indices[~claimed[indices]]
+      claimed[indices] = True
+      parts.append(indices)
+      regions.append(np.full(len(indices), i))
+
+   parts.append(np.flatnonzero(~claimed))
+   regions.append(np.full(len(parts[-1]), len(solids) - 1))
+
+   return particle[np.concatenate(parts)], np.concatenate(regions)
+# -------------------------------------------------------------------------------------
+def in_sphere(xyz, center, radius):
+   """
+   Inside mask of a sphere of `radius` centered at `center`.
+   """
+
+   x, y, z = xyz[0, :], xyz[1, :], xyz[2, :]
+
+   return ((x-center[0])**2 +
+           (y-center[1])**2 +
+           (z-center[2])**2 <= (radius)**2)
+# -------------------------------------------------------------------------------------
+def in_cylinder(xyz, main_axis, radius, length, center=(0.0, 0.0, 0.0)):
+   """
+   Inside mask of a cylinder of `radius` and `length` along `main_axis`, centered at `center`.
+   """
+
+   x, y, z = xyz[0, :], xyz[1, :], xyz[2, :]
+
+   if main_axis == "x":
+      return (((y - center[1])**2 + (z - center[2])**2 <= radius**2) &
+              (x >= center[0] - length/2.0) &
+              (x <= center[0] + length/2.0))
+
+   elif main_axis == "y":
+      return (((x - center[0])**2 + (z - center[2])**2 <= radius**2) &
+              (y >= center[1] - length/2.0) &
+              (y <= center[1] + length/2.0))
+
+   elif main_axis == "z":
+      return (((x - center[0])**2 + (y - center[1])**2 <= radius**2) &
+              (z >= center[2] - length/2.0) &
+              (z <= center[2] + length/2.0))
+# -------------------------------------------------------------------------------------
+def in_elliptic_paraboloid(xyz, a, b, c, z_min, z_max):
+   """
+   Inside mask of the elliptic paraboloid z >= a*x^2 + b*y^2 + c, with z_min <= z <= z_max.
+   """
+
+   x, y, z = xyz[0, :], xyz[1, :], xyz[2, :]
+
+   paraboloid_limit = a * x**2 + b * y**2 + c
+
+   return ((z >= z_min) &
+           (z <= z_max) &
+           (z >= paraboloid_limit))
+# -------------------------------------------------------------------------------------
+def in_pyramid(xyz, centers, planes):
+   """
+   Inside mask of a square-base pyramid with base corners `center_1`..`center_4`, apex
+   `center_5` and lateral faces `n_125`, `n_235`, `n_345`, `n_415` (normal, rhs).
+   """
+
+   x, y, z = xyz[0, :], xyz[1, :], xyz[2, :]
+
+   return (
+       (centers["center_1"][2] <= z) & (z <= centers["center_5"][2]) &
+       (centers["center_4"][0] <= x) & (x <= centers["center_1"][0]) &
+       (centers["center_3"][1] <= y) & (y <= centers["center_4"][1]) &
+       (planes["n_125"][0][0] * x + planes["n_125"][0][1] * y + planes["n_125"][0][2] * z >= -planes["n_125"][1]) &
+       (planes["n_235"][0][0] * x + planes["n_235"][0][1] * y + planes["n_235"][0][2] * z >= -planes["n_235"][1]) &
+       (planes["n_345"][0][0] * x + planes["n_345"][0][1] * y + planes["n_345"][0][2] * z >= -planes["n_345"][1]) &
+       (planes["n_415"][0][0] * x + planes["n_415"][0][1] * y + planes["n_415"][0][2] * z >= -planes["n_415"][1])
+   )
+# -------------------------------------------------------------------------------------
+def in_pentagonal_pyramid(xyz, centers, planes):
+   """
+   Inside mask of a pentagonal-base pyramid with base corners `center_1`..`center_5`, apex
+   `center_6` and lateral faces `n_126`, `n_236`, `n_346`, `n_456`, `n_516` (normal, rhs).
+   """
+
+   x, y, z = xyz[0, :], xyz[1, :], xyz[2, :]
+   tol = 1e-8  # small numerical slack to avoid precision issues
+
+   corners = [centers[f"center_{i}"] for i in range(1, 7)]
+
+   return (
+       # Axis-aligned bounds (from all 6 reference points)
+       (min(c[2] for c in corners) <= z) & (z <= max(c[2] for c in corners)) &
+       (min(c[0] for c in corners) <= x) & (x <= max(c[0] for c in corners)) &
+       (min(c[1] for c in corners) <= y) & (y <= max(c[1] for c in corners)) &
+
+       # Five lateral faces: (n · r + d) <= tol  -->  nx*x + ny*y + nz*z <= -d + tol
+       (planes["n_126"][0][0] * x + planes["n_126"][0][1] * y + planes["n_126"][0][2] * z <= -planes["n_126"][1] + tol) &
+       (planes["n_236"][0][0] * x + planes["n_236"][0][1] * y + planes["n_236"][0][2] * z <= -planes["n_236"][1] + tol) &
+       (planes["n_346"][0][0] * x + planes["n_346"][0][1] * y + planes["n_346"][0][2] * z <= -planes["n_346"][1] + tol) &
+       (planes["n_456"][0][0] * x + planes["n_456"][0][1] * y + planes["n_456"][0][2] * z <= -planes["n_456"][1] + tol) &
+       (planes["n_516"][0][0] * x + planes["n_516"][0][1] * y + planes["n_516"][0][2] * z <= -planes["n_516"][1] + tol)
+   )
+# -------------------------------------------------------------------------------------
+def in_cone(xyz, radius, z_max):
+   """
+   Inside mask of a cone with the apex at the origin and base of `radius` at z = z_max.
+   """
+
+   x, y, z = xyz[0, :], xyz[1, :], xyz[2, :]
+
+   return (x**2 + y**2 <= (radius / z_max)**2 * z**2) & (z >= 0) & (z <= z_max)
@@ -0,0 +1,446 @@
+import numpy as np
+
+from geom.classes import parameters
+
+class spatial_index:
+   """
+   Hierarchical uniform cell grid over a set of atomic coordinates.
+
+   Atoms are binned into cubic cells of edge `cell_size` and sorted along a
+   Morton (Z-order) curve, so that every coarser level of the grid (cells of
+   edge 2·cell_size, 4·cell_size, ...) is a contiguous block of the sorted
+   atoms. Each occupied cell stores the tight bounding box of its atoms.
+
+   Queries descend the hierarchy from the single root cell, discarding every
+   cell whose bounding box is farther than the current distance bound, and only
+   compute exact atom-atom distances for the surviving leaf cells. The index is
+   built once in O(N log N) and queries are processed in chunks, so memory is
+   bounded independently of the size of the two geometries.
+
+   Attributes:
+       nPoints (int): Number of indexed atoms.
+       cell_size (float): Edge of the finest (leaf) cells in Angstroms.
+       points (numpy.ndarray): 3×N coordinates sorted along the Morton curve.
+       order (numpy.ndarray): Original atom index of every sorted point.
+   """
+
+   def __init__(self, xyz, cell_size=None):
+      """
+      Builds the cell hierarchy for a set of coordinates.
+
+      Args:
+          xyz (numpy.ndarray): 3×N array of atomic coordinates.
+          cell_size (float, optional): Edge of the leaf cells in Angstroms.
+              Defaults to `parameters.spatial_index_cell_size`.
+
+      Notes:
+          - The coordinates are copied, so later changes to `xyz` must be
+            propagated with `translate` or by building a new index.
+      """
+
+      param = parameters.parameters()
+
+      if cell_size is None: cell_size = param.spatial_index_cell_size
+
+      self.chunk = param.spatial_index_chunk
+
+      self.xyz = np.array(xyz, dtype=float)
+      self.nPoints = self.xyz.shape[1]
+      self.cell_size = float(cell_size)
+
+      self.lo = []
+      self.hi = []
+      self.first_child = []
+      self.n_children = []
+
+      if self.nPoints == 0: return
+
+      # Morton codes hold 21 bits per axis
+      origin = np.min(self.xyz, axis=1)
+      extent = np.max(np.max(self.xyz, axis=1) - origin)
+      if extent / self.cell_size > 2**21 - 2: self.cell_size = extent / (2**21 - 2)
+
+      cells = np.floor((self.xyz - origin[:, np.newaxis]) / self.cell_size).astype(np.int64)
+      cells = np.clip(cells, 0, 2**21 - 1)
+
+      keys = _morton_keys(cells)
+      self.order = np.argsort(keys, kind='stable')
+      keys = keys[self.order]
+      self.points = self.xyz[:, self.order]
+
+      self.nLevels = int(cells.max()).bit_length() + 1
+
+      # Leaf level: cells are ranges of sorted points
+      starts = _group_starts(keys)
+      self.leaf_start = starts
+      self.leaf_count = np.diff(np.append(starts, self.nPoints))
+      self.lo.append(np.minimum.reduceat(self.points, starts, axis=1))
+      self.hi.append(np.maximum.reduceat(self.points, starts, axis=1))
+      self.first_child.append(None)
+      self.n_children.append(None)
+
+      # Coarser levels: cells are ranges of cells of the level below
+      level_keys = keys[starts]
+      for level in range(1, self.nLevels):
+         level_keys = level_keys >> np.uint64(3)
+         starts = _group_starts(level_keys)
+         self.first_child.append(starts)
+         self.n_children.append(np.diff(np.append(starts, len(level_keys))))
+         self.lo.append(np.minimum.reduceat(self.lo[-1], starts, axis=1))
+         self.hi.append(np.maximum.reduceat(self.hi[-1], starts, axis=1))
+         level_keys = level_keys[starts]
+
+   # --------------------------------- #
+   # ------- Check consistency ------- #
+
+   def describes(self, xyz):
+      """
+      Checks whether the index was built for exactly these coordinates.
+
+      Args:
+          xyz (numpy.ndarray): 3×N array of atomic coordinates.
+
+      Returns:
+          bool: True if `xyz` matches the indexed coordinates bit by bit.
+      """
+
+      return(xyz.shape == self.xyz.shape and np.array_equal(xyz, self.xyz))
+
+   # --------------------------------------- #
+   # ------- Translate index rigidly ------- #
+
+   def translate(self, shift):
+      """
+      Rigidly translates the indexed coordinates.
+
+      Args:
+          shift (numpy.ndarray): Translation vector (3,).
+
+      Returns:
+          spatial_index: The translated index.
+
+      Notes:
+          - The cell hierarchy is translation invariant, so only coordinates
+            and bounding boxes are shifted; nothing is rebuilt.
+          - The shift is applied with the same floating-point operation as
+            `molecule.translate_geom`, so both copies stay bit-identical.
+      """
+
+      shift = np.asarray(shift, dtype=float)
+
+      self.xyz += shift[:, np.newaxis]
+
+      if self.nPoints == 0: return(self)
+
+      self.points += shift[:, np.newaxis]
+      for level in range(self.nLevels):
+         self.lo[level] += shift[:, np.newaxis]
+         self.hi[level] += shift[:, np.newaxis]
+
+      return(self)
+
+   # ---------------------------------------------- #
+   # ------- Nearest indexed atom per query ------- #
+
+   def nearest(self, xyz):
+      """
+      Finds the nearest indexed atom of every query point.
+
+      Args:
+          xyz (numpy.ndarray): 3×M array of query coordinates.
+
+      Returns:
+          tuple:
+              - numpy.ndarray: Distance to the nearest indexed atom (M,).
+              - numpy.ndarray: Original index of that atom (M,).
+      """
+
+      queries = np.asarray(xyz, dtype=float)
+      nQueries = queries.shape[1]
+
+      dist2 = np.full(nQueries, np.inf)
+      index = np.full(nQueries, -1, dtype=np.int64)
+
+      if self.nPoints == 0: return(np.sqrt(dist2), index)
+
+      for first in range(0, nQueries, self.chunk):
+         chunk = np.arange(first, min(first + self.chunk, nQueries))
+         bound = np.full(len(chunk), np.inf)
+
+         q, p, d2 = self._leaf_pairs(queries, chunk, bound, shared=False)
+         if len(q) == 0: continue
+
+         # Minimum per query (pairs are grouped by query)
+         starts = _group_starts(q)
+         best = _argmin_reduceat(d2, starts)
+         dist2[q[starts]] = d2[best]
+         index[q[starts]] = self.order[p[best]]
+
+      return(np.sqrt(dist2), index)
+
+   # ----------------------------------------------- #
+   # ------- Minimum distance to a query set ------- #
+
+   def min_distance(self, xyz):
+      """
+      Computes the minimum distance between the indexed atoms and a set of points.
+
+      Args:
+          xyz (numpy.ndarray): 3×M array of query coordinates.
+
+      Returns:
+          tuple:
+              - float: Minimum distance between both sets.
+              - int: Original index of the indexed atom of the closest pair.
+              - int: Index of the query point of the closest pair.
+
+      Notes:
+          - A single distance bound is shared by all queries, so query points
+            that cannot improve on the closest pair found so far are discarded
+            at the coarsest possible level.
+          - Distances are evaluated as sqrt(dx² + dy² + dz²) with dx = query - atom,
+            the same arithmetic as a dense broadcast, so the result is bit-identical.
+      """
+
+      queries = np.asarray(xyz, dtype=float)
+      nQueries = queries.shape[1]
+
+      if self.nPoints == 0 or nQueries == 0: return(np.inf, -1, -1)
+
+      bound = np.array([np.inf])
+      best_d2, best_i, best_j = np.inf, -1, -1
+
+      for first in range(0, nQueries, self.chunk):
+         chunk = np.arange(first, min(first + self.chunk, nQueries))
+
+         q, p, d2 = self._leaf_pairs(queries, chunk, bound, shared=True)
+         if len(q) == 0: continue
+
+         k = np.argmin(d2)
+         if d2[k] < best_d2:
+            best_d2, best_i, best_j = d2[k], self.order[p[k]], q[k]
+            bound[0] = min(bound[0], best_d2)
+
+      return(np.sqrt(best_d2), int(best_i), int(best_j))
+
+   # ---------------------------------------------- #
+   # ------- Pairs within a cutoff distance ------- #
+
+   def pairs_within(self, xyz, cutoff):
+      """
+      Finds every (query, indexed atom) pair closer than or at a cutoff distance.
+
+      Args:
+          xyz (numpy.ndarray): 3×M array of query coordinates.
+          cutoff (float): Cutoff distance in Angstroms.
+
+      Returns:
+          tuple:
+              - numpy.ndarray: Query index of every pair.
+              - numpy.ndarray: Original index of the indexed atom of every pair.
+              - numpy.ndarray: Distance of every pair.
+
+      Notes:
+          - Only cells whose bounding box lies within the cutoff are visited, so
+            the cost scales with the number of overlapping candidates.
+          - Pairs are grouped by query, in ascending query order.
+      """
+
+      queries = np.asarray(xyz, dtype=float)
+      nQueries = queries.shape[1]
+
+      found_q, found_i, found_d = [], [], []
+
+      if self.nPoints > 0:
+         for first in range(0, nQueries, self.chunk):
+            chunk = np.arange(first, min(first + self.chunk, nQueries))
+            bound = np.full(len(chunk), float(cutoff)**2)
+
+            q, p, d2 = self._leaf_pairs(queries, chunk, bound, shared=False, tighten=False)
+
+            d = np.sqrt(d2)
+            close = d <= cutoff
+            found_q.append(q[close])
+            found_i.append(self.order[p[close]])
+            found_d.append(d[close])
+
+      if len(found_q) == 0: return(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+
+      return(np.concatenate(found_q), np.concatenate(found_i), np.concatenate(found_d))
+
+   # ------------------------------------------------- #
+   # ------- Flag queries closer than a cutoff ------- #
+
+   def any_within(self, xyz, cutoff):
+      """
+      Flags the query points that have an indexed atom strictly closer than a cutoff.
+
+      Args:
+          xyz (numpy.ndarray): 3×M array of query coordinates.
+          cutoff (float): Cutoff distance in Angstroms.
+
+      Returns:
+          numpy.ndarray: Boolean mask (M,), True where some distance is < `cutoff`.
+
+      Notes:
+          - Equivalent to `np.any(dist_matrix < cutoff, axis=1)` on the dense
+            (M, N) distance matrix, evaluated chunk by chunk in bounded memory.
+      """
+
+      queries = np.asarray(xyz, dtype=float)
+      nQueries = queries.shape[1]
+
+      close = np.zeros(nQueries, dtype=bool)
+
+      if self.nPoints == 0: return(close)
+
+      for first in range(0, nQueries, self.chunk):
+         chunk = np.arange(first, min(first + self.chunk, nQueries))
+         bound = np.full(len(chunk), float(cutoff)**2)
+
+         q, _, d2 = self._leaf_pairs(queries, chunk, bound, shared=False, tighten=False)
+
+         close[q[np.sqrt(d2) < cutoff]] = True
+
+      return(close)
+
+   # ------------------------------------------------- #
+   # ------- Candidate pairs at the leaf level ------- #
+
+   def _leaf_pairs(self, queries, chunk, bound, shared, tighten=True):
+      """
+      Descends the hierarchy and returns the exact distances of candidate pairs.
+
+      Args:
+          queries (numpy.ndarray): 3×M array of all query coordinates.
+          chunk (numpy.ndarray): Indices of the queries processed in this call.
+          bound (numpy.ndarray): Squared distance bound, one per query in `chunk`
+              or a single shared value (updated in place when `shared`).
+          shared (bool): Whether all queries share a single bound.
+          tighten (bool): Whether the bound shrinks to the nearest atom found
+              (nearest/min-distance queries) or stays fixed (cutoff queries).
+
+      Returns:
+          tuple:
+              - numpy.ndarray: Query index of every candidate pair.
+              - numpy.ndarray: Sorted-point index of every candidate pair.
+              - numpy.ndarray: Squared distance of every candidate pair.
+
+      Notes:
+          - Pairs are returned grouped by query, in ascending query order.
+          - Boxes are tight, so every face holds at least one atom: the nearest
+            face combined with the farthest extent along the other two axes
+            bounds the distance to the nearest atom in the box (MINMAXDIST),
+            which tightens the bound while descending.
+      """
+
+      # Slack so that rounding in the box bounds never discards a valid pair
+      slack = 1.0 + 1.0e-9
+
+      q = chunk
+      c = np.zeros(len(chunk), dtype=np.int64)
+      local = np.arange(len(chunk))
+
+      for level in range(self.nLevels - 1, -1, -1):
+         if level > 0:
+            counts = self.n_children[level][c]
+            c = _expand_ranges(self.first_child[level][c], counts)
+         else:
+            counts = self.leaf_count[c]
+            c = _expand_ranges(self.leaf_start[c], counts)
+
+         q = np.repeat(q, counts)
+         local = np.repeat(local, counts)
+
+         if level == 0: break
+
+         p = queries[:, q]
+         to_lo = p - self.lo[level - 1][:, c]
+         to_hi = self.hi[level - 1][:, c] - p
+
+         gap = np.maximum(np.maximum(-to_lo, -to_hi), 0.0)
+         dmin2 = gap[0]**2 + gap[1]**2 + gap[2]**2
+
+         if tighten and len(q) > 0:
+            near = np.minimum(np.abs(to_lo), np.abs(to_hi))**2
+            far = np.maximum(np.abs(to_lo), np.abs(to_hi))**2
+            total = far[0] + far[1] + far[2]
+            dmax2 = np.minimum(np.minimum(total - far[0] + near[0], total - far[1] + near[1]),
+                               total - far[2] + near[2])
+
+            if shared:
+               bound[0] = min(bound[0], np.min(dmax2) * slack)
+            else:
+               starts = _group_starts(local)
+               owner = local[starts]
+               bound[owner] = np.minimum(bound[owner], np.minimum.reduceat(dmax2, starts) * slack)
+
+         if shared:
+            keep = dmin2 <= bound[0] * slack
+         else:
+            keep = dmin2 <= bound[local] * slack
+
+         q, c, local = q[keep], c[keep], local[keep]
+
+      # Exact distances, evaluated in blocks to bound memory
+      d2 = np.empty(len(q))
+      block = self.chunk * 64
+      for first in range(0, len(q), block):
+         last = first + block
+         diff = queries[:, q[first:last]] - self.points[:, c[first:last]]
+         d2[first:last] = diff[0]**2 + diff[1]**2 + diff[2]**2
+
+      return(q, c, d2)
+
+# -------------------------------------------------------------------------------------
+def _morton_keys(cells):
+   """
+   Interleaves the bits of integer cell coordinates into Morton (Z-order) keys.
+
+   Args:
+       cells (numpy.ndarray): 3×N array of non-negative cell coordinates (< 2**21).
+
+   Returns:
+       numpy.ndarray: Morton keys (N,) as unsigned 64-bit integers.
+   """
+
+   keys = np.zeros(cells.shape[1], dtype=np.uint64)
+
+   for axis in range(3):
+      v = cells[axis].astype(np.uint64)
+      v = (v | (v << np.uint64(32))) & np.uint64(0x1f00000000ffff)
+      v = (v | (v << np.uint64(16))) & np.uint64(0x1f0000ff0000ff)
+      v = (v | (v << np.uint64(8)))  & np.uint64(0x100f00f00f00f00f)
+      v = (v | (v << np.uint64(4)))  & np.uint64(0x10c30c30c30c30c3)
+      v = (v | (v << np.uint64(2)))  & np.uint64(0x1249249249249249)
+      keys |= v << np.uint64(2 - axis)
+
+   return(keys)
+# -------------------------------------------------------------------------------------
+def _group_starts(sorted_values):
+   """
+   Returns the first position of every run of equal values in a sorted array.
+   """
+
+   if len(sorted_values) == 0: return(np.zeros(0, dtype=np.int64))
+
+   return(np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]]))
+# -------------------------------------------------------------------------------------
+def _expand_ranges(starts, counts):
+   """
+   Concatenates the integer ranges [starts[i], starts[i] + counts[i]).
+   """
+
+   offsets = np.repeat(np.cumsum(counts) - counts, counts)
+
+   return(np.repeat(starts, counts) + (np.arange(offsets.size) - offsets))
+# -------------------------------------------------------------------------------------
+def _argmin_reduceat(values, starts):
+   """
+   Returns the position of the minimum of every group [starts[i], starts[i+1]).
+   """
+
+   group = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(values))))
+   order = np.lexsort((values, group))
+
+   return(order[_group_starts(group[order])])
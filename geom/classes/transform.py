@@ -0,0 +1,276 @@
+import math
+import numpy as np
+
+AXES = {'x': 0, 'y': 1, 'z': 2}
+
+class transform:
+   """
+   Affine transform of atomic coordinates (4×4 homogeneous matrix).
+
+   Transforms are built from rotations (about a Cartesian axis, an arbitrary
+   axis or a quaternion), translations and reflections, and composed with
+   `then` (or `@`) without touching any coordinates. The composed matrix is
+   applied to a 3×N coordinate array exactly once by `apply`, and a list of
+   transforms is applied to the same coordinates at once by `apply_all`.
+
+   Besides the matrix, every transform keeps the structural pattern of its
+   entries: the terms that a rotation, translation or reflection actually
+   contributes. Only those terms are evaluated, in the same order as the
+   explicit formulas they replace, so a rotation about a Cartesian axis or a
+   translation gives exactly the coordinates of the former per-axis code.
+
+   Attributes:
+       matrix (numpy.ndarray): 4×4 affine matrix acting on column vectors.
+       pattern (numpy.ndarray): 4×4 boolean mask of the structural entries.
+   """
+
+   def __init__(self, matrix=None, pattern=None):
+      """
+      Creates a transform, the identity by default.
+
+      Args:
+          matrix (numpy.ndarray, optional): 4×4 affine matrix.
+          pattern (numpy.ndarray, optional): 4×4 boolean mask of the structural entries.
+              Defaults to the nonzero entries of `matrix`.
+      """
+
+      self.matrix = np.eye(4) if matrix is None else np.array(matrix, dtype=float)
+
+      if pattern is None: pattern = self.matrix != 0.0
+
+      self.pattern = np.array(pattern, dtype=bool)
+      self.pattern[3] = (False, False, False, True)
+
+   # ---------------------------- #
+   # ------- Constructors ------- #
+
+   @classmethod
+   def rotation(cls, angle, axis):
+      """
+      Rotation by an angle about an axis through the origin.
+
+      Args:
+          angle (float): Rotation angle in degrees (counterclockwise, right-hand rule).
+          axis (str or array-like): Cartesian axis ("x", "+y", "-z", ...; the sense is
+              ignored as in `tools.rotate`) or an arbitrary direction vector.
+
+      Returns:
+          transform: The rotation.
+
+      Notes:
+          - Arbitrary axes use the Rodrigues formula.
+      """
+
+      theta = math.radians(angle)
+
+      cos_theta = math.cos(theta)
+      sin_theta = math.sin(theta)
+
+      if isinstance(axis, str):
+         k = AXES[axis[-1]]
+         i, j = [a for a in range(3) if a != k]
+         sign = -1.0 if k == 1 else 1.0
+
+         matrix = np.eye(4)
+         matrix[i, i], matrix[i, j] = cos_theta, -sign * sin_theta
+         matrix[j, i], matrix[j, j] = sign * sin_theta, cos_theta
+
+         pattern = np.eye(4, dtype=bool)
+         pattern[np.ix_((i, j), (i, j))] = True
+
+         return cls(matrix, pattern)
+
+      u = np.asarray(axis, dtype=float)
+      u = u / np.linalg.norm(u)
+
+      cross = np.array([[0.0, -u[2], u[1]], [u[2], 0.0, -u[0]], [-u[1], u[0], 0.0]])
+
+      matrix = np.eye(4)
+      matrix[:3, :3] = cos_theta * np.eye(3) + sin_theta * cross + (1.0 - cos_theta) * np.outer(u, u)
+
+      return cls(matrix, np.ones((4, 4), dtype=bool))
+
+   @classmethod
+   def quaternion(cls, q):
+      """
+      Rotation given by a quaternion.
+
+      Args:
+          q (array-like): Quaternion (w, x, y, z); it is normalized first.
+
+      Returns:
+          transform: The rotation.
+      """
+
+      w, x, y, z = np.asarray(q, dtype=float) / np.linalg.norm(q)
+
+      matrix = np.eye(4)
+      matrix[:3, :3] = [[1.0 - 2.0 * (y*y + z*z), 2.0 * (x*y - w*z),       2.0 * (x*z + w*y)],
+                        [2.0 * (x*y + w*z),       1.0 - 2.0 * (x*x + z*z), 2.0 * (y*z - w*x)],
+                        [2.0 * (x*z - w*y),       2.0 * (y*z + w*x),       1.0 - 2.0 * (x*x + y*y)]]
+
+      return cls(matrix, np.ones((4, 4), dtype=bool))
+
+   @classmethod
+   def translation(cls, vector):
+      """
+      Translation by a vector.
+
+      Args:
+          vector (array-like): Translation vector (3,) in Angstroms.
+
+      Returns:
+          transform: The translation.
+
+      Notes:
+          - All three components are added, including zeros, as in `molecule.translate_geom`.
+      """
+
+      matrix = np.eye(4)
+      matrix[:3, 3] = vector
+
+      pattern = np.eye(4, dtype=bool)
+      pattern[:3, 3] = True
+
+      return cls(matrix, pattern)
+
+   @classmethod
+   def reflection(cls, normal):
+      """
+      Reflection through a plane containing the origin.
+
+      Args:
+          normal (str or array-like): Cartesian axis normal to the mirror plane ("x"
+              mirrors x → -x) or an arbitrary normal vector.
+
+      Returns:
+          transform: The reflection.
+      """
+
+      matrix = np.eye(4)
+
+      if isinstance(normal, str):
+         k = AXES[normal[-1]]
+         matrix[k, k] = -1.0
+
+         return cls(matrix, np.eye(4, dtype=bool))
+
+      n = np.asarray(normal, dtype=float)
+      n = n / np.linalg.norm(n)
+
+      matrix[:3, :3] -= 2.0 * np.outer(n, n)
+
+      return cls(matrix, np.ones((4, 4), dtype=bool))
+
+   # --------------------------- #
+   # ------- Composition ------- #
+
+   def then(self, other):
+      """
+      Composes two transforms: `self` is applied first, then `other`.
+
+      Args:
+          other (transform): Transform applied after this one.
+
+      Returns:
+          transform: The composed transform (no coordinates are touched).
+      """
+
+      return other @ self
+
+   def __matmul__(self, other):
+      """
+      Composes two transforms in matrix order: `(a @ b)` applies `b` first, then `a`.
+      """
+
+      pattern = (self.pattern.astype(np.uint8) @ other.pattern.astype(np.uint8)) > 0
+
+      return transform(self.matrix @ other.matrix, pattern)
+
+   def inverse(self):
+      """
+      Returns the inverse transform.
+      """
+
+      return transform(np.linalg.inv(self.matrix), np.ones((4, 4), dtype=bool))
+
+   # --------------------------- #
+   # ------- Application ------- #
+
+   def apply(self, xyz, out=None):
+      """
+      Applies the transform to a set of coordinates in a single pass.
+
+      Args:
+          xyz (numpy.ndarray): 3×N array of atomic coordinates.
+          out (numpy.ndarray, optional): Preallocated 3×N output buffer. It may be
+              `xyz` itself for an in-place transform.
+
+      Returns:
+          numpy.ndarray: The transformed 3×N coordinates (`out` if given).
+      """
+
+      if out is None: return apply_all([self], xyz)[0]
+
+      apply_all([self], xyz, out[np.newaxis])
+
+      return out
+
+# -------------------------------------------------------------------------------------
+def apply_all(transforms, xyz, out=None):
+   """
+   Applies several transforms to the same coordinates at once.
+
+   Args:
+       transforms (list[transform]): Transforms to apply.
+       xyz (numpy.ndarray): 3×N array of atomic coordinates.
+       out (numpy.ndarray, optional): Preallocated K×3×N output buffer (K transforms).
+
+   Returns:
+       numpy.ndarray: K×3×N array with the coordinates transformed by each transform.
+
+   Notes:
+       - This is the batched product `einsum('kij,jn->kin')` plus the translations,
+         evaluated term by term over the structural entries shared by the batch: each
+         output row is the sum of its coefficients times the input rows, left to right.
+       - If `out` overlaps `xyz`, the result is computed in a scratch buffer first.
+   """
+
+   matrices = np.stack([t.matrix for t in transforms])
+   pattern  = np.logical_or.reduce([t.pattern for t in transforms])
+
+   nTransforms, nAtoms = len(transforms), xyz.shape[1]
+
+   target = out
+   if out is None or np.shares_memory(out, xyz):
+      out = np.empty((nTransforms, 3, nAtoms), dtype=np.result_type(xyz, float))
+
+   scratch = None
+
+   for i in range(3):
+      row = out[:, i]
+      first = True
+
+      for j in np.flatnonzero(pattern[i, :3]):
+         coefficient = matrices[:, i, j, np.newaxis]
+
+         if first and np.all(coefficient == 1.0):
+            np.copyto(row, xyz[j])
+         elif first:
+            np.multiply(coefficient, xyz[j], out=row)
+         else:
+            if scratch is None: scratch = np.empty_like(row)
+            np.multiply(coefficient, xyz[j], out=scratch)
+            row += scratch
+
+         first = False
+
+      if first: row[...] = 0.0
+      if pattern[i, 3]: row += matrices[:, i, 3, np.newaxis]
+
+   if target is not None and target is not out:
+      target[...] = out
+      out = target
+
+   return out
+# -------------------------------------------------------------------------------------
@@ -0,0 +1,211 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+from geom.classes import parameters
+from geom.functions import geomb_io, lattice
+
+# Cache entries are `.geomb` files named by the hash of the bulk they hold
+SUFFIX = '.geomb'
+
+# -------------------------------------------------------------------------------------
+def metal_bulk(element, arrangement, lattice_constant, layers, region=None):
+   """
+   Bulk metal block of `lattice.cubic_bulk` / `lattice.hcp_bulk`, reused across runs.
+
+   Args:
+       element (str): Atom type (e.g. "ag").
+       arrangement (str): "FCC", "BCC" or "HCP".
+       lattice_constant (float or tuple): As in `lattice.cubic_bulk` / `lattice.hcp_bulk`.
+       layers (list[int]): As in `lattice.cubic_bulk` / `lattice.hcp_bulk`.
+       region (tuple, optional): Shape region (see `lattice.box_region`).
+
+   Returns:
+       np.ndarray: Coordinates with shape (3, N), identical to those of the lattice functions.
+
+   Notes:
+       - The cache holds the block clipped to the box of `region`, keyed by element,
+         arrangement, lattice constant, layers and box (see `bulk_key`). The shape itself
+         is cut from it by `lattice.inside_region`, so every shape sharing a box reuses
+         the same entry.
+       - Entries are memory-mapped read-only on reuse, and the least recently used ones
+         are evicted beyond `parameters.bulk_cache_size` bytes (0 disables the cache).
+   """
+
+   box = None if region is None else (region[0], region[1], None)
+
+   spec = {'element': element, 'arrangement': arrangement, 'lattice_constant': lattice_constant,
+           'layers': [int(l) for l in layers],
+           'box': None if box is None else [np.asarray(box[0]).tolist(), np.asarray(box[1]).tolist()]}
+
+   xyz = load(spec)
+
+   if xyz is None:
+      if arrangement == 'HCP':
+         xyz = lattice.hcp_bulk(lattice_constant, layers, box)
+      else:
+         xyz = lattice.cubic_bulk(arrangement, lattice_constant, layers, box)
+
+      store(spec, xyz)
+
+   if region is None or region[2] is None: return xyz
+
+   return xyz[:, lattice.inside_region(xyz, region)]
+# -------------------------------------------------------------------------------------
+def bulk_key(spec):
+   """
+   Content address of a cached bulk.
+
+   Args:
+       spec (dict): Parameters that fully determine the bulk coordinates.
+
+   Returns:
+       str: SHA-256 hex digest of the canonical JSON form of `spec`.
+   """
+
+   return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+# -------------------------------------------------------------------------------------
+def load(spec):
+   """
+   Maps a cached bulk into memory.
+
+   Args:
+       spec (dict): Bulk parameters (see `bulk_key`).
+
+   Returns:
+       np.memmap or None: Read-only coordinates (3, N), or None on a cache miss.
+
+   Notes:
+       - A hit refreshes the modification time of the entry, which orders the LRU eviction.
+       - Unreadable entries (e.g. truncated by a full disk) count as misses.
+   """
+
+   param = parameters.parameters()
+   if param.bulk_cache_size <= 0: return None
+
+   entry = os.path.join(param.bulk_cache_dir, bulk_key(spec) + SUFFIX)
+
+   try:
+      _, _, xyz, _ = geomb_io.read_geomb_codes(entry, mode='r')
+      os.utime(entry)
+   except (OSError, ValueError):
+      return None
+
+   return xyz
+# -------------------------------------------------------------------------------------
+def store(spec, xyz):
+   """
+   Adds a bulk to the cache and evicts the least recently used entries beyond the size cap.
+
+   Args:
+       spec (dict): Bulk parameters (see `bulk_key`), kept in the comment of the entry.
+       xyz (np.ndarray): Bulk coordinates (3, N).
+
+   Returns:
+       None
+
+   Notes:
+       - The entry is written atomically, so concurrent runs storing the same bulk
+         never read a partial file. Empty bulks and bulks larger than the cap are skipped.
+       - A cache folder that cannot be written only disables the cache.
+   """
+
+   param = parameters.parameters()
+   nbytes = 3 * xyz.shape[1] * 8 + xyz.shape[1]
+
+   if xyz.shape[1] == 0 or nbytes > param.bulk_cache_size: return
+
+   try:
+      os.makedirs(param.bulk_cache_dir, exist_ok=True)
+      geomb_io.write_geomb_codes(os.path.join(param.bulk_cache_dir, bulk_key(spec) + SUFFIX),
+                                 [spec['element'].capitalize()], np.zeros(xyz.shape[1], dtype=np.uint8), xyz,
+                                 comment=json.dumps(spec, sort_keys=True))
+   except OSError:
+      return
+
+   evict(param.bulk_cache_size)
+# -------------------------------------------------------------------------------------
+def entries():
+   """
+   Lists the cache entries, least recently used first.
+
+   Returns:
+       list[tuple]: (path, size in bytes, last use as a POSIX timestamp) of every entry.
+   """
+
+   cache_dir = parameters.parameters().bulk_cache_dir
+   if not os.path.isdir(cache_dir): return []
+
+   found = []
+   for name in os.listdir(cache_dir):
+      if not name.endswith(SUFFIX): continue
+      try:
+         stat = os.stat(os.path.join(cache_dir, name))
+      except OSError:
+         continue
+      found.append((os.path.join(cache_dir, name), stat.st_size, stat.st_mtime))
+
+   return sorted(found, key=lambda entry: entry[2])
+# -------------------------------------------------------------------------------------
+def evict(size_cap):
+   """
+   Removes the least recently used entries until the cache holds at most `size_cap` bytes.
+
+   Args:
+       size_cap (int): Maximum total size of the entries (bytes).
+
+   Returns:
+       int: Number of removed entries.
+   """
+
+   found = entries()
+   total = sum(size for _, size, _ in found)
+
+   removed = 0
+   for path, size, _ in found:
+      if total <= size_cap: break
+      try:
+         os.remove(path)
+      except OSError:
+         continue
+      total -= size
+      removed += 1
+
+   return removed
+# -------------------------------------------------------------------------------------
+def stats():
+   """
+   Summary of the cache contents.
+
+   Returns:
+       dict: Cache folder, size cap, number of entries, total size (bytes) and, per entry
+       (least recently used first), its bulk parameters, atom count, size and last use.
+   """
+
+   param = parameters.parameters()
+
+   summary = {'dir': param.bulk_cache_dir, 'size_cap': param.bulk_cache_size, 'entries': []}
+
+   for path, size, last_use in entries():
+      try:
+         header, _ = geomb_io.read_geomb_header(path)
+         spec = json.loads(header['comment'])
+      except (OSError, ValueError):
+         continue
+      summary['entries'].append({'spec': spec, 'natoms': header['natoms'], 'size': size, 'last_use': last_use})
+
+   summary['size'] = sum(entry['size'] for entry in summary['entries'])
+
+   return summary
+# -------------------------------------------------------------------------------------
+def clear():
+   """
+   Removes every cache entry.
+
+   Returns:
+       int: Number of removed entries.
+   """
+
+   return evict(-1)
+# -------------------------------------------------------------------------------------
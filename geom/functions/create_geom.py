@@ -2,16 +2,9 @@ import sys
 import numpy as np
 import math
 import copy
-import os
-import shutil
-import gmsh
-
-from geom.classes import molecule, parameters
-from geom.functions import general, output, tools
-from ase.cluster.cubic import FaceCenteredCubic, BodyCenteredCubic
-from ase.build import graphene_nanoribbon
-from ase.build import graphene as graphene_general_ase
-from ase.io import write
+
+from geom.classes import molecule, parameters, shape
+from geom.functions import general, output, tools, lattice, bulk_cache, result_store
 # -------------------------------------------------------------------------------------
 def select_case(inp):
    """
@@ -22,33 +15,68 @@ def select_case(inp):
 
    Returns:
        None: Executes the corresponding geometry generation function.
+
+   Notes:
+       - Results are content-addressed by the parsed parameters and the code version
+         (see `result_store.result_key`): a stored result is copied into `results_geom/`
+         without generating anything, and new results are stored for later runs.
+       - The bulk lattice is only built on a store miss.
    """
 
-   if (inp.gen_graphene):          graphene(inp)
-   if (inp.gen_sphere):            sphere(inp)
-   if (inp.gen_sphere_core_shell): sphere_core_shell(inp)
-   if (inp.gen_3d_mesh_sphere):    sphere_3d_mesh(inp)
-   if (inp.gen_rod):               rod(inp)
-   if (inp.gen_rod_core_shell):    rod_core_shell(inp)
-   if (inp.gen_3d_mesh_rod):       rod_3d_mesh(inp)
-   if (inp.gen_tip):               tip(inp)
-   if (inp.gen_pyramid):           pyramid(inp)
-   if (inp.gen_pentpyramid):       pentpyramid(inp)
-   if (inp.gen_pentbipyramid):    pentbipyramid(inp)
-   if (inp.gen_cone):              cone(inp)
-   if (inp.gen_microscope):        microscope(inp)
-   if (inp.gen_icosahedra):        icosahedra(inp)
-   if (inp.gen_cto):               cto(inp)
-   if (inp.gen_idh):               idh(inp)
-   if (inp.gen_bipyramid):         bipyramid(inp)
-   if (inp.gen_pencil):            pencil(inp)
-   
-   # Creation of dimer and bowtie structures
-   if (inp.create_dimer):  tools.create_dimer(inp)
-   if (inp.create_bowtie): tools.create_bowtie(inp)
+   key = result_store.result_key(inp)
+   if result_store.restore(key, inp): return
+
+   parsed = result_store.normalized_parameters(inp)
+
+   # Create bulk lattice dynamically
+   if inp.create_bulk and inp.bulk_xyz is None:
+      if inp.gen_graphene: create_bulk_graphene(inp)
+      else:                create_bulk_metal(inp)
+
+   with output.record_outputs() as outputs:
+      if (inp.gen_graphene):          graphene(inp)
+      if (inp.gen_sphere):            sphere(inp)
+      if (inp.gen_sphere_core_shell): sphere_core_shell(inp)
+      if (inp.gen_3d_mesh_sphere):    sphere_3d_mesh(inp)
+      if (inp.gen_rod):               rod(inp)
+      if (inp.gen_rod_core_shell):    rod_core_shell(inp)
+      if (inp.gen_3d_mesh_rod):       rod_3d_mesh(inp)
+      if (inp.gen_tip):               tip(inp)
+      if (inp.gen_pyramid):           pyramid(inp)
+      if (inp.gen_pentpyramid):       pentpyramid(inp)
+      if (inp.gen_pentbipyramid):    pentbipyramid(inp)
+      if (inp.gen_cone):              cone(inp)
+      if (inp.gen_microscope):        microscope(inp)
+      if (inp.gen_icosahedra):        icosahedra(inp)
+      if (inp.gen_cto):               cto(inp)
+      if (inp.gen_idh):               idh(inp)
+      if (inp.gen_bipyramid):         bipyramid(inp)
+      if (inp.gen_pencil):            pencil(inp)
+
+      # Creation of dimer and bowtie structures
+      if (inp.create_dimer):  tools.create_dimer(inp, inp.mol_output)
+      if (inp.create_bowtie): tools.create_bowtie(inp, inp.mol_output)
+
+   result_store.record(key, inp, parsed, outputs)
+
+# -------------------------------------------------------------------------------------
+def save_geom(inp, mol):
+   """
+   Saves a generated geometry, or keeps it in memory as the unit of a dimer or bowtie.
+
+   Args:
+       inp (input_class): An instance containing the input parameters.
+       mol (molecule): The generated geometry, named `inp.xyz_output`.
+
+   Returns:
+       None: Writes `results_geom/{inp.xyz_output}.xyz`, or stores the geometry in
+       `inp.mol_output` when only the assembled structure is written.
+   """
 
-   # Eliminate tmp folder containing bulk structure
-   if inp.create_ase_bulk: shutil.rmtree(inp.tmp_folder)
+   if (inp.create_dimer or inp.create_bowtie):
+      inp.mol_output = mol
+   else:
+      output.print_geom(mol, inp.xyz_output)
 # -------------------------------------------------------------------------------------
 def graphene(inp):
    """
@@ -66,9 +94,9 @@ def graphene(inp):
    general.create_results_geom()
    #out_log = output.logfile_init()
  
-   # Initialize bulk "molecule" and read geometry
+   # Initialize bulk "molecule" from the generated lattice
    mol = molecule.molecule()
-   mol.read_geom(inp.geom_file,False)
+   mol.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
    # Pick only atoms within the defined graphene geometry 
    if inp.graphene_structure=='rib':      mol.filter_xyz_graphene_to_ribbon(inp)
@@ -88,7 +116,7 @@ def graphene(inp):
    if inp.graphene_structure=='ring':     inp.xyz_output = f'graphene_ring_out_{inp.radius_out}_in_{inp.radius_in}'
    if inp.graphene_structure=='triangle': inp.xyz_output = f'graphene_triangle_{inp.graphene_edge_type}_{inp.side_length}'
 
-   output.print_geom(mol, inp.xyz_output)
+   save_geom(inp, mol)
 # -------------------------------------------------------------------------------------
 def sphere(inp):
    """
@@ -106,9 +134,12 @@ def sphere(inp):
    general.create_results_geom()
    #out_log = output.logfile_init()
  
-   # Initialize bulk "molecule" and read geometry
+   # Initialize bulk "molecule" from the generated lattice
    mol = molecule.molecule()
-   mol.read_geom(inp.geom_file,False)
+   mol.set_geom(inp.bulk_atoms, inp.bulk_xyz)
+
+   # Radius sweep: every sphere is cut from the lattice of the largest one
+   if inp.sweep_radii: return(sphere_sweep(inp, mol))
 
    # Pick only atoms within the defined sphere 
    mol.filter_xyz_in_sphere(inp)
@@ -118,7 +149,60 @@ def sphere(inp):
 
    # Save filtered geometry
    inp.xyz_output = f'sphere_{inp.atomtype}_r_{inp.radius}{inp.alloy_string}'
-   output.print_geom(mol, inp.xyz_output)
+   save_geom(inp, mol)
+# -------------------------------------------------------------------------------------
+def sphere_sweep(inp, bulk):
+   """
+   Generates a series of spherical nanoparticles, one per radius in `inp.sweep_radii`.
+
+   Args:
+       inp (input_class): An instance containing the input parameters.
+       bulk (molecule): Lattice generated for the largest radius.
+
+   Returns:
+       None: Saves one sphere geometry per radius.
+
+   Notes:
+       - The lattice atoms are sorted once by distance from `inp.sphere_center`, so each
+         sphere is a prefix of that order, restored to lattice order before printing.
+       - Standalone FCC/BCC blocks whose center point sits at the origin hold the same
+         lattice points, so only the sign of zero coordinates is reset
+         (see `lattice.bulk_center_point`). HCP blocks whose registration differs are
+         regenerated for that radius.
+   """
+
+   x, y, z = bulk.xyz[0, :], bulk.xyz[1, :], bulk.xyz[2, :]
+   dist2 = ((x-inp.sphere_center[0])**2 +
+            (y-inp.sphere_center[1])**2 +
+            (z-inp.sphere_center[2])**2)
+
+   order = np.argsort(dist2, kind='stable')
+   dist2 = dist2[order]
+
+   origin_bulk = lattice.bulk_center_point(*get_bulk_lattice(inp))
+
+   for radius in inp.sweep_radii:
+      inp.radius = radius
+      origin = lattice.bulk_center_point(*get_bulk_lattice(inp))
+
+      mol = molecule.molecule()
+      if not origin_bulk.any() and not origin.any():
+         selection = np.sort(order[:np.searchsorted(dist2, radius**2, side='right')])
+         mol.xyz = bulk.xyz
+         mol.keep_atoms(selection, inp.atomtype)
+         for i in range(3): mol.xyz[i, mol.xyz[i] == 0.0] = origin[i]
+         mol.mark_modified()
+      else:
+         create_bulk_metal(inp)
+         mol.set_geom(inp.bulk_atoms, inp.bulk_xyz)
+         mol.filter_xyz_in_sphere(inp)
+
+      # Alloy
+      if inp.alloy: mol.create_alloy(inp)
+
+      # Save filtered geometry
+      inp.xyz_output = f'sphere_{inp.atomtype}_r_{inp.radius}{inp.alloy_string}'
+      save_geom(inp, mol)
 # -------------------------------------------------------------------------------------
 def sphere_core_shell(inp):
    """
@@ -136,50 +220,29 @@ def sphere_core_shell(inp):
    general.create_results_geom()
    #out_log = output.logfile_init()
 
-   # Extract merge cutoff 
-   param = parameters.parameters()
-   inp.merge_cutoff = param.min_dist.get(inp.atomtype)
- 
-   # Initialize bulk "molecule" and read geometry
-   mol_out = molecule.molecule()
-   mol_out = mol_out.read_geom(inp.geom_file,False)
-
-   # Pick only atoms within the defined sphere 
-   inp.radius   = inp.radius_out
-   inp.atomtype = inp.atomtype_out
-
-   mol_out.filter_xyz_in_sphere(inp)
+   # Initialize bulk "molecule" from the generated lattice
+   mol_core_shell = molecule.molecule()
+   mol_core_shell.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
-   # Copy mol_out as initial guess, change atomtype, and create smaller sphere
-   mol_in = copy.deepcopy(mol_out)
-   mol_in.change_atomtype(inp.atomtype_in)
-
-   inp.radius   = inp.radius_in
-   inp.atomtype = inp.atomtype_in
+   # Pick atoms within the outer sphere and label core (0) and shell (1) atoms
+   solids = [shape.shape.sphere(inp.sphere_center, inp.radius_in),
+             shape.shape.sphere(inp.sphere_center, inp.radius_out)]
 
-   mol_in.filter_xyz_in_sphere(inp)
-
-   # Create shell by subtracting core geometry
-   mol_shell = tools.subtract_geoms(inp,mol_in,mol_out)
+   mol_core_shell.filter_xyz_in_regions(solids, [inp.atomtype_in, inp.atomtype_out])
 
    # Alloy core and shell
    if inp.alloy: 
       inp.alloy_string = f"_alloy_{inp.alloy_perc}_perc"
 
-      inp.atomtype = inp.atomtype_out
       inp.atomtype_alloy = inp.atomtype_in
-      mol_shell.create_alloy(inp)
+      mol_core_shell.create_alloy(inp, np.flatnonzero(mol_core_shell.regions == 1))
 
-      inp.atomtype = inp.atomtype_in
       inp.atomtype_alloy = inp.atomtype_out
-      mol_in.create_alloy(inp)
-
-   # Merge to create core-shell
-   mol_core_shell = tools.merge_geoms(inp,mol_in,mol_shell)
+      mol_core_shell.create_alloy(inp, np.flatnonzero(mol_core_shell.regions == 0))
 
    # Save filtered geometry
    inp.xyz_output = f'sphere_core_{inp.atomtype_in}_r_{inp.radius_in}_shell_{inp.atomtype_out}_r_{inp.radius_out}{inp.alloy_string}'
-   output.print_geom(mol_core_shell, inp.xyz_output)
+   save_geom(inp, mol_core_shell)
 # -------------------------------------------------------------------------------------
 def sphere_3d_mesh(inp):
    """ 
@@ -198,6 +261,7 @@ def sphere_3d_mesh(inp):
    #out_log = output.logfile_init()
 
    # Initialize Gmsh
+   import gmsh
    gmsh.initialize([str(inp.radius), str(inp.mesh_size), str(inp.mesh_output)])
    gmsh.model.add("sphere")
 
@@ -215,7 +279,7 @@ def sphere_3d_mesh(inp):
 
    # Save in MeshFormat 2.2
    gmsh.option.setNumber("Mesh.MshFileVersion", 2.2)
-   gmsh.write(inp.mesh_output)
+   with output.atomic_path(inp.mesh_output) as mesh_file: gmsh.write(mesh_file)
 
    # Finalize Gmsh
    gmsh.finalize()
@@ -240,38 +304,19 @@ def rod(inp):
    param = parameters.parameters()
    inp.merge_cutoff = param.min_dist.get(inp.atomtype)
  
-   # Initialize bulk "molecule" and read geometry
-   mol_sphere_1 = molecule.molecule()
-   mol_sphere_2 = molecule.molecule()
-   mol_cylinder = molecule.molecule()
-
-   mol_sphere_1.read_geom(inp.geom_file,False)
-   mol_sphere_2.read_geom(inp.geom_file,False)
-   mol_cylinder.read_geom(inp.geom_file,False)
-
-   # Create individual sphere at the extremes of the rods 
-   tools.determine_sphere_center(inp,'+')
-   mol_sphere_1.filter_xyz_in_sphere(inp)
-
-   tools.determine_sphere_center(inp,'-')
-   mol_sphere_2.filter_xyz_in_sphere(inp)
+   # Initialize bulk "molecule" from the generated lattice
+   mol_rod = molecule.molecule()
+   mol_rod.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
-   # Create cylinder
-   mol_cylinder.filter_xyz_in_cylinder(inp)
-
-   # -------------------------------------
-   # Merge cylinder and spheres geometries
-   # -------------------------------------
-
-   mol_tmp = tools.merge_geoms(inp,mol_sphere_1,mol_sphere_2)
-   mol_rod = tools.merge_geoms(inp,mol_cylinder,mol_tmp)
+   # Pick atoms within the cylinder or the spheres at the extremes of the rod
+   mol_rod.filter_xyz_in_shape(inp, shape.shape.rod(inp.main_axis, inp.rod_length, inp.rod_width))
 
    # Alloy
    if inp.alloy: mol_rod.create_alloy(inp)
 
    # Save filtered geometry
    inp.xyz_output = f'rod_{inp.atomtype}_{inp.main_axis.upper()}_l_{inp.rod_length}_w_{inp.rod_width}{inp.alloy_string}'
-   output.print_geom(mol_rod, inp.xyz_output)
+   save_geom(inp, mol_rod)
 # -------------------------------------------------------------------------------------
 def rod_core_shell(inp):
    """
@@ -289,92 +334,29 @@ def rod_core_shell(inp):
    general.create_results_geom()
    #out_log = output.logfile_init()
 
-   # Extract merge cutoff 
-   param = parameters.parameters()
-   inp.merge_cutoff = param.min_dist.get(inp.atomtype)
- 
-   # Initialize bulk "molecule" and read geometry
-   mol_sphere_1 = molecule.molecule()
-   mol_sphere_2 = molecule.molecule()
-   mol_cylinder = molecule.molecule()
-
-   mol_sphere_1.read_geom(inp.geom_file,False)
-   mol_sphere_2.read_geom(inp.geom_file,False)
-   mol_cylinder.read_geom(inp.geom_file,False)
-
-   # ----------------------- #
-   # --------- Out --------- #
-
-   # Populate input class
-   inp.rod_length = inp.rod_length_out
-   inp.rod_width = inp.rod_width_out
-
-   inp.atomtype = inp.atomtype_out
-
-   # Create individual sphere at the extremes of the rods 
-   tools.determine_sphere_center(inp,'+')
-   mol_sphere_1.filter_xyz_in_sphere(inp)
-
-   tools.determine_sphere_center(inp,'-')
-   mol_sphere_2.filter_xyz_in_sphere(inp)
+   # Initialize bulk "molecule" from the generated lattice
+   mol_core_shell = molecule.molecule()
+   mol_core_shell.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
-   # Create cylinder
-   mol_cylinder.filter_xyz_in_cylinder(inp)
+   # Pick atoms within the outer rod and label core (0) and shell (1) atoms
+   solids = [shape.shape.rod(inp.main_axis, inp.rod_length_in, inp.rod_width_in),
+             shape.shape.rod(inp.main_axis, inp.rod_length_out, inp.rod_width_out)]
 
-   # Merge cylinder and spheres geometries
-   mol_tmp = tools.merge_geoms(inp,mol_sphere_1,mol_sphere_2)
-   mol_out = tools.merge_geoms(inp,mol_cylinder,mol_tmp)
-
-   # ---------------------- #
-   # --------- In --------- #
-
-   # Copy mol_out as initial guess, change atomtype, and populate input class
-   mol_sphere_1 = copy.deepcopy(mol_out)
-   mol_sphere_1.change_atomtype(inp.atomtype_in)
-
-   mol_sphere_2 = copy.deepcopy(mol_out)
-   mol_sphere_2.change_atomtype(inp.atomtype_in)
-
-   inp.rod_length = inp.rod_length_in
-   inp.rod_width = inp.rod_width_in
-
-   inp.atomtype = inp.atomtype_in
-
-   # Create individual sphere at the extremes of the rods 
-   tools.determine_sphere_center(inp,'+')
-   mol_sphere_1.filter_xyz_in_sphere(inp)
-
-   tools.determine_sphere_center(inp,'-')
-   mol_sphere_2.filter_xyz_in_sphere(inp)
-
-   # Create cylinder
-   mol_cylinder.filter_xyz_in_cylinder(inp)
-
-   # Merge cylinder and spheres geometries
-   mol_tmp = tools.merge_geoms(inp,mol_sphere_1,mol_sphere_2)
-   mol_in = tools.merge_geoms(inp,mol_cylinder,mol_tmp)
-
-   # Create shell by subtracting core geometry
-   mol_shell = tools.subtract_geoms(inp,mol_in,mol_out)
+   mol_core_shell.filter_xyz_in_regions(solids, [inp.atomtype_in, inp.atomtype_out])
 
    # Alloy core and shell
    if inp.alloy: 
       inp.alloy_string = f"_alloy_{inp.alloy_perc}_perc"
 
-      inp.atomtype = inp.atomtype_out
       inp.atomtype_alloy = inp.atomtype_in
-      mol_shell.create_alloy(inp)
+      mol_core_shell.create_alloy(inp, np.flatnonzero(mol_core_shell.regions == 1))
 
-      inp.atomtype = inp.atomtype_in
       inp.atomtype_alloy = inp.atomtype_out
-      mol_in.create_alloy(inp)
-
-   # Merge to create core-shell
-   mol_core_shell = tools.merge_geoms(inp,mol_in,mol_shell)
+      mol_core_shell.create_alloy(inp, np.flatnonzero(mol_core_shell.regions == 0))
 
    # Save filtered geometry
    inp.xyz_output = f'rod_{inp.main_axis.upper()}_core_{inp.atomtype_in}_l_{inp.rod_length_in}_r_{inp.rod_width_in}_shell_{inp.atomtype_out}_l_{inp.rod_length_out}_r_{inp.rod_width_out}_shell_{inp.atomtype_out}{inp.alloy_string}'
-   output.print_geom(mol_core_shell, inp.xyz_output)
+   save_geom(inp, mol_core_shell)
 # -------------------------------------------------------------------------------------
 def rod_3d_mesh(inp):
    """ 
@@ -393,6 +375,7 @@ def rod_3d_mesh(inp):
    #out_log = output.logfile_init()
 
    # Initialize Gmsh
+   import gmsh
    gmsh.initialize([])
    gmsh.model.add("rod")
 
@@ -438,7 +421,7 @@ def rod_3d_mesh(inp):
 
    # Save mesh in MeshFormat 2.2
    gmsh.option.setNumber("Mesh.MshFileVersion", 2.2)
-   gmsh.write(inp.mesh_output)
+   with output.atomic_path(inp.mesh_output) as mesh_file: gmsh.write(mesh_file)
 
    # Finalize Gmsh
    gmsh.finalize()
@@ -459,9 +442,9 @@ def tip(inp):
    general.create_results_geom()
    #out_log = output.logfile_init()
  
-   # Initialize bulk "molecule" and read geometry
+   # Initialize bulk "molecule" from the generated lattice
    mol = molecule.molecule()
-   mol.read_geom(inp.geom_file,False)
+   mol.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
    # Pick only atoms within the defined paraboloid
    mol.filter_xyz_in_elliptic_paraboloid(inp)
@@ -471,7 +454,7 @@ def tip(inp):
 
    # Save filtered geometry
    inp.xyz_output = f'tip_{inp.atomtype}_elliptic_paraboloid_a-{inp.elliptic_parabola_a}_b-{inp.elliptic_parabola_b}_zmin-{inp.z_min}_zmax-{inp.z_max}{inp.alloy_string}'
-   output.print_geom(mol, inp.xyz_output)
+   save_geom(inp, mol)
 # -------------------------------------------------------------------------------------
 def pyramid(inp):
    """
@@ -489,9 +472,9 @@ def pyramid(inp):
    general.create_results_geom()
    #out_log = output.logfile_init()
 
-   # Initialize bulk "molecule" and read geometry
+   # Initialize bulk "molecule" from the generated lattice
    mol = molecule.molecule()
-   mol.read_geom(inp.geom_file, False)
+   mol.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
    # Define vertices with respect to the center (C[0,0,0]) of the XY-plane base
    #
@@ -530,7 +513,7 @@ def pyramid(inp):
 
    # Save filtered geometry
    inp.xyz_output = f'pyramid_{inp.atomtype}_length-{inp.side_length}_zmin-{inp.z_min}_zmax-{inp.z_max}{inp.alloy_string}'
-   output.print_geom(mol, inp.xyz_output)
+   save_geom(inp, mol)
 # -------------------------------------------------------------------------------------
 def pentpyramid(inp):
    """
@@ -552,7 +535,7 @@ def pentpyramid(inp):
    inp.merge_cutoff = param.min_dist.get(inp.atomtype)
 
    mol = molecule.molecule()
-   mol.read_geom(inp.geom_file, False)
+   mol.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
    nearest_distance = param.min_dist.get(inp.atomtype)
    z_max_half = inp.z_max / 2.0
@@ -604,10 +587,7 @@ def pentpyramid(inp):
    keep_idx = np.where(keep_mask)[0]
    mol.xyz = mol.xyz[:, keep_idx]
    mol.nAtoms = len(keep_idx)
-   mol.atoms = [inp.atomtype] * mol.nAtoms
-   mol.xyz_center = np.mean(mol.xyz, axis=1)
-   mol.xyz_max = np.max(mol.xyz, axis=1)
-   mol.xyz_min = np.min(mol.xyz, axis=1)
+   mol.change_atomtype(inp.atomtype)
 
    if mol.nAtoms == 0:
       output.error("Pentagonal pyramid generation produced no atoms. Increase z_max or base_width.")
@@ -631,7 +611,7 @@ def pentpyramid(inp):
 
    # Save filtered geometry
    inp.xyz_output = f'pentpyramid_{inp.atomtype}_width-{inp.base_width}_zmax-{inp.z_max}{inp.alloy_string}'
-   output.print_geom(mol, inp.xyz_output)
+   save_geom(inp, mol)
 # -------------------------------------------------------------------------------------
 def bipyramid(inp):
    """
@@ -654,9 +634,9 @@ def bipyramid(inp):
    lattice_constant = param.lattice_constant.get(inp.atomtype)
    inp.merge_cutoff = param.min_dist.get(inp.atomtype)
 
-   # Initialize bulk "molecule" and read geometry
+   # Initialize bulk "molecule" from the generated lattice
    mol = molecule.molecule()
-   mol.read_geom(inp.geom_file, False)
+   mol.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
    # Define vertices with respect to the center (C[0,0,0]) of the XY-plane base
    #
@@ -730,7 +710,7 @@ def bipyramid(inp):
    inp.bipyramid_width = inp.bipyramid_width * 2.0  # Make it match with initial definition 
    inp.bipyramid_length = inp.bipyramid_length * 2.0  # Make it match with initial definition
    inp.xyz_output = f'bipyramid_{inp.atomtype}_width-{inp.bipyramid_width}_length-{inp.bipyramid_length}{inp.alloy_string}'
-   output.print_geom(mol, inp.xyz_output)
+   save_geom(inp, mol)
 # -------------------------------------------------------------------------------------
 def pentbipyramid(inp):
    """
@@ -757,33 +737,19 @@ def pentbipyramid(inp):
    # Build outer rod (atomtype_out) — same as pencil
    # -----------------------------------------------
 
-   mol_sphere_1 = molecule.molecule()
-   mol_sphere_2 = molecule.molecule()
-   mol_cylinder  = molecule.molecule()
-
-   mol_sphere_1.read_geom(inp.geom_file, False)
-   mol_sphere_2.read_geom(inp.geom_file, False)
-   mol_cylinder.read_geom(inp.geom_file, False)
+   mol_out = molecule.molecule()
+   mol_out.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
    inp.atomtype = inp.atomtype_out
 
-   tools.determine_sphere_center(inp, '+')
-   mol_sphere_1.filter_xyz_in_sphere(inp)
-
-   tools.determine_sphere_center(inp, '-')
-   mol_sphere_2.filter_xyz_in_sphere(inp)
-
-   mol_cylinder.filter_xyz_in_cylinder(inp)
-
-   mol_tmp = tools.merge_geoms(inp, mol_sphere_1, mol_sphere_2)
-   mol_out  = tools.merge_geoms(inp, mol_cylinder, mol_tmp)
+   mol_out.filter_xyz_in_shape(inp, shape.shape.rod(inp.main_axis, inp.rod_length, inp.rod_width))
 
    # -----------------------------------------------
    # Build inner core (atomtype_in) — bulk lattice positions, rounded pentpyramid shape
    # -----------------------------------------------
 
    mol_in = molecule.molecule()
-   mol_in.read_geom(inp.geom_file, False)
+   mol_in.set_geom(inp.bulk_atoms, inp.bulk_xyz)
    mol_in.change_atomtype(inp.atomtype_in)
    inp.atomtype = inp.atomtype_in
 
@@ -837,10 +803,7 @@ def pentbipyramid(inp):
    keep_idx = np.where(keep_mask)[0]
    mol_in.xyz = mol_in.xyz[:, keep_idx]
    mol_in.nAtoms = len(keep_idx)
-   mol_in.atoms = [inp.atomtype_in] * mol_in.nAtoms
-   mol_in.xyz_center = np.mean(mol_in.xyz, axis=1)
-   mol_in.xyz_max = np.max(mol_in.xyz, axis=1)
-   mol_in.xyz_min = np.min(mol_in.xyz, axis=1)
+   mol_in.change_atomtype(inp.atomtype_in)
 
    # Align base to z=0 and shift outer rod by same amount
    z_min = mol_in.xyz_min[-1]
@@ -881,7 +844,7 @@ def pentbipyramid(inp):
 
    # Save geometry
    inp.xyz_output = f'pentbipyramid_{inp.pentbipyramid_type}_core_{inp.atomtype_in}_shell_{inp.atomtype_out}_in_width-{inp.base_width}_in_zmax-{inp.z_max}_out_width-{inp.rod_width}_out_length-{inp.rod_length}{inp.alloy_string}'
-   output.print_geom(mol_core_shell, inp.xyz_output)
+   save_geom(inp, mol_core_shell)
 # -------------------------------------------------------------------------------------
 def cone(inp):
    """
@@ -899,9 +862,9 @@ def cone(inp):
    general.create_results_geom()
    #out_log = output.logfile_init()
 
-   # Initialize bulk "molecule" and read geometry
+   # Initialize bulk "molecule" from the generated lattice
    mol = molecule.molecule()
-   mol.read_geom(inp.geom_file, False)
+   mol.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
    # Pick only atoms within the defined cone
    mol.filter_xyz_in_cone(inp)
@@ -914,7 +877,7 @@ def cone(inp):
 
    # Save filtered geometry
    inp.xyz_output = f'cone_{inp.atomtype}_radius-{inp.radius}_zmin-{inp.z_min}_zmax-{inp.z_max}{inp.alloy_string}'
-   output.print_geom(mol, inp.xyz_output)
+   save_geom(inp, mol)
 # -------------------------------------------------------------------------------------
 def microscope(inp):
    """ 
@@ -943,7 +906,7 @@ def microscope(inp):
 
    inp.z_max = inp.z_max_paraboloid
    mol_paraboloid = molecule.molecule()
-   mol_paraboloid.read_geom(inp.geom_file,False)
+   mol_paraboloid.set_geom(inp.bulk_atoms, inp.bulk_xyz)
    mol_paraboloid.filter_xyz_in_elliptic_paraboloid(inp)
 
    # ------------------------------------------
@@ -952,7 +915,7 @@ def microscope(inp):
 
    inp.z_max = inp.z_max_pyramid
    mol_pyramid = molecule.molecule()
-   mol_pyramid.read_geom(inp.geom_file, False)
+   mol_pyramid.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
    centers = {
        "center_1": [inp.side_length / 2.0, inp.side_length / 2.0, 0.0],
@@ -996,7 +959,7 @@ def microscope(inp):
    if inp.alloy: mol_microscope.create_alloy(inp)
 
    inp.xyz_output = f'microscope_{inp.atomtype}_parabola_{inp.z_max_paraboloid}_{inp.elliptic_parabola_a}_{inp.elliptic_parabola_b}_pyramid_{inp.z_max_pyramid}_{inp.side_length}{inp.alloy_string}'
-   output.print_geom(mol_microscope, inp.xyz_output)
+   save_geom(inp, mol_microscope)
 # -------------------------------------------------------------------------------------
 def icosahedra(inp):
    """ 
@@ -1021,12 +984,23 @@ def icosahedra(inp):
    mol = molecule.molecule()
    mol.create_icosahedra(inp)
 
-   # Alloy
-   if inp.alloy: mol.create_alloy(inp)
+   # Radius sweep: ASE grows icosahedra shell by shell, so smaller ones are prefixes
+   for radius in inp.sweep_radii or [inp.radius]:
+      inp.radius = radius
+      if inp.sweep_radii:
+         natoms = molecule.molecule.icosahedra_natoms(molecule.molecule.icosahedra_noshells(inp))
+         mol_radius = molecule.molecule()
+         mol_radius.xyz = mol.xyz
+         mol_radius.keep_atoms(np.arange(natoms), inp.atomtype)
+      else:
+         mol_radius = mol
 
-   # Save filtered geometry
-   inp.xyz_output = f'icosahedron_{inp.atomtype}_r_{inp.radius}{inp.alloy_string}'
-   output.print_geom(mol, inp.xyz_output)
+      # Alloy
+      if inp.alloy: mol_radius.create_alloy(inp)
+
+      # Save filtered geometry
+      inp.xyz_output = f'icosahedron_{inp.atomtype}_r_{inp.radius}{inp.alloy_string}'
+      save_geom(inp, mol_radius)
 # -------------------------------------------------------------------------------------
 def cto(inp):
    """ 
@@ -1047,16 +1021,21 @@ def cto(inp):
    # Check FCC lattice on selected atom type (requirement)
    general.check_FCC(inp.atomtype,'cuboctahedron')
  
-   # Initialize bulk "molecule" and create cuboctahedron with ASE
-   mol = molecule.molecule()
-   mol.create_cuboctahedra(inp)
-
-   # Alloy
-   if inp.alloy: mol.create_alloy(inp)
-
-   # Save filtered geometry
-   inp.xyz_output = f'cuboctahedron_{inp.atomtype}_r_{inp.radius}{inp.alloy_string}'
-   output.print_geom(mol, inp.xyz_output)
+   # Create cuboctahedra with ASE (radii sharing the ASE parameters share the cluster)
+   clusters = {}
+   for radius in inp.sweep_radii or [inp.radius]:
+      inp.radius = radius
+      key = molecule.molecule.cuboctahedra_parameters(inp)
+      if key not in clusters:
+         clusters[key] = molecule.molecule().create_cuboctahedra(inp)
+      mol = copy.deepcopy(clusters[key]) if inp.alloy else clusters[key]
+
+      # Alloy
+      if inp.alloy: mol.create_alloy(inp)
+
+      # Save filtered geometry
+      inp.xyz_output = f'cuboctahedron_{inp.atomtype}_r_{inp.radius}{inp.alloy_string}'
+      save_geom(inp, mol)
 # -------------------------------------------------------------------------------------
 def idh(inp):
    """ 
@@ -1077,16 +1056,21 @@ def idh(inp):
    # Check FCC lattice on selected atom type (requirement)
    general.check_FCC(inp.atomtype,'decahedron')
  
-   # Initialize bulk "molecule" and create decahedron with ASE
-   mol = molecule.molecule()
-   mol.create_decahedra(inp)
-
-   # Alloy
-   if inp.alloy: mol.create_alloy(inp)
-
-   # Save filtered geometry
-   inp.xyz_output = f'decahedron_{inp.atomtype}_r_{inp.radius}{inp.alloy_string}'
-   output.print_geom(mol, inp.xyz_output)
+   # Create decahedra with ASE (radii sharing the ASE parameters share the cluster)
+   clusters = {}
+   for radius in inp.sweep_radii or [inp.radius]:
+      inp.radius = radius
+      key = molecule.molecule.decahedra_size(inp)
+      if key not in clusters:
+         clusters[key] = molecule.molecule().create_decahedra(inp)
+      mol = copy.deepcopy(clusters[key]) if inp.alloy else clusters[key]
+
+      # Alloy
+      if inp.alloy: mol.create_alloy(inp)
+
+      # Save filtered geometry
+      inp.xyz_output = f'decahedron_{inp.atomtype}_r_{inp.radius}{inp.alloy_string}'
+      save_geom(inp, mol)
 # -------------------------------------------------------------------------------------
 def pencil(inp):
    """
@@ -1111,14 +1095,9 @@ def pencil(inp):
    lattice_constant = param.lattice_constant.get(inp.atomtype)
    inp.merge_cutoff = param.min_dist.get(inp.atomtype)
 
-   # Initialize bulk "molecule" and read geometry
-   mol_sphere_1 = molecule.molecule()
-   mol_sphere_2 = molecule.molecule()
-   mol_cylinder = molecule.molecule()
-
-   mol_sphere_1.read_geom(inp.geom_file,False)
-   mol_sphere_2.read_geom(inp.geom_file,False)
-   mol_cylinder.read_geom(inp.geom_file,False)
+   # Initialize bulk "molecule" from the generated lattice
+   mol_out = molecule.molecule()
+   mol_out.set_geom(inp.bulk_atoms, inp.bulk_xyz)
 
    # ----------------------- #
    # --------- Out --------- #
@@ -1134,26 +1113,15 @@ def pencil(inp):
    if (abs(inp.rod_width - inp.bipyramid_width*2.0) < minimum_coating):
       inp.rod_width = inp.bipyramid_width*2.0 + minimum_coating
 
-   # Create individual sphere at the extremes of the rods 
-   tools.determine_sphere_center(inp,'+')
-   mol_sphere_1.filter_xyz_in_sphere(inp)
-
-   tools.determine_sphere_center(inp,'-')
-   mol_sphere_2.filter_xyz_in_sphere(inp)
-
-   # Create cylinder
-   mol_cylinder.filter_xyz_in_cylinder(inp)
-
-   # Merge cylinder and spheres geometries
-   mol_tmp = tools.merge_geoms(inp,mol_sphere_1,mol_sphere_2)
-   mol_out = tools.merge_geoms(inp,mol_cylinder,mol_tmp)
+   # Pick atoms within the cylinder or the spheres at the extremes of the rod
+   mol_out.filter_xyz_in_shape(inp, shape.shape.rod(inp.main_axis, inp.rod_length, inp.rod_width))
 
    # ---------------------- #
    # --------- In --------- #
 
    # Copy mol_out as initial guess, change atomtype, and populate input class
    mol_in = molecule.molecule()
-   mol_in.read_geom(inp.geom_file,False)
+   mol_in.set_geom(inp.bulk_atoms, inp.bulk_xyz)
    mol_in.change_atomtype(inp.atomtype_in)
    inp.atomtype = inp.atomtype_in
 
@@ -1251,18 +1219,45 @@ def pencil(inp):
    inp.bipyramid_width = inp.bipyramid_width * 2.0  # Make it match with initial definition 
    inp.bipyramid_length = inp.bipyramid_length * 2.0  # Make it match with initial definition
    inp.xyz_output = f'pencil_{inp.pencil_type}_core_{inp.atomtype_in}_shell_{inp.atomtype_out}_in_width-{inp.bipyramid_width}_in_length-{inp.bipyramid_length}_out_width_{inp.rod_width}_out_length-{inp.rod_length}{inp.alloy_string}'
-   output.print_geom(mol_core_shell, inp.xyz_output)
+   save_geom(inp, mol_core_shell)
+# -------------------------------------------------------------------------------------
+def create_bulk_metal(inp):
+   """
+   Generates the bulk metal lattice in memory.
+
+   Args:
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       None: Stores the bulk labels and coordinates in `inp.bulk_atoms` and `inp.bulk_xyz`.
+
+   Notes:
+       - The lattice is built analytically by `lattice.py`; no temporary files are written.
+       - `get_layers` fixes the reference block (and so the lattice origin), while only the
+         points inside `get_shape_region` are generated.
+       - Blocks are kept in the persistent bulk cache (see `bulk_cache.metal_bulk`), so
+         repeated generations of the same material skip the lattice construction.
+   """
+
+   atomic_arrangement, lattice_constant, layers = get_bulk_lattice(inp)
+
+   # Only lattice points inside the target shape are enumerated
+   region = get_shape_region(inp)
+
+   # Create bulk coordinates centered at (0,0,0)
+   inp.bulk_xyz = bulk_cache.metal_bulk(inp.atomtype, atomic_arrangement, lattice_constant, layers, region)
+
+   inp.bulk_atoms = [inp.atomtype.capitalize()] * inp.bulk_xyz.shape[1]
 # -------------------------------------------------------------------------------------
-def create_ase_bulk_metal(inp, base_dir):
+def get_bulk_lattice(inp):
    """
-   Creates a temporary bulk metal XYZ file using ASE.
+   Lattice parameters of the bulk block generated by `create_bulk_metal`.
 
    Args:
        inp (input_class): An instance containing input parameters.
-       base_dir (str): Absolute path to the working directory.
 
    Returns:
-       None: Saves the generated bulk metal geometry.
+       tuple: (atomic arrangement, lattice constant, layers) for `lattice.py`.
    """
 
    # Extract lattice constant and atomic arrangement from parameters dictionary
@@ -1270,25 +1265,16 @@ def create_ase_bulk_metal(inp, base_dir):
    lattice_constant = param.lattice_constant.get(inp.atomtype)
    atomic_arrangement = param.atomic_arrangement.get(inp.atomtype)
 
-   # Create tmp folder
-   inp.tmp_folder = os.path.join(base_dir,'tmp')
-   if os.path.exists(inp.tmp_folder): shutil.rmtree(inp.tmp_folder)
-   os.mkdir(inp.tmp_folder)
+   # HCP layers are counted with the in-plane lattice constant a
+   if atomic_arrangement == 'HCP' and isinstance(lattice_constant, tuple):
+      layers = get_layers(inp,lattice_constant[0])
+   else:
+      layers = get_layers(inp,lattice_constant)
 
-
-   # Determine minimum layers required by ASE
-   layers = get_layers(inp,lattice_constant)
-
-   # Create atomic structure and write on tmp/tmp_bulk.xyz
-   surfaces = [(1, 0, 0), (0, 1, 0), (0, 0, 1)]
-   if atomic_arrangement=='FCC': 
-      atoms = FaceCenteredCubic(inp.atomtype.capitalize(), surfaces, layers, latticeconstant=lattice_constant)
-   elif atomic_arrangement=='BCC':
+   if atomic_arrangement=='BCC':
       layers = [int(x * 1.5) for x in layers] # Extra layers required for BCC
-      atoms = BodyCenteredCubic(inp.atomtype.capitalize(), surfaces, layers, latticeconstant=lattice_constant)
 
-   inp.geom_file = os.path.join(inp.tmp_folder,'tmp_bulk.xyz')
-   write(inp.geom_file, atoms)
+   return atomic_arrangement, lattice_constant, layers
 # -------------------------------------------------------------------------------------
 def get_layers(inp, lattice_constant):
    """
@@ -1393,28 +1379,93 @@ def get_layers(inp, lattice_constant):
        L            = 1.5 * structure_scaling * inp.side_length
        return [int(L / lattice_constant) + 2, int(L / lattice_constant) + 2, int((H_paraboloid + H_pyramid) / lattice_constant) + 2]
 # -------------------------------------------------------------------------------------
-def create_ase_bulk_graphene(inp, base_dir):
+def get_shape_region(inp):
+   """
+   Returns the region of space that the requested nanoparticle can occupy in the bulk frame.
+
+   Args:
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       tuple or None: Region for `lattice.cubic_bulk` / `lattice.hcp_bulk` (see `lattice.box_region`),
+           or None to generate the whole bulk block.
+
+   Notes:
+       - Regions only need to enclose every atom the shape filters can keep; the filters
+         themselves still decide which atoms belong to the particle.
+       - Composite particles use the union of the regions of their parts.
+   """
+
+   param = parameters.parameters()
+
+   def pentagonal_core_region(atomtype):
+      # Rounded pentagonal layers (see pentpyramid) never exceed the base/cap widths
+      nearest_distance = param.min_dist.get(atomtype)
+      radius = max(inp.base_width + 2.5 * nearest_distance, 10.0) + nearest_distance
+      return lattice.box_region([-radius, -radius, 0.0], [radius, radius, inp.z_max / 2.0])
+
+   def pentagonal_pyramid_region():
+      R = inp.bipyramid_width
+      return lattice.box_region([-R, -R, 0.0], [R, R, inp.bipyramid_length])
+
+   def pyramid_region(side_length, z_max):
+      return lattice.box_region([-side_length / 2.0, -side_length / 2.0, 0.0], [side_length / 2.0, side_length / 2.0, z_max])
+
+   if inp.gen_sphere or inp.gen_sphere_core_shell:
+      return lattice.sphere_region(inp.sphere_center, inp.radius)
+
+   elif inp.gen_rod or inp.gen_rod_core_shell:
+      return lattice.capsule_region(inp.main_axis, inp.rod_length, inp.rod_width)
+
+   elif inp.gen_tip:
+      return lattice.paraboloid_region(inp.elliptic_parabola_a, inp.elliptic_parabola_b, inp.elliptic_parabola_c, inp.z_min, inp.z_max)
+
+   elif inp.gen_pyramid:
+      return pyramid_region(inp.side_length, inp.z_max)
+
+   elif inp.gen_pentpyramid:
+      return pentagonal_core_region(inp.atomtype)
+
+   elif inp.gen_cone:
+      return lattice.cone_region(inp.radius, inp.z_max)
+
+   elif inp.gen_microscope:
+      return lattice.union_regions(
+         lattice.paraboloid_region(inp.elliptic_parabola_a, inp.elliptic_parabola_b, inp.elliptic_parabola_c, inp.z_min, inp.z_max_paraboloid),
+         pyramid_region(inp.side_length, inp.z_max_pyramid))
+
+   elif inp.gen_bipyramid:
+      return pentagonal_pyramid_region()
+
+   elif inp.gen_pencil:
+      # The outer rod may be widened/lengthened in pencil() to keep a minimum coating
+      lattice_constant = param.lattice_constant.get(inp.atomtype)
+      minimum_coating = 3.0 * lattice_constant
+      rod_length = max(inp.rod_length, inp.bipyramid_length * 2.0 + minimum_coating)
+      rod_width  = max(inp.rod_width,  inp.bipyramid_width  * 2.0 + minimum_coating)
+      return lattice.union_regions(lattice.capsule_region(inp.main_axis, rod_length, rod_width), pentagonal_pyramid_region())
+
+   elif inp.gen_pentbipyramid:
+      return lattice.union_regions(lattice.capsule_region(inp.main_axis, inp.rod_length, inp.rod_width), pentagonal_core_region(inp.atomtype_in))
+
+   return None
+# -------------------------------------------------------------------------------------
+def create_bulk_graphene(inp):
    """
-   Creates a temporary bulk graphene XYZ file using ASE.
+   Generates the bulk graphene sheet in memory.
 
    Args:
        inp (input_class): An instance containing input parameters.
-       base_dir (str): Absolute path to the working directory.
 
    Returns:
-       None: Saves the generated bulk graphene geometry.
+       None: Stores the bulk labels and coordinates in `inp.bulk_atoms` and `inp.bulk_xyz`.
    """
 
    # Extract lattice constant from parameters dictionary
    param = parameters.parameters()
    lattice_constant = param.lattice_constant.get(inp.atomtype)
 
-   # Create tmp folder
-   inp.tmp_folder = os.path.join(base_dir,'tmp')
-   if os.path.exists(inp.tmp_folder): shutil.rmtree(inp.tmp_folder)
-   os.mkdir(inp.tmp_folder)
-
-   # Create initial graphene structure with ASE
+   # Create initial graphene structure
    if inp.graphene_structure == "rib" or inp.graphene_structure == "triangle":
       # Increase size of bulk structure by a factor to ensure correct geometry creation
       geom_scale = 1.5
@@ -1433,21 +1484,17 @@ def create_ase_bulk_graphene(inp, base_dir):
       n = int(scaled_width / 2.13)   # Number of dimer rows for width
       m = int(scaled_length / 4.26)  # Number of unit cells for length
 
-      # Create flat armchair nanoribbon in XY plane
+      # Flat armchair nanoribbon in XY plane, centered at (0,0,0)
       # Armchair structure will then be managed
-      graphene_xyz = graphene_nanoribbon(n=n, m=m, type='armchair')
-      graphene_xyz.rotate(90, 'x', rotate_cell=True)
+      inp.bulk_xyz = lattice.graphene_ribbon_bulk(n, m)
 
    elif inp.graphene_structure == "disk" or inp.graphene_structure == "ring":
       # Select radius to define structure. Both inp.radius and inp.radius_out are initialized to zero  
       radius_selected = max(inp.radius, inp.radius_out)
 
-      # Create a large graphene sheet in XY plane
+      # Create a large graphene sheet in XY plane, centered at (0,0,0)
       radius_int = math.ceil(radius_selected) # Round to upper integer for function compatibility
-      graphene_xyz = graphene_general_ase(a=lattice_constant, size=(2*radius_int, 2*radius_int, 1))  # Large enough to extract disk
+      inp.bulk_xyz = lattice.graphene_sheet_bulk(lattice_constant, (2*radius_int, 2*radius_int))  # Large enough to extract disk
 
-   # Center the graphene at (0,0,0) and write on tmp/tmp_bulk.xyz
-   graphene_xyz.translate(-graphene_xyz.get_center_of_mass())
-   inp.geom_file = os.path.join(inp.tmp_folder,'tmp_bulk.xyz')
-   write(inp.geom_file, graphene_xyz)
+   inp.bulk_atoms = ['C'] * inp.bulk_xyz.shape[1]
 # -------------------------------------------------------------------------------------
@@ -1,9 +1,11 @@
 import sys
 import os
 import ast
+import math
+import tempfile
 
 from geom.classes import parameters
-from geom.functions import output, create_geom
+from geom.functions import output
 
 # -------------------------------------------------------------------------------------
 def read_command_line(argv, inp):
@@ -28,9 +30,9 @@ def read_command_line(argv, inp):
     command = argv[1]
     if command in ['-h', '-help']:
         print_help()
-    elif command == '-t' or command =='-t1' or command == '-tc':
+    elif command == '-t' or command =='-t1' or command == '-tc' or command == '-place':
         parse_translation(argv, inp)
-    elif command == '-r' or command =='-r1':
+    elif command == '-r' or command =='-r1' or command == '-rmin':
         parse_rotation(argv, inp)
     elif command == '-min':
         parse_min(argv,inp)
@@ -44,6 +46,10 @@ def read_command_line(argv, inp):
         parse_merge(argv,inp)
     elif command == '-rdkit':
         parse_rdkit(argv,inp)
+    elif command == '-convert':
+        parse_convert(argv,inp)
+    elif command == '-cache':
+        parse_cache(argv,inp)
     else:
         output.error(f'Option "{command}" not recognized. Try python3 geom -h')
 # -------------------------------------------------------------------------------------
@@ -71,10 +77,22 @@ def print_help():
 
            -t distances_input geom1.xyz origin_CM_1{origin_CM_1_yes/no} geom2.xyz origin_CM_2{origin_CM_2_yes/no} axis{+-}{x/y/z} verbose{verbose_yes/no}
 
+         Distance scan (all distances as frames of a single multi-frame XYZ, with per-frame timing):
+
+           -t distances_input geom1.xyz origin_CM_1{origin_CM_1_yes/no} geom2.xyz origin_CM_2{origin_CM_2_yes/no} axis{+-}{x/y/z} verbose{verbose_yes/no} -scan
+
          One translation:
 
            -t1 shift geom.xyz origin_CM{origin_CM_yes/no} axis{+-}{x/y/z}
 
+         * For -t and -t1 the axis can also be any direction vector given as ax,ay,az (e.g. 1,1,0)
+
+         Placement grid search (minimum distance and contacts of geom2 over a grid of displacements):
+
+           -place geom1.xyz geom2.xyz x_min,x_max,nx y_min,y_max,ny z_min,z_max,nz target_gap [-cutoff c] [-np n_procs]
+
+         * Contacts are the atoms of geom2 closer than the cutoff (default: target_gap) to geom1
+
          Translation to center of coordinates:
 
            -tc geom.xyz
@@ -88,10 +106,22 @@ def print_help():
 
            -r angles_input geom.xyz origin_CM{origin_CM_yes/no} axis{+-}{x/y/z}
 
+         Angle scan (all angles as frames of a single multi-frame XYZ):
+
+           -r angles_input geom.xyz origin_CM{origin_CM_yes/no} axis{+-}{x/y/z} -scan
+
          One rotation:
 
            -r1 angle geom.xyz origin_CM{origin_CM_yes/no} axis{+-}{x/y/z}
 
+         * For -r and -r1 the axis can also be any direction vector given as ax,ay,az (right-hand rotation)
+
+         Orientation scan (minimum distance for every rotation of geom2 about its center, as a table):
+
+           -rmin angles_input geom1.xyz geom2.xyz axes{x/y/z/xy/xz/yz/xyz} [-np n_procs]
+
+         * Every axis scans all the angles of the input (full grid); rotations follow the order of the axes
+
 
          -----------------
          Minimum Distance:
@@ -121,6 +151,35 @@ def print_help():
          -merge geom1.xyz geom2.xyz cutoff(Å)
 
 
+         ------------------
+         Convert Geometries
+         ------------------
+
+         Lossless XYZ <-> binary .geomb conversion (saved in results_geom/):
+
+           -convert geom.xyz [-float32]
+           -convert geom.geomb
+
+         Every command reading a geom.xyz file also accepts geom.geomb, memory-mapped from disk.
+
+
+         ------------------
+         Bulk Lattice Cache
+         ------------------
+
+         Metal bulks are cached on disk and reused by later generations of the same material
+         (folder: $GEOM_CACHE_DIR or ~/.cache/geom/bulk ; size cap in bytes: $GEOM_CACHE_SIZE,
+         default 1 GiB, 0 disables the cache; least recently used bulks are evicted first).
+
+         Results of -create commands are stored by their parameters and code version, and
+         repeated commands copy the stored files into results_geom/ (folder: $GEOM_STORE_DIR
+         or ~/.cache/geom/results ; size cap in bytes: $GEOM_STORE_SIZE, default 1 GiB,
+         0 disables the store; random alloys are never stored):
+
+           -cache stats
+           -cache clear
+
+
          -----------------
          Generate Geometry
          -----------------
@@ -189,6 +248,11 @@ def print_help():
 
          - The alloy option is compatible with bowtie and dimer creation.
 
+         - Radius sweeps are available for spheres, icosahedra, cuboctahedra, and decahedra:
+             -sweep radius_2 ... radius_n
+           One geometry is saved for every radius (the main radius included), all cut
+           from a single lattice built for the largest one.
+
          Note: Alloying, core-shell, dimer, and bowtie options are only available for Ag and Au-based nanoparticles.
 
 
@@ -229,6 +293,7 @@ def print_help():
                     [-maxIters N] (default=200)
                     [-ext [pdb|sdf|xyz] (default=pdb)]
                     [-pruneRms RMS] (default=0.30)
+                    [-traj] (xyz only: all conformers in a single multi-frame XYZ)
 
     '''
     print(help_text)
@@ -247,7 +312,8 @@ def parse_translation(argv, inp):
 
    Notes:
        - Handles both controlled distance translation (`-t`), simple shift translation (`-t1`),
-         and translation of geometrical center to the center of coordinates (`-tc`).
+         translation of geometrical center to the center of coordinates (`-tc`) and the
+         placement grid search (`-place`).
        - Extracts input filenames, translation parameters, and verbosity settings.
    """
 
@@ -267,6 +333,11 @@ def parse_translation(argv, inp):
       if (inp.origin_CM_1 == 'origin_CM_1_yes'): inp.move_geom_1_to_000 = True
       if (inp.origin_CM_2 == 'origin_CM_2_yes'): inp.move_geom_2_to_000 = True
       if (inp.verbose_inp == 'verbose_yes'): inp.verbose = True
+
+      # Optional scan mode: all distances in a single multi-frame XYZ
+      if (len(argv) > 9):
+         if (argv[9] == '-scan'): inp.translate_scan = True
+         else: output.error(f'Option "{argv[9]}" not recognized. Try python3 geom -h')
    
    elif argv[1] == '-t1':
       inp.translate_1 = True
@@ -281,6 +352,38 @@ def parse_translation(argv, inp):
    elif argv[1] == '-tc':
       inp.translate_center = True
       inp.geom_file      = str(argv[2]) 
+
+   elif argv[1] == '-place':
+      inp.translate_place = True
+
+      inp.geom1_file   = str(argv[2])
+      inp.geom2_file   = str(argv[3])
+      inp.place_grid   = [parse_grid_axis(spec) for spec in argv[4:7]]
+      inp.place_target = float(argv[7])
+
+      inp.place_cutoff = extract_value_or_default(argv, '-cutoff', float, inp.place_target)
+      inp.n_procs      = extract_value_or_default(argv, '-np', int, 1)
+# -------------------------------------------------------------------------------------
+def parse_grid_axis(spec):
+   """
+   Parses one axis of a displacement grid given as "min,max,n".
+
+   Args:
+       spec (str): Grid specification, e.g. "-10,10,21" (n = 1 keeps only `min`).
+
+   Returns:
+       tuple: (min, max, n) of the `n` equally spaced displacements along the axis.
+   """
+
+   try:
+      lo, hi, n = spec.split(',')
+      lo, hi, n = float(lo), float(hi), int(n)
+   except ValueError:
+      output.error(f'Invalid grid "{spec}": use min,max,n (e.g. -10,10,21).')
+
+   if (n < 1): output.error(f'Invalid grid "{spec}": the number of points must be at least 1.')
+
+   return(lo, hi, n)
 # -------------------------------------------------------------------------------------
 def parse_rotation(argv, inp):
    """
@@ -294,7 +397,8 @@ def parse_rotation(argv, inp):
        None: Sets rotation-related attributes in `inp`.
 
    Notes:
-       - Handles both list-based rotation (`-r`) and single-angle rotation (`-r1`).
+       - Handles list-based rotation (`-r`), single-angle rotation (`-r1`) and
+         orientation scans of the minimum distance (`-rmin`).
        - Extracts input filenames and rotation parameters.
    """
 
@@ -310,6 +414,21 @@ def parse_rotation(argv, inp):
 
       if (inp.origin_CM == 'origin_CM_yes'): inp.move_geom_to_000 = True
 
+      # Optional scan mode: all angles in a single multi-frame XYZ
+      if (len(argv) > 6):
+         if (argv[6] == '-scan'): inp.rotate_scan = True
+         else: output.error(f'Option "{argv[6]}" not recognized. Try python3 geom -h')
+
+   elif argv[1] == '-rmin':
+      inp.rotate_min_dist = True
+
+      inp.angles_input = str(argv[2])
+      inp.geom1_file   = str(argv[3])
+      inp.geom2_file   = str(argv[4])
+      inp.scan_axes    = str(argv[5]).lower()
+
+      inp.n_procs      = extract_value_or_default(argv, '-np', int, 1)
+
    elif argv[1] == '-r1':
       inp.rotate_1 = True
 
@@ -415,8 +534,48 @@ def parse_rdkit(argv, inp):
             inp.rdkit_confs_ext = "." + extract_value(argv,"-ext",value_type=str)
         if any(arg.lower() == "-prunerms" for arg in argv):
             inp.rdkit_confs_prune_rms = extract_value(argv, "-pruneRms", value_type=float)
+        if "-traj" in argv:
+            inp.rdkit_confs_traj = True
         inp.rdkit_output_file = inp.rdkit_mol_file[:-4] + inp.rdkit_confs_ext
 # -------------------------------------------------------------------------------------
+def parse_convert(argv, inp):
+   """
+   Parses command-line arguments for converting between XYZ and `.geomb` files.
+
+   Args:
+       argv (list[str]): List of command-line arguments.
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       None: Sets conversion attributes in `inp`.
+   """
+
+   inp.small_tasks = True
+
+   inp.convert = True
+   inp.geom_file = str(argv[2])
+
+   if (len(argv) > 3):
+      if (argv[3] == '-float32'): inp.convert_precision = 'float32'
+      else: output.error(f'Option "{argv[3]}" not recognized. Try python3 geom -h')
+# -------------------------------------------------------------------------------------
+def parse_cache(argv, inp):
+   """
+   Parses command-line arguments for inspecting or clearing the bulk lattice cache.
+
+   Args:
+       argv (list[str]): List of command-line arguments.
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       None: Sets cache attributes in `inp`.
+   """
+
+   inp.small_tasks = True
+
+   inp.cache = True
+   inp.cache_task = str(argv[2]) if len(argv) > 2 else ''
+# -------------------------------------------------------------------------------------
 def parse_min(argv, inp):
    """
    Parses command-line arguments for calculating the minimum distance between two geometries.
@@ -473,16 +632,9 @@ def parse_create(argv, inp):
    # Extract parameters
    param = parameters.parameters()
 
-   # Determine the script's location
-   script_path = os.path.abspath(__file__)
-   # Get the directory containing the script
-   script_dir = os.path.dirname(script_path)
-   # Get upper directory
-   base_dir = os.path.dirname(script_dir)
-   
    if (argv[2] == '-graphene'):
       inp.gen_graphene = True
-      inp.create_ase_bulk = True
+      inp.create_bulk = True
 
       inp.atomtype = "c"
       inp.graphene_structure = argv[3] 
@@ -511,9 +663,6 @@ def parse_create(argv, inp):
       else:
          output.error(f'Create graphene option "{inp.graphene_structure}" not recognized. Try python3 geom -h')
 
-      # Create bulk graphene dynamically
-      create_geom.create_ase_bulk_graphene(inp, base_dir)
-
    else:
       if ('-core' and '-shell') in argv: 
          inp.gen_core_shell = True
@@ -531,12 +680,12 @@ def parse_create(argv, inp):
          inp.atomtype = argv[3].lower()
          if inp.atomtype not in param.metal_atomtypes: output.error(f'Atom Type "{argv[3]}" not recognised')
 
-         check_FCC_or_BCC(inp.atomtype)
+         check_bulk_arrangement(inp.atomtype)
 
       if (argv[2] == '-sphere'): 
          if (inp.gen_core_shell): 
             inp.gen_sphere_core_shell = True
-            inp.create_ase_bulk = True
+            inp.create_bulk = True
 
             inp.atomtype_in  = argv[4].lower()
             inp.radius_in    = float(argv[5])
@@ -553,13 +702,13 @@ def parse_create(argv, inp):
 
             if inp.radius_in >= inp.radius_out: output.error(f'Shell radius must be greater than core radius.')
 
-            # Set to create bulk ase geometry                                                                                      
+            # Set to create bulk geometry                                                                                      
             inp.atomtype = inp.atomtype_out
             inp.radius = inp.radius_out
 
          elif (inp.gen_3d_mesh):
             inp.gen_3d_mesh_sphere = True
-            inp.create_ase_bulk = False
+            inp.create_bulk = False
 
             inp.radius = float(argv[4])
             inp.mesh_size = float(argv[5])
@@ -567,14 +716,14 @@ def parse_create(argv, inp):
 
          else:
             inp.gen_sphere = True
-            inp.create_ase_bulk = True
+            inp.create_bulk = True
 
             inp.radius = float(argv[4])
 
       elif (argv[2] == '-rod'): 
          if (inp.gen_core_shell):
             inp.gen_rod_core_shell = True
-            inp.create_ase_bulk = True
+            inp.create_bulk = True
 
             inp.main_axis = argv[3].lower()
             inp.atomtype_in = argv[5].lower()
@@ -598,14 +747,14 @@ def parse_create(argv, inp):
             if inp.rod_width_in  >= inp.rod_width_out:  output.error(f"Shell rod width must be greater than core rod width.")
             if inp.rod_length_in >= inp.rod_length_out: output.error(f"Shell rod length must be greater than core rod length.")
 
-            # Set to create bulk ase geometry                                                                                      
+            # Set to create bulk geometry                                                                                      
             inp.atomtype = inp.atomtype_out
             inp.rod_length = inp.rod_length_out
             inp.rod_width = inp.rod_width_out
 
          elif (inp.gen_3d_mesh):
             inp.gen_3d_mesh_rod = True
-            inp.create_ase_bulk = False
+            inp.create_bulk = False
 
             inp.main_axis = argv[4].lower()
             inp.rod_length = float(argv[5])
@@ -617,7 +766,7 @@ def parse_create(argv, inp):
             inp.mesh_output = f"results_geom/rod_{inp.main_axis.upper()}_l_{inp.rod_length}_w_{inp.rod_width}_mesh_size_{inp.mesh_size}.msh"
          else:
             inp.gen_rod = True
-            inp.create_ase_bulk = True
+            inp.create_bulk = True
 
             inp.main_axis = argv[4].lower()
             inp.rod_length = float(argv[5])
@@ -629,7 +778,7 @@ def parse_create(argv, inp):
 
       elif (argv[2] == '-tip'): 
          inp.gen_tip = True
-         inp.create_ase_bulk = True
+         inp.create_bulk = True
 
          inp.z_max = float(argv[4])
          inp.elliptic_parabola_a = float(argv[5])
@@ -637,20 +786,20 @@ def parse_create(argv, inp):
 
       elif (argv[2] == '-pyramid'): 
          inp.gen_pyramid = True
-         inp.create_ase_bulk = True
+         inp.create_bulk = True
          inp.z_max = float(argv[4])
          inp.side_length =  float(argv[5])
 
       elif (argv[2] == '-pentpyramid'):
          inp.gen_pentpyramid = True
-         inp.create_ase_bulk = True
+         inp.create_bulk = True
          inp.z_max = float(argv[5])
          inp.base_width = float(argv[4])
          inp.main_axis = "z"
 
       elif (argv[2] == '-microscope'): 
          inp.gen_microscope = True
-         inp.create_ase_bulk = True
+         inp.create_bulk = True
          inp.z_max_paraboloid = float(argv[4])
          inp.elliptic_parabola_a = float(argv[5])
          inp.elliptic_parabola_b = float(argv[6])
@@ -659,7 +808,7 @@ def parse_create(argv, inp):
 
       elif (argv[2] == '-cone'): 
          inp.gen_cone = True
-         inp.create_ase_bulk = True
+         inp.create_bulk = True
          inp.z_max = float(argv[4])
          inp.radius = float(argv[5])
 
@@ -677,19 +826,19 @@ def parse_create(argv, inp):
 
       elif (argv[2] == '-bipyramid'):
          inp.gen_bipyramid = True
-         inp.create_ase_bulk = True
+         inp.create_bulk = True
          inp.bipyramid_width = float(argv[4]) / 2.0 
          inp.bipyramid_length = float(argv[5]) / 2.0
 
          if inp.bipyramid_width >= inp.bipyramid_length: output.error(f"Bipyramid width must be smaller than length.")
 
-         # Set to create bulk ase geometry
+         # Set to create bulk geometry
          inp.rod_width  = inp.bipyramid_width
          inp.rod_length = inp.bipyramid_length
          inp.main_axis  = "z"
 
       elif (inp.gen_pencil):
-         inp.create_ase_bulk = True
+         inp.create_bulk = True
          inp.atomtype_in = argv[4].lower()
          inp.atomtype_out = argv[6].lower()
          inp.bipyramid_width = float(argv[7]) / 2.0
@@ -718,14 +867,14 @@ def parse_create(argv, inp):
          elif (inp.atomtype_in == inp.atomtype_out):
              output.error(f"Core and shell atom types coincide.")
 
-         # Set to create bulk ase geometry
+         # Set to create bulk geometry
          inp.atomtype = inp.atomtype_out
          inp.rod_width  = inp.rod_width*2.0
          inp.rod_length  = inp.rod_length*2.0
          inp.main_axis  = "z"
 
       elif (inp.gen_pentbipyramid):
-         inp.create_ase_bulk = True
+         inp.create_bulk = True
          inp.atomtype_in  = argv[4].lower()
          inp.atomtype_out = argv[6].lower()
          inp.base_width   = float(argv[7])
@@ -753,7 +902,7 @@ def parse_create(argv, inp):
          elif inp.atomtype_in == inp.atomtype_out:
             output.error(f"Core and shell atom types coincide.")
 
-         # Set to create bulk ase geometry for outer rod
+         # Set to create bulk geometry for outer rod
          inp.atomtype   = inp.atomtype_out
          inp.rod_width  = inp.rod_width  * 2.0
          inp.rod_length = inp.rod_length * 2.0
@@ -762,8 +911,8 @@ def parse_create(argv, inp):
       else:
          output.error(f'Create nanoparticle option "{argv[2]}" not recognized. Try python3 geom -h')
 
-      # Create bulk metal dynamically
-      if inp.create_ase_bulk: create_geom.create_ase_bulk_metal(inp, base_dir)
+      # Radius sweep case (bulk built for the largest radius)
+      parse_sweep_argument(argv, inp, output)
 
       # Alloy case
       parse_alloy_arguments(argv, inp, output)
@@ -773,6 +922,51 @@ def parse_create(argv, inp):
 
       # Create bowtie case
       parse_bowtie_argument(argv, inp, output)
+
+      if inp.sweep_radii and (inp.create_dimer or inp.create_bowtie):
+         output.error('-sweep cannot be combined with dimer or bowtie creation.')
+# -------------------------------------------------------------------------------------
+def parse_sweep_argument(argv, inp, output):
+    """
+    Parses the radius sweep command-line arguments and updates the `inp` object.
+
+    Args:
+        argv (list[str]): Command-line arguments list.
+        inp (input_class): The input class instance where the sweep radii are stored.
+        output (module): The output module for error handling.
+
+    Returns:
+        None: Updates inp.sweep_radii and sets inp.radius to the largest radius.
+
+    Notes:
+        - Searches for "-sweep" and reads every following number as an extra radius.
+        - Only available for spheres, icosahedra, cuboctahedra, and decahedra.
+    """
+
+    if "-sweep" in argv:
+
+        if (not inp.gen_sphere     and
+            not inp.gen_icosahedra and
+            not inp.gen_cto        and
+            not inp.gen_idh): output.error('-sweep only available for sphere, icosahedron, cuboctahedron, and decahedron structures.')
+
+        idx = argv.index("-sweep")
+
+        radii = [inp.radius]
+        for value in argv[idx + 1:]:
+            try:
+                radii.append(float(value))
+            except ValueError:
+                break
+
+        if len(radii) == 1:
+            output.error("Missing radii after '-sweep'.")
+
+        if min(radii) <= 0.0:
+            output.error('Sweep radii must be greater than zero.')
+
+        inp.sweep_radii = sorted(set(radii))
+        inp.radius = inp.sweep_radii[-1]
 # -------------------------------------------------------------------------------------
 def parse_dimer_argument(argv, inp, output):
     """
@@ -970,22 +1164,22 @@ def check_FCC(atomtype,string):
 
    if arrangement != 'FCC': output.error(f'"{atomtype.capitalize()}" presents {arrangement} arrangement. FCC is required to create {string}.')
 # -------------------------------------------------------------------------------------
-def check_FCC_or_BCC(atomtype):
+def check_bulk_arrangement(atomtype):
    """ 
-   Checks if the given metallic atom type follows either an FCC or BCC arrangement.
+   Checks if the given metallic atom type follows an FCC, BCC or HCP arrangement.
 
    Args:
        atomtype (str): Type of metal atom.
 
    Returns:
-       None: Raises an error if the atom type is not FCC or BCC.
+       None: Raises an error if the atom type is not FCC, BCC or HCP.
    """
 
    param = parameters.parameters()
 
    arrangement = param.atomic_arrangement.get(atomtype)
 
-   if arrangement !='FCC' and arrangement != 'BCC': output.error(f'"{atomtype.capitalize()}" presents {arrangement} arrangement. Only FCC and BCC are supported for metal creation.')
+   if arrangement not in ('FCC', 'BCC', 'HCP'): output.error(f'"{atomtype.capitalize()}" presents {arrangement} arrangement. Only FCC, BCC and HCP are supported for metal creation.')
 # -------------------------------------------------------------------------------------
 def check_file_extension(infile,extension):
    """ 
@@ -1002,6 +1196,34 @@ def check_file_extension(infile,extension):
    i = len(extension)
    if (infile[-i:] != extension): output.error('extension "' + extension + '" not found in file "' + infile + '"' )
 # -------------------------------------------------------------------------------------
+def check_geom_file_extension(infile):
+   """ 
+   Checks if the input file is a geometry file (XYZ, compressed XYZ or binary `.geomb`).
+
+   Args:
+       infile (str): Path to the input file.
+
+   Returns:
+       None: Raises an error if the file has neither extension.
+   """
+
+   if not infile.endswith(('.xyz', '.xyz.gz', '.xyz.xz', '.geomb')): output.error('extension ".xyz" or ".geomb" not found in file "' + infile + '"' )
+# -------------------------------------------------------------------------------------
+def geom_file_stem(geom_file):
+   """ 
+   Returns a geometry file name without its ".xyz" (".xyz.gz", ".xyz.xz") or ".geomb" extension.
+
+   Args:
+       geom_file (str): Path to the geometry file.
+
+   Returns:
+       str: Path without the extension, used to name the output geometries.
+   """
+
+   if geom_file.endswith(('.gz', '.xz')): geom_file = geom_file[:-3]
+
+   return os.path.splitext(geom_file)[0]
+# -------------------------------------------------------------------------------------
 def check_file_extension_rdkit(infile,accepted_extensions):
     """ 
     Checks if the input file has a RDKit-supported extension.
@@ -1044,12 +1266,14 @@ def check_accepted_parameters(param,accepted_params,label="Parameter"):
         )
         output.error(msg)
 # -------------------------------------------------------------------------------------
-def check_dir_axis(inp):
+def check_dir_axis(inp, allow_vector=False):
    """ 
    Validates the direction axis input for translation or rotation.
 
    Args:
        inp (input_class): An instance containing input parameters.
+       allow_vector (bool): Whether an arbitrary direction vector "ax,ay,az" is accepted
+           (translations and rotations).
 
    Returns:
        input_class: Updated `inp` with validated direction axis settings.
@@ -1057,8 +1281,23 @@ def check_dir_axis(inp):
    Notes:
        - Ensures that the axis is properly formatted (e.g., `+x`, `-y`).
        - Assigns the corresponding numerical translation factor.
+       - A direction vector is normalized and stored in `inp.dir_factor`.
    """
 
+   if (allow_vector and inp.dir_axis_input.count(',') == 2):
+      try:
+         vector = [float(x) for x in inp.dir_axis_input.split(',')]
+      except ValueError:
+         output.error_dir_axis(inp.dir_axis_input)
+
+      norm = math.sqrt(sum(x**2 for x in vector))
+      if (norm == 0.0 or not math.isfinite(norm)): output.error_dir_axis(inp.dir_axis_input)
+
+      inp.direction = 1.0
+      inp.dir_factor = [x / norm for x in vector]
+
+      return(inp)
+
    if ((len(inp.dir_axis_input) < 2) or 
        (len(inp.dir_axis_input) > 2) or
        (inp.dir_axis_input[1] != 'x' and inp.dir_axis_input[1] != 'y' and inp.dir_axis_input[1] != 'z') or
@@ -1078,6 +1317,9 @@ def create_results_geom():
 
    Returns:
        None: Ensures that output files can be stored in the correct location.
+
+   Notes:
+       - Safe when several runs create the folder at the same time.
    """
 
    #if (os.path.exists('results_geom')):
@@ -1107,7 +1349,23 @@ def create_results_geom():
    #      print(' ')
    #      sys.exit()
 
-   if (not(os.path.exists('results_geom'))): os.system('mkdir results_geom')
+   os.makedirs('results_geom', exist_ok=True)
+# -------------------------------------------------------------------------------------
+def create_scratch_dir():
+   """
+   Creates a private scratch directory for the intermediate files of this run.
+
+   Returns:
+       str: Path of the new directory, to be removed by the caller when done.
+
+   Notes:
+       - The directory is unique per call (`tempfile.mkdtemp`), so concurrent runs never
+         share intermediate files, and it is created under `parameters.scratch_dir`
+         (`GEOM_SCRATCH` environment variable) or the system temporary folder,
+         never inside the package.
+   """
+
+   return tempfile.mkdtemp(prefix='geom_', dir=parameters.parameters().scratch_dir)
 # -------------------------------------------------------------------------------------
 def extract_string_or_list(argv, flag):
     """
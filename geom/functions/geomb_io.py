@@ -0,0 +1,167 @@
+import json
+import numpy as np
+
+from geom.functions import output
+
+# File layout (little endian):
+#   magic (8 bytes) | header length (uint32) | JSON header, padded to ALIGNMENT
+#   coordinate block (3, N) float64 or float32, C order
+#   element-code block (N,) uint8, indices into the header "symbols"
+MAGIC     = b'GEOMB\x00\x01\x00'
+ALIGNMENT = 64
+DTYPES    = {'float64': '<f8', 'float32': '<f4'}
+
+# -------------------------------------------------------------------------------------
+def write_geomb(geomb_file, atoms, xyz, comment='Generated with GEOM code', precision='float64'):
+   """
+   Writes a geometry in the binary `.geomb` format.
+
+   Args:
+       geomb_file (str): Path of the output file.
+       atoms (list[str]): Atomic labels (at most 256 different ones).
+       xyz (numpy.ndarray): Atomic coordinates with shape (3, N).
+       comment (str): Comment line kept for the conversion back to XYZ.
+       precision (str): "float64" (lossless) or "float32" (half the size).
+
+   Returns:
+       None
+
+   Raises:
+       ValueError: If there are more than 256 different labels or the precision is unknown.
+   """
+
+   if precision not in DTYPES: raise ValueError(f'Unknown .geomb precision "{precision}".')
+
+   symbols, codes = np.unique(np.asarray(atoms, dtype=object).astype(str), return_inverse=True)
+
+   write_geomb_codes(geomb_file, symbols.tolist(), codes, xyz, comment, precision)
+# -------------------------------------------------------------------------------------
+def write_geomb_codes(geomb_file, symbols, codes, xyz, comment='Generated with GEOM code', precision='float64'):
+   """
+   Writes a geometry in the binary `.geomb` format from a symbol table and element codes.
+
+   Args:
+       geomb_file (str): Path of the output file.
+       symbols (list[str]): Symbol table (at most 256 labels).
+       codes (numpy.ndarray): Index into `symbols` of every atom (N,).
+       xyz (numpy.ndarray): Atomic coordinates with shape (3, N).
+       comment (str): Comment line kept for the conversion back to XYZ.
+       precision (str): "float64" (lossless) or "float32" (half the size).
+
+   Returns:
+       None
+
+   Raises:
+       ValueError: If there are more than 256 different labels or the precision is unknown.
+
+   Notes:
+       - Skips building the symbol table from per-atom labels (see `write_geomb`).
+   """
+
+   if precision not in DTYPES: raise ValueError(f'Unknown .geomb precision "{precision}".')
+   if len(symbols) > 256: raise ValueError('The .geomb format supports at most 256 different atom labels.')
+
+   nAtoms = len(codes)
+   header = {'natoms': nAtoms, 'dtype': DTYPES[precision], 'symbols': list(symbols), 'comment': comment}
+
+   # The coordinate block starts at an aligned offset
+   text = json.dumps(header).encode()
+   start = len(MAGIC) + 4 + len(text)
+   text += b' ' * (-start % ALIGNMENT)
+
+   with output.open_output(geomb_file, 'wb') as outfile:
+      outfile.write(MAGIC)
+      outfile.write(np.uint32(len(text)).tobytes())
+      outfile.write(text)
+      outfile.write(np.ascontiguousarray(xyz, dtype=DTYPES[precision]).tobytes())
+      outfile.write(np.asarray(codes).astype(np.uint8).tobytes())
+# -------------------------------------------------------------------------------------
+def read_geomb_header(geomb_file):
+   """
+   Reads the header of a `.geomb` file.
+
+   Args:
+       geomb_file (str): Path to the `.geomb` file.
+
+   Returns:
+       tuple:
+           - dict: Header with "natoms", "dtype", "symbols" and "comment".
+           - int: Byte offset of the coordinate block.
+
+   Raises:
+       ValueError: If the file is not a `.geomb` file.
+   """
+
+   with open(geomb_file, 'rb') as infile:
+      if infile.read(len(MAGIC)) != MAGIC: raise ValueError(f'"{geomb_file}" is not a .geomb file.')
+
+      length = int(np.frombuffer(infile.read(4), dtype='<u4')[0])
+      try:
+         header = json.loads(infile.read(length))
+      except ValueError as exc:
+         raise ValueError(f'Corrupt .geomb header in "{geomb_file}".') from exc
+
+   return header, len(MAGIC) + 4 + length
+# -------------------------------------------------------------------------------------
+def read_geomb_codes(geomb_file, mode='c'):
+   """
+   Maps a `.geomb` file into memory, keeping the element codes of the file.
+
+   Args:
+       geomb_file (str): Path to the `.geomb` file.
+       mode (str): `np.memmap` mode of the coordinates (see `read_geomb`).
+
+   Returns:
+       tuple:
+           - list[str]: Symbol table of the file.
+           - numpy.memmap: Element code of every atom (N,), indices into the symbol table.
+           - numpy.memmap: Atomic coordinates with shape (3, N).
+           - str: Comment line.
+
+   Raises:
+       ValueError: If the file is not a valid `.geomb` file.
+   """
+
+   header, offset = read_geomb_header(geomb_file)
+   nAtoms = header['natoms']
+   dtype  = np.dtype(header['dtype'])
+
+   if nAtoms <= 0: raise ValueError(f'Invalid atom count in "{geomb_file}".')
+
+   try:
+      xyz   = np.memmap(geomb_file, dtype=dtype, mode=mode, offset=offset, shape=(3, nAtoms))
+      codes = np.memmap(geomb_file, dtype=np.uint8, mode='r', offset=offset + 3 * nAtoms * dtype.itemsize, shape=(nAtoms,))
+   except ValueError as exc:
+      raise ValueError(f'Truncated .geomb file "{geomb_file}".') from exc
+
+   return header['symbols'], codes, xyz, header['comment']
+# -------------------------------------------------------------------------------------
+def read_geomb(geomb_file, mode='c'):
+   """
+   Maps a `.geomb` file into memory.
+
+   Args:
+       geomb_file (str): Path to the `.geomb` file.
+       mode (str): `np.memmap` mode. The default copy-on-write mode lets the coordinates
+           be modified in memory without touching the file.
+
+   Returns:
+       tuple:
+           - list[str]: Atomic labels.
+           - numpy.memmap: Atomic coordinates with shape (3, N), read from disk on access.
+           - str: Comment line.
+
+   Raises:
+       ValueError: If the file is not a valid `.geomb` file.
+
+   Notes:
+       - Pages of the coordinate block are only read when touched, so reductions such as
+         the center and the bounding box stream over the file instead of loading it first.
+   """
+
+   symbols, codes, xyz, comment = read_geomb_codes(geomb_file, mode)
+
+   atoms = np.asarray(symbols, dtype=object)[codes].tolist()
+
+   return atoms, xyz, comment
+# -------------------------------------------------------------------------------------
@@ -0,0 +1,499 @@
+import math
+import numpy as np
+
+from geom.classes import parameters
+# -------------------------------------------------------------------------------------
+def round_as_xyz(xyz):
+   """
+   Rounds coordinates to 8 decimals exactly as writing them to an XYZ file and reading them back.
+
+   Args:
+       xyz (np.ndarray): Atomic coordinates of any shape.
+
+   Returns:
+       np.ndarray: Coordinates equal to float('%.8f' % x) for every element.
+
+   Notes:
+       - rint(x * 1e8) / 1e8 is the correctly rounded decimal value unless x * 1e8 lies
+         within rounding noise of a half-integer; those few values go through the string route.
+       - Signed zeros are preserved ('-0.00000000' is read back as -0.0).
+   """
+
+   scaled  = xyz * 1.0e8
+   rounded = np.rint(scaled) / 1.0e8
+
+   # Halfway cases (and values too large for exact integer digits) are resolved as text
+   noise = np.abs(scaled) * 1.0e-15 + 1.0e-12
+   ambiguous = (np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= noise) | (np.abs(scaled) >= 2.0**52)
+
+   if np.any(ambiguous):
+      rounded[ambiguous] = [float(f'{x:.8f}') for x in xyz[ambiguous]]
+
+   return rounded
+# -------------------------------------------------------------------------------------
+def cubic_bulk(arrangement, lattice_constant, layers, region=None):
+   """
+   Generates a box-shaped FCC or BCC bulk centered at the origin.
+
+   Args:
+       arrangement (str): "FCC" or "BCC".
+       lattice_constant (float): Cubic lattice constant (Å).
+       layers (list[int]): Number of (100) layers above the center along x, y and z.
+       region (tuple, optional): Shape region (see `box_region`); only lattice points inside
+           it are generated.
+
+   Returns:
+       np.ndarray: Coordinates with shape (3, N), rounded as in an XYZ file.
+
+   Notes:
+       - Reproduces ase.cluster.FaceCenteredCubic / BodyCenteredCubic with the surfaces
+         (100), (010), (001): atom order and floating point operations are the same, so
+         the coordinates are identical to those of the former tmp_bulk.xyz round trip.
+       - As in ASE, the three negative faces are cut at layers[0] layers.
+   """
+
+   return _bulk_block(*_cubic_cell(arrangement, lattice_constant, layers), region)
+# -------------------------------------------------------------------------------------
+def _cubic_cell(arrangement, lattice_constant, layers):
+   """
+   Basis, cell origins and box cut of `cubic_bulk` (arguments of `_bulk_block`).
+   """
+
+   basis = {'FCC': [[0.0, 0.0, 0.0], [0.0, 0.5, 0.5], [0.5, 0.0, 0.5], [0.5, 0.5, 0.0]],
+            'BCC': [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5]]}
+
+   a = lattice_constant
+   atomic_basis = np.array(basis[arrangement]) * a
+
+   # Unit cells spanned by the (100) layers on each side of the center; (100) spacing is a/2
+   upper = [max(1, math.ceil(round(l / 2.0, 2))) for l in layers]
+   lower = max(1, math.ceil(round(layers[0] / 2.0, 2)))
+
+   size   = [u + lower + 1 for u in upper]
+   center = [float(lower) * a] * 3
+
+   translations = [np.arange(n) * a for n in size]
+   rmax_pos = [(l + 0.1) * a / 2.0 for l in layers]
+   rmax_neg = [(layers[0] + 0.1) * a / 2.0] * 3
+
+   return atomic_basis, translations, center, rmax_pos, rmax_neg
+# -------------------------------------------------------------------------------------
+def hcp_bulk(lattice_constant, layers, region=None):
+   """
+   Generates a box-shaped HCP bulk centered at the origin, with the c axis along z.
+
+   Args:
+       lattice_constant (float or tuple): a, or (a, c). The ideal ratio c = a*sqrt(8/3)
+           is used when only a is given.
+       layers (list[int]): Box half-widths along x, y and z in units of a/2, following the
+           same convention as `cubic_bulk`.
+       region (tuple, optional): Shape region (see `box_region`); only lattice points inside
+           it are generated.
+
+   Returns:
+       np.ndarray: Coordinates with shape (3, N), rounded as in an XYZ file.
+
+   Notes:
+       - Built from the orthorhombic (a, sqrt(3)*a, c) cell holding 4 atoms.
+   """
+
+   return _bulk_block(*_hcp_cell(lattice_constant, layers), region)
+# -------------------------------------------------------------------------------------
+def _hcp_cell(lattice_constant, layers):
+   """
+   Basis, cell origins and box cut of `hcp_bulk` (arguments of `_bulk_block`).
+   """
+
+   if isinstance(lattice_constant, (tuple, list)):
+      a, c = lattice_constant
+   else:
+      a, c = lattice_constant, lattice_constant * math.sqrt(8.0 / 3.0)
+
+   cell = np.array([a, math.sqrt(3.0) * a, c])
+   atomic_basis = np.array([[0.0, 0.0,       0.0],
+                            [0.5, 0.5,       0.0],
+                            [0.5, 1.0 / 6.0, 0.5],
+                            [0.0, 2.0 / 3.0, 0.5]]) * cell
+
+   rmax_pos = [(l + 0.1) * a / 2.0 for l in layers]
+   rmax_neg = [(layers[0] + 0.1) * a / 2.0] * 3
+
+   lower  = [max(1, math.ceil(rmax_neg[i] / cell[i])) for i in range(3)]
+   size   = [lower[i] + max(1, math.ceil(rmax_pos[i] / cell[i])) + 1 for i in range(3)]
+   center = [lower[i] * cell[i] for i in range(3)]
+
+   translations = [np.arange(size[i]) * cell[i] for i in range(3)]
+
+   return atomic_basis, translations, center, rmax_pos, rmax_neg
+# -------------------------------------------------------------------------------------
+def bulk_center_point(arrangement, lattice_constant, layers):
+   """
+   Final coordinates of the lattice point at the reference center of a bulk block.
+
+   Args:
+       arrangement (str): "FCC", "BCC" or "HCP".
+       lattice_constant (float or tuple): As in `cubic_bulk` / `hcp_bulk`.
+       layers (list[int]): As in `cubic_bulk` / `hcp_bulk`.
+
+   Returns:
+       np.ndarray: Coordinates (3,), rounded as in an XYZ file.
+
+   Notes:
+       - Only the per-axis tables of the block are built, not the block itself.
+       - Two blocks whose center points both sit at the origin hold the same lattice
+         points with the same coordinates, except for the sign of zero coordinates,
+         which is the sign of this point's components.
+   """
+
+   if arrangement == 'HCP':
+      atomic_basis, translations, center, rmax_pos, rmax_neg = _hcp_cell(lattice_constant, layers)
+   else:
+      atomic_basis, translations, center, rmax_pos, rmax_neg = _cubic_cell(arrangement, lattice_constant, layers)
+
+   tables, _ = _block_tables(atomic_basis, translations, center, rmax_pos, rmax_neg)
+
+   # The first basis atom sits at the cell origin
+   return np.array([tables[i][0, np.argmin(np.abs(translations[i] - center[i]))] for i in range(3)])
+# -------------------------------------------------------------------------------------
+def _bulk_block(atomic_basis, translations, center, rmax_pos, rmax_neg, region=None):
+   """
+   Repeats an orthogonal unit cell, cuts it to a box around `center` and centers the box at 0.
+
+   Args:
+       atomic_basis (np.ndarray): Cartesian positions of the cell atoms, shape (nb, 3).
+       translations (list[np.ndarray]): Cell origins along x, y and z.
+       center (list[float]): Reference point of the cut.
+       rmax_pos (list[float]): Strict cut distances from `center` towards +x, +y, +z.
+       rmax_neg (list[float]): Strict cut distances from `center` towards -x, -y, -z.
+       region (tuple, optional): (lo, hi, row_interval) from the `*_region` helpers. Only
+           lattice points inside it are enumerated.
+
+   Returns:
+       np.ndarray: Coordinates with shape (3, N), rounded as in an XYZ file.
+
+   Notes:
+       - Atom order is cell (x slowest, z fastest) and then basis atom, as in ASE.
+       - The box cut and the centering act on each axis separately, so every coordinate is
+         read from a per-axis table (basis atom, cell index). With a region, the result is
+         the subset of the full block inside it, with identical coordinates and order.
+   """
+
+   nb = len(atomic_basis)
+   size = [len(t) for t in translations]
+
+   tables, inside = _block_tables(atomic_basis, translations, center, rmax_pos, rmax_neg)
+
+   if region is not None:
+      lo, hi, row_interval = region
+      for i in range(3):
+         inside[i] &= (tables[i] >= lo[i]) & (tables[i] <= hi[i])
+   else:
+      row_interval = None
+
+   if row_interval is None:
+      # Enumerate the sub-block holding every surviving point, in block order
+      ranges = [np.flatnonzero(np.any(ok, axis=0)) for ok in inside]
+      if any(len(r) == 0 for r in ranges): return np.empty((3, 0))
+
+      sub = [slice(r[0], r[-1] + 1) for r in ranges]
+      keep = (inside[0].T[sub[0], np.newaxis, np.newaxis, :] &
+              inside[1].T[np.newaxis, sub[1], np.newaxis, :] &
+              inside[2].T[np.newaxis, np.newaxis, sub[2], :])
+      h, k, l, b = np.nonzero(keep)
+      h, k, l = h + sub[0].start, k + sub[1].start, l + sub[2].start
+
+   else:
+      # Sweep (y, z) rows and solve each row's x-interval, then restore block order
+      keys = []
+      for ib in range(nb):
+         k_idx = np.flatnonzero(inside[1][ib])
+         l_idx = np.flatnonzero(inside[2][ib])
+         h_idx = np.flatnonzero(inside[0][ib])
+         if len(k_idx) == 0 or len(l_idx) == 0 or len(h_idx) == 0: continue
+
+         k_row, l_row = np.meshgrid(k_idx, l_idx, indexing='ij')
+         k_row, l_row = k_row.ravel(), l_row.ravel()
+
+         x_lo, x_hi = row_interval(tables[1][ib, k_row], tables[2][ib, l_row])
+         start = np.maximum(np.searchsorted(tables[0][ib], x_lo, side='left'), h_idx[0])
+         stop  = np.minimum(np.searchsorted(tables[0][ib], x_hi, side='right'), h_idx[-1] + 1)
+         count = np.maximum(stop - start, 0)
+
+         row = np.repeat(np.arange(len(count)), count)
+         h_row = start[row] + np.arange(len(row)) - np.repeat(np.cumsum(count) - count, count)
+         keys.append(((h_row * size[1] + k_row[row]) * size[2] + l_row[row]) * nb + ib)
+
+      keys = np.sort(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+      keys, b = np.divmod(keys, nb)
+      keys, l = np.divmod(keys, size[2])
+      h, k = np.divmod(keys, size[1])
+
+   return np.vstack((tables[0][b, h], tables[1][b, k], tables[2][b, l]))
+# -------------------------------------------------------------------------------------
+def _block_tables(atomic_basis, translations, center, rmax_pos, rmax_neg):
+   """
+   Per-axis tables of final coordinates and of points surviving the box cut of `_bulk_block`.
+
+   Returns:
+       tuple: (tables, inside), two lists of three arrays of shape (basis atom, cell index).
+   """
+
+   tables, inside = [], []
+   for i in range(3):
+      x = atomic_basis[:, i][:, np.newaxis] + translations[i][np.newaxis, :]
+      r = x - center[i]
+      inside.append((r < rmax_pos[i]) & (-r < rmax_neg[i]))
+      tables.append(x)
+
+   # Center the bounding box at the origin (same operations as ase.Atoms.center)
+   present = np.all([np.any(ok, axis=1) for ok in inside], axis=0)
+   for i in range(3):
+      x = tables[i][present][inside[i][present]]
+      shift = 0.5 * ((1.0 - np.max(x)) - np.min(x)) - 0.5
+      tables[i] = round_as_xyz(tables[i] + shift)
+
+   return tables, inside
+# -------------------------------------------------------------------------------------
+def box_region(lo, hi, pad=1.0e-3):
+   """
+   Axis-aligned box enclosing a shape, for clipped lattice enumeration.
+
+   Args:
+       lo (list[float]): Lower corner (Å). Use -np.inf for unbounded directions.
+       hi (list[float]): Upper corner (Å). Use np.inf for unbounded directions.
+       pad (float, optional): Safety margin added on every side (Å).
+
+   Returns:
+       tuple: (lo, hi, row_interval) with row_interval None (whole box rows).
+   """
+
+   return (np.asarray(lo, dtype=float) - pad, np.asarray(hi, dtype=float) + pad, None)
+# -------------------------------------------------------------------------------------
+def sphere_region(center, radius, pad=1.0e-3):
+   """
+   Region of a sphere; rows solve (x - cx)^2 <= r^2 - (y - cy)^2 - (z - cz)^2.
+   """
+
+   lo, hi, _ = box_region(np.asarray(center) - radius, np.asarray(center) + radius, pad)
+
+   def row_interval(y, z):
+      half = _half_width(radius**2 - (y - center[1])**2 - (z - center[2])**2, pad)
+      return center[0] - half, center[0] + half
+
+   return (lo, hi, row_interval)
+# -------------------------------------------------------------------------------------
+def capsule_region(main_axis, length, width, pad=1.0e-3):
+   """
+   Region of a rod centered at the origin: cylinder capped by two spheres of diameter `width`,
+   with total extent `length` along `main_axis`.
+   """
+
+   axis = {'x': 0, 'y': 1, 'z': 2}[main_axis]
+   radius = width / 2.0
+   cap = max(0.0, (length - width) / 2.0)
+
+   extent = np.full(3, radius)
+   extent[axis] = cap + radius
+   lo, hi, _ = box_region(-extent, extent, pad)
+
+   def row_interval(y, z):
+      if axis == 0:
+         inside_disk = y**2 + z**2 <= (radius + pad)**2
+         half = np.where(inside_disk, cap + radius + pad, -np.inf)
+      else:
+         along, across = (y, z) if axis == 1 else (z, y)
+         half = _half_width(radius**2 - across**2 - np.maximum(np.abs(along) - cap, 0.0)**2, pad)
+      return -half, half
+
+   return (lo, hi, row_interval)
+# -------------------------------------------------------------------------------------
+def cone_region(radius, z_max, pad=1.0e-3):
+   """
+   Region of a cone with apex at the origin and base of `radius` at z = z_max.
+   """
+
+   lo, hi, _ = box_region([-radius, -radius, 0.0], [radius, radius, z_max], pad)
+
+   def row_interval(y, z):
+      half = _half_width((radius / z_max * np.clip(z, 0.0, z_max))**2 - y**2, pad)
+      return -half, half
+
+   return (lo, hi, row_interval)
+# -------------------------------------------------------------------------------------
+def paraboloid_region(a, b, c, z_min, z_max, pad=1.0e-3):
+   """
+   Region of the elliptic paraboloid z >= a*x^2 + b*y^2 + c, with z_min <= z <= z_max.
+   The box is only bounded in x and y when both coefficients are positive.
+   """
+
+   bounded = a > 0.0 and b > 0.0
+   x_max = math.sqrt(max(z_max - c, 0.0) / a) if bounded else np.inf
+   y_max = math.sqrt(max(z_max - c, 0.0) / b) if bounded else np.inf
+   lo, hi, _ = box_region([-x_max, -y_max, z_min], [x_max, y_max, z_max], pad)
+
+   def row_interval(y, z):
+      if a <= 0.0: return np.full(y.shape, -np.inf), np.full(y.shape, np.inf)
+      half = _half_width((z - b * y**2 - c) / a, pad)
+      return -half, half
+
+   return (lo, hi, row_interval)
+# -------------------------------------------------------------------------------------
+def union_regions(*regions):
+   """
+   Smallest region of this kind enclosing all the given regions.
+   """
+
+   lo = np.min([r[0] for r in regions], axis=0)
+   hi = np.max([r[1] for r in regions], axis=0)
+
+   def row_interval(y, z):
+      x_lo = np.full(y.shape, np.inf)
+      x_hi = np.full(y.shape, -np.inf)
+      for r_lo, r_hi, r_row in regions:
+         in_box = (y >= r_lo[1]) & (y <= r_hi[1]) & (z >= r_lo[2]) & (z <= r_hi[2])
+         if r_row is None:
+            lo_i, hi_i = np.full(y.shape, r_lo[0]), np.full(y.shape, r_hi[0])
+         else:
+            lo_i, hi_i = r_row(y, z)
+         x_lo = np.where(in_box, np.minimum(x_lo, lo_i), x_lo)
+         x_hi = np.where(in_box, np.maximum(x_hi, hi_i), x_hi)
+      return x_lo, x_hi
+
+   return (lo, hi, row_interval)
+# -------------------------------------------------------------------------------------
+def inside_region(xyz, region):
+   """
+   Mask of the points inside a region, as enumerated by a clipped bulk.
+
+   Args:
+       xyz (np.ndarray): Lattice coordinates with shape (3, N).
+       region (tuple): Region from the `*_region` helpers.
+
+   Returns:
+       np.ndarray: Boolean mask (N,).
+
+   Notes:
+       - A bulk generated with `region` is the subset of the same bulk generated with
+         only its box, `(lo, hi, None)`, selected by this mask (same bounds and row
+         intervals as `_bulk_block`).
+   """
+
+   lo, hi, row_interval = region
+
+   mask = np.all((xyz >= lo[:, np.newaxis]) & (xyz <= hi[:, np.newaxis]), axis=0)
+
+   if row_interval is not None:
+      x_lo, x_hi = row_interval(xyz[1], xyz[2])
+      mask &= (xyz[0] >= x_lo) & (xyz[0] <= x_hi)
+
+   return mask
+# -------------------------------------------------------------------------------------
+def _half_width(squared, pad):
+   """
+   Padded half-width sqrt(squared) of a row; -inf (empty row) where `squared` is negative
+   beyond the padding.
+   """
+
+   return np.where(squared >= -pad, np.sqrt(np.maximum(squared, 0.0)) + pad, -np.inf)
+# -------------------------------------------------------------------------------------
+def graphene_ribbon_bulk(n, m, bond_length=None):
+   """
+   Generates a flat armchair graphene ribbon in the XY plane, centered at its center of mass.
+
+   Args:
+       n (int): Number of armchair units across the ribbon (x).
+       m (int): Number of unit cells along the ribbon (y).
+       bond_length (float, optional): C-C bond length (Å). Defaults to `param.graphene_bond_length`.
+
+   Returns:
+       np.ndarray: Coordinates with shape (3, N), rounded as in an XYZ file.
+
+   Notes:
+       - Reproduces ase.build.graphene_nanoribbon(n, m, type='armchair') rotated 90 degrees
+         around x, with the same atom order and floating point operations.
+   """
+
+   param = parameters.parameters()
+   C_C = param.graphene_bond_length if bond_length is None else bond_length
+
+   b = math.sqrt(3) * C_C / 4
+   arm_unit = np.array([[0, 0, 0],
+                        [b * 2, 0, C_C / 2.],
+                        [b * 2, 0, 3 * C_C / 2.],
+                        [0, 0, 2 * C_C]])
+
+   # One layer repeats the unit m times along z; layers are stacked towards -x
+   layer = np.tile(arm_unit, (m, 1))
+   layer[:, 2] += np.repeat(np.arange(m) * (3 * C_C), len(arm_unit))
+
+   positions = np.tile(layer, (n, 1))
+   positions[:, 0] -= np.repeat(4 * b * np.arange(n), len(layer))
+   positions[:, 0] -= positions[-1, 0]
+
+   # Rotate the x-z ribbon into the XY plane
+   positions = _rotate_90_x(positions)
+
+   return _center_of_mass_to_000(positions)
+# -------------------------------------------------------------------------------------
+def graphene_sheet_bulk(lattice_constant, size):
+   """
+   Generates a graphene sheet in the XY plane, centered at its center of mass.
+
+   Args:
+       lattice_constant (float): Graphene lattice constant (Å).
+       size (tuple[int, int]): Number of primitive cells along the two lattice vectors.
+
+   Returns:
+       np.ndarray: Coordinates with shape (3, N), rounded as in an XYZ file.
+
+   Notes:
+       - Reproduces ase.build.graphene(a=lattice_constant, size=(size[0], size[1], 1)),
+         with the same atom order and floating point operations.
+   """
+
+   a = lattice_constant
+   cell = np.array([[a, 0, 0], [-a / 2, a * 3**0.5 / 2, 0], [0, 0, 0]], dtype=float)
+
+   complete = cell.copy()
+   complete[2] = np.cross(cell[0], cell[1])
+   complete[2] /= np.linalg.norm(complete[2])
+
+   unit = [[0, 0, 0], [2 / 3, 1 / 3, 0]] @ complete
+
+   cells = np.stack(np.meshgrid(np.arange(size[0]), np.arange(size[1]), [0], indexing='ij'), axis=-1).reshape(-1, 3)
+   positions = np.tile(unit, (len(cells), 1))
+   positions += np.repeat(np.dot(cells, cell), len(unit), axis=0)
+
+   return _center_of_mass_to_000(positions)
+# -------------------------------------------------------------------------------------
+def _rotate_90_x(positions):
+   """
+   Rotates positions (N, 3) by 90 degrees around x with the operations of ase.Atoms.rotate.
+   """
+
+   angle = 90 * (math.pi / 180)
+   c, s = math.cos(angle), math.sin(angle)
+   v = np.array([1.0, 0.0, 0.0])
+   center = np.zeros(3)
+
+   p = positions - center
+
+   return c * p - np.cross(p, s * v) + np.outer(np.dot(p, v), (1.0 - c) * v) + center
+# -------------------------------------------------------------------------------------
+def _center_of_mass_to_000(positions):
+   """
+   Translates carbon positions (N, 3) so that their center of mass sits at the origin.
+
+   Returns:
+       np.ndarray: Coordinates with shape (3, N), rounded as in an XYZ file.
+   """
+
+   param = parameters.parameters()
+
+   masses = np.full(len(positions), param.carbon_mass)
+   com = masses @ positions / masses.sum()
+
+   positions += -com
+
+   return round_as_xyz(np.ascontiguousarray(positions.T))
+# -------------------------------------------------------------------------------------
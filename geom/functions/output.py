@@ -1,4 +1,22 @@
+import os
 import sys
+import time
+import gzip
+import lzma
+import uuid
+import contextlib
+import numpy as np
+
+# Streaming compression of XYZ outputs: file suffix, opener and speed/ratio setting
+COMPRESSION = {None:   ('',    open,      {}),
+               'gzip': ('.gz', gzip.open, {'compresslevel': 6}),
+               'xz':   ('.xz', lzma.open, {'preset': 1})}
+
+# Atoms formatted per block by `write_geom_frame`
+WRITE_BLOCK = 100000
+
+# Lists collecting the outputs completed inside `record_outputs` blocks
+_recorders = []
 
 # -------------------------------------------------------------------------------------
 def error(error_message):
@@ -87,30 +105,230 @@ def logfile_close(out_log):
 
    return(out_log)
 # -------------------------------------------------------------------------------------
-def print_geom(molecule,output_file):
+def print_geom(molecule,output_file,decimals=8,compression=None):
    """
    Saves molecular geometry to an XYZ file.
 
    Args:
        molecule (molecule): The molecule object containing atomic data.
        output_file (str): The name of the output XYZ file.
+       decimals (int): Decimal places of the coordinates.
+       compression (str, optional): None, "gzip" or "xz".
 
    Returns:
-       None: The function writes the geometry to `results_geom/{output_file}.xyz`.
+       None: The function writes the geometry to `results_geom/{output_file}.xyz`
+       (plus ".gz" or ".xz" when compressed).
 
    Notes:
        - The first line of the XYZ file contains the number of atoms.
        - The second line contains a header.
-       - The atomic coordinates are printed with 8 decimal places.
+       - The atomic coordinates are printed with 8 decimal places by default.
+       - Compressed files are written as a stream, block by block.
+   """
+
+   with open_geom_file(f'results_geom/{output_file}.xyz', 'w', compression) as out_f:
+       write_geom_frame(out_f, molecule, decimals=decimals)
+# -------------------------------------------------------------------------------------
+def open_geom_file(geom_file, mode='w', compression=None, buffer_size=1 << 20):
+   """
+   Opens an XYZ output file, optionally compressed.
+
+   Args:
+       geom_file (str): Path of the XYZ file, without compression suffix.
+       mode (str): "w" to write or "a" to append.
+       compression (str, optional): None, "gzip" or "xz".
+       buffer_size (int): Write buffer size in bytes (uncompressed files).
+
+   Returns:
+       file: Open text handle.
+
+   Notes:
+       - In "w" mode the file is written atomically (see `open_output`).
+   """
+
+   if compression not in COMPRESSION: error(f'Compression "{compression}" not supported (gzip, xz).')
+
+   suffix, opener, level = COMPRESSION[compression]
+
+   if compression is None:
+      options = {'buffering': buffer_size}
+   else:
+      mode, options = mode + 't', level
+
+   if mode.startswith('a'): return opener(geom_file + suffix, mode, **options)
+
+   return open_output(geom_file + suffix, mode, opener, **options)
+# -------------------------------------------------------------------------------------
+def open_output(out_file, mode='w', opener=open, **options):
+   """
+   Opens an output file that only appears under its name once it is complete.
+
+   Args:
+       out_file (str): Final path of the output file.
+       mode (str): Write mode ("w", "wb", "wt", ...).
+       opener (callable): Function opening the file (`open`, `gzip.open`, `lzma.open`).
+       **options: Extra arguments of `opener`.
+
+   Returns:
+       file: Handle writing to a temporary file next to `out_file` (see `atomic_path`),
+       renamed to `out_file` on `close()`. Used as a context manager, the temporary
+       file is discarded if the block raises.
+   """
+
+   return _atomic_file(out_file, mode, opener, **options)
+# -------------------------------------------------------------------------------------
+@contextlib.contextmanager
+def atomic_path(out_file):
+   """
+   Reserves a temporary path next to an output file and renames it into place.
+
+   Args:
+       out_file (str): Final path of the output file.
+
+   Yields:
+       str: Temporary path, in the same folder and with the same extension, for
+       writers that take a path (gmsh, RDKit, ...).
+
+   Notes:
+       - The rename (`os.replace`) is atomic within a folder, so concurrent runs and
+         readers never see a partial output, and a failed write leaves no file behind.
+   """
+
+   part_file = _part_file(out_file)
+
+   try:
+      yield part_file
+      os.replace(part_file, out_file)
+      _completed(out_file)
+   finally:
+      if os.path.exists(part_file): os.remove(part_file)
+# -------------------------------------------------------------------------------------
+@contextlib.contextmanager
+def record_outputs():
+   """
+   Collects the outputs completed by the atomic writers inside a block.
+
+   Yields:
+       list[str]: Paths of the files renamed into place (see `open_output`, `atomic_path`),
+       in completion order.
+   """
+
+   completed = []
+   _recorders.append(completed)
+
+   try:
+      yield completed
+   finally:
+      _recorders.remove(completed)
+# -------------------------------------------------------------------------------------
+def _completed(out_file):
+   """
+   Adds a completed output to the active `record_outputs` blocks.
+   """
+
+   for completed in _recorders: completed.append(out_file)
+# -------------------------------------------------------------------------------------
+def _part_file(out_file):
+   """
+   Returns a unique hidden temporary path next to `out_file`, keeping its extension.
+   """
+
+   folder, name = os.path.split(out_file)
+   stem, ext = os.path.splitext(name)
+
+   return os.path.join(folder, f'.{stem}.{uuid.uuid4().hex[:12]}.part{ext}')
+# -------------------------------------------------------------------------------------
+class _atomic_file:
+   """
+   File handle renamed from its temporary path to the final one when closed (see `open_output`).
+   """
+
+   def __init__(self, out_file, mode, opener, **options):
+      self.name = out_file
+      self.part_file = _part_file(out_file)
+      self._handle = opener(self.part_file, mode, **options)
+
+   def __getattr__(self, attribute):
+      return getattr(self._handle, attribute)
+
+   def __enter__(self):
+      return self
+
+   def __exit__(self, exc_type, exc_value, traceback):
+      if exc_type is None:
+         self.close()
+      else:
+         self.discard()
+
+   def write(self, data):
+      return self._handle.write(data)
+
+   def close(self):
+      if self._handle.closed: return
+
+      self._handle.close()
+      os.replace(self.part_file, self.name)
+      _completed(self.name)
+
+   def discard(self):
+      self._handle.close()
+      if os.path.exists(self.part_file): os.remove(self.part_file)
+# -------------------------------------------------------------------------------------
+def open_geom_trajectory(output_file, append=False, buffer_size=1 << 20, out_dir='results_geom', compression=None):
+   """
+   Opens a multi-frame XYZ file for a whole scan.
+
+   Args:
+       output_file (str): The name of the output XYZ file.
+       append (bool): If True, frames are added after those already in the file.
+       buffer_size (int): Write buffer size in bytes.
+       out_dir (str): Output folder.
+       compression (str, optional): None, "gzip" or "xz".
+
+   Returns:
+       file: Open text handle on `{out_dir}/{output_file}.xyz`; pass it to
+       `write_geom_frame` once per frame and close it at the end of the scan.
+
+   Notes:
+       - A single buffered handle replaces one `print_geom` file per structure.
+       - `xyz_io.iter_xyz` and `molecule.read_frames` read the frames back lazily.
+   """
+
+   return open_geom_file(f'{out_dir}/{output_file}.xyz', 'a' if append else 'w', compression, buffer_size)
+# -------------------------------------------------------------------------------------
+def write_geom_frame(out_f,molecule,comment='Generated with GEOM code',decimals=8):
    """
+   Writes one XYZ frame of a molecular geometry to an open file.
 
-   with open(f'results_geom/{output_file}.xyz', 'w') as out_f:
-       out_f.write(f"{molecule.nAtoms}\n")
-       out_f.write('Generated with GEOM code\n')
+   Args:
+       out_f (file): Open text file; frames written one after another form a multi-frame XYZ.
+       molecule (molecule): The molecule object containing atomic data.
+       comment (str): Comment (second) line of the frame.
+       decimals (int): Decimal places of the coordinates (field width 12 + decimals).
+
+   Returns:
+       None
 
-       for i in range(molecule.nAtoms):
-           atom, x, y, z = molecule.atoms[i], *molecule.xyz[:, i]
-           out_f.write(f'{atom.capitalize():2} {x:20.8f} {y:20.8f} {z:20.8f}\n')
+   Notes:
+       - Atoms are formatted `WRITE_BLOCK` at a time with a single %-format over the
+         whole block, which gives the same text as formatting every line on its own.
+       - Labels are taken from the element codes, capitalized once per table entry.
+   """
+
+   out_f.write(f"{molecule.nAtoms}\n")
+   out_f.write(f'{comment}\n')
+
+   line   = f'%-2s %{12 + decimals}.{decimals}f %{12 + decimals}.{decimals}f %{12 + decimals}.{decimals}f\n'
+   labels = np.array([label.capitalize() for label in molecule.element_table()], dtype=object)
+
+   for start in range(0, molecule.nAtoms, WRITE_BLOCK):
+       end = min(start + WRITE_BLOCK, molecule.nAtoms)
+
+       block = np.empty((end - start, 4), dtype=object)
+       block[:, 0]  = labels[molecule.codes[start:end]]
+       block[:, 1:] = molecule.xyz[:, start:end].T
+
+       out_f.write((line * (end - start)) % tuple(block.ravel().tolist()))
 # -------------------------------------------------------------------------------------
 def print_optimization_starts():
    """
@@ -188,6 +406,48 @@ def save_distance_opt(out_log,distance,dist_new,dir_axis_input):
    
    out_log.write(f" {'  Convergence achieved to distance':>34} {dist_new:20.8f} {'Å':>5}\n\n\n")
 # -------------------------------------------------------------------------------------
+def print_dropped_atoms(n_dropped,n_atoms):
+   """
+   Prints how many atoms were dropped because they overlap with another geometry.
+
+   Args:
+       n_dropped (int): Number of overlapping atoms removed.
+       n_atoms (int): Number of atoms checked.
+
+   Returns:
+       None
+   """
+
+   print(f'  Overlapping atoms dropped: {n_dropped} of {n_atoms}')
+# -------------------------------------------------------------------------------------
+def print_scan_timing(output_file,distances,shift_time,frame_times):
+   """
+   Prints the timing of a distance scan, frame by frame.
+
+   Args:
+       output_file (str): Name of the multi-frame XYZ file (without extension).
+       distances (list[float]): Achieved minimum distance of every frame.
+       shift_time (float): Time spent solving all shifts (seconds).
+       frame_times (list[float]): Time spent on every frame (seconds).
+
+   Returns:
+       None
+   """
+
+   print('')
+   print('  -----------------------------------------------')
+   print(f'    Scan file : results_geom/{output_file}.xyz')
+   print(f'    Frames    : {len(frame_times)}')
+   print(f'    Shifts    : {shift_time * 1000.0:.3f} ms (all frames)')
+   print('')
+   print(f'    {"Frame":>6} {"d (Å)":>14} {"time (ms)":>12}')
+   for i, (distance, frame_time) in enumerate(zip(distances, frame_times)):
+      print(f'    {i + 1:>6} {distance:>14.6f} {frame_time * 1000.0:>12.3f}')
+   print('')
+   print(f'    Total     : {(shift_time + sum(frame_times)) * 1000.0:.3f} ms')
+   print('  -----------------------------------------------')
+   print('')
+# -------------------------------------------------------------------------------------
 def print_normal_termination(inp):
    """
    Prints a normal termination banner if the process completes successfully.
@@ -232,6 +492,134 @@ def print_min_dist(inp,distance):
    print('  -----------------------------------------------')
    print('')
 # -------------------------------------------------------------------------------------
+def print_orientation_scan(inp,table_file,grid,distances):
+   """
+   Prints the extremes of an orientation scan of the minimum distance.
+
+   Args:
+       inp (input_class): The input class instance containing file information.
+       table_file (str): Name of the table file (without extension).
+       grid (numpy.ndarray): Angles of every orientation, one column per scanned axis.
+       distances (numpy.ndarray): Minimum distance of every orientation.
+
+   Returns:
+       None
+   """
+
+   closest, farthest = np.argmin(distances), np.argmax(distances)
+
+   angles = [' '.join(f'{axis}={angle:g}' for axis, angle in zip(inp.scan_axes, grid[i])) for i in (closest, farthest)]
+
+   print('')
+   print('  -----------------------------------------------')
+   print(f'    Geometry 1  : {inp.geom1_file}')
+   print(f'    Geometry 2  : {inp.geom2_file}')
+   print(f'    Orientations: {len(distances)} ({inp.n_procs} processes)')
+   print(f'    Table       : results_geom/{table_file}.dat')
+   print('')
+   print(f'    Closest     : {distances[closest]:.4f} Å at {angles[0]}')
+   print(f'    Farthest    : {distances[farthest]:.4f} Å at {angles[1]}')
+   print('  -----------------------------------------------')
+   print('')
+# -------------------------------------------------------------------------------------
+def print_placement(inp,map_file,shifts,distances,contacts):
+   """
+   Prints the best displacements of a placement grid search.
+
+   Args:
+       inp (input_class): The input class instance containing file information.
+       map_file (str): Name of the distance/collision map file (without extension).
+       shifts (numpy.ndarray): Best displacement vectors (K, 3), best first.
+       distances (numpy.ndarray): Minimum distance of every best displacement.
+       contacts (numpy.ndarray): Contact count of every best displacement.
+
+   Returns:
+       None
+   """
+
+   print('')
+   print('  -----------------------------------------------')
+   print(f'    Geometry 1 : {inp.geom1_file}')
+   print(f'    Geometry 2 : {inp.geom2_file}')
+   print(f'    Target gap : {inp.place_target} Å (contacts below {inp.place_cutoff} Å)')
+   print(f'    Map        : results_geom/{map_file}.dat')
+   print('')
+   print(f'    {"dx (Å)":>10} {"dy (Å)":>10} {"dz (Å)":>10} {"d (Å)":>10} {"contacts":>9}')
+   for shift, distance, n_contacts in zip(shifts, distances, contacts):
+      print(f'    {shift[0]:>10.4f} {shift[1]:>10.4f} {shift[2]:>10.4f} {distance:>10.4f} {n_contacts:>9d}')
+   print('  -----------------------------------------------')
+   print('')
+# -------------------------------------------------------------------------------------
+def print_cache_stats(summary):
+   """
+   Prints the contents of the bulk lattice cache.
+
+   Args:
+       summary (dict): Cache summary from `bulk_cache.stats`.
+
+   Returns:
+       None
+   """
+
+   print('')
+   print('  -----------------------------------------------')
+   print(f'    Bulk cache : {summary["dir"]}')
+   print(f'    Entries    : {len(summary["entries"])}')
+   print(f'    Size       : {summary["size"] / 2**20:.1f} MiB of {summary["size_cap"] / 2**20:.1f} MiB')
+
+   if summary['entries']:
+      print('')
+      print(f'    {"element":>7} {"lattice":>7} {"layers":>14} {"atoms":>10} {"MiB":>8}  last use')
+      for entry in reversed(summary['entries']):
+         spec = entry['spec']
+         layers = 'x'.join(str(l) for l in spec['layers'])
+         last_use = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_use']))
+         print(f'    {spec["element"]:>7} {spec["arrangement"]:>7} {layers:>14} {entry["natoms"]:>10d} {entry["size"] / 2**20:>8.2f}  {last_use}')
+
+   print('  -----------------------------------------------')
+   print('')
+# -------------------------------------------------------------------------------------
+def print_store_stats(summary):
+   """
+   Prints the contents of the result store of create commands.
+
+   Args:
+       summary (dict): Store summary from `result_store.stats`.
+
+   Returns:
+       None
+   """
+
+   print('')
+   print('  -----------------------------------------------')
+   print(f'    Result store : {summary["dir"]}')
+   print(f'    Entries      : {summary["entries"]}')
+   print(f'    Size         : {summary["size"] / 2**20:.1f} MiB of {summary["size_cap"] / 2**20:.1f} MiB')
+   print(f'    Hits         : {summary["hits"]}')
+   print(f'    Misses       : {summary["misses"]}')
+   print('  -----------------------------------------------')
+   print('')
+# -------------------------------------------------------------------------------------
+def print_cache_cleared(cache_dir, n_removed, label='Bulk cache'):
+   """
+   Prints the number of entries removed from the bulk lattice cache or the result store.
+
+   Args:
+       cache_dir (str): Cache folder.
+       n_removed (int): Number of removed entries.
+       label (str, optional): Name of the cleared cache.
+
+   Returns:
+       None
+   """
+
+   print('')
+   print('  -----------------------------------------------')
+   print(f'    {label:<12} : {cache_dir}')
+   print(f'    {"Removed":<12} : {n_removed} entries')
+   print('  -----------------------------------------------')
+   print('')
+# -------------------------------------------------------------------------------------
 def print_geom_center(inp,xyz_c):
    """
    Prints the geometrical center of a molecule.
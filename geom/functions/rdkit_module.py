@@ -1,7 +1,5 @@
 import io, sys, os, shutil
 import webbrowser, tempfile
-import py3Dmol
-import matplotlib.pyplot as plt
 
 from geom.classes import parameters, molecule
 from geom.functions import output, general
@@ -22,13 +20,15 @@ def select_case(inp):
   """
 
 
-  if (inp.rdkit_visualize): visualize(inp)
-  if (inp.rdkit_file_conversion): file_conversion(inp)
-  if (inp.rdkit_opt and not inp.rdkit_conformers): force_field_optimization(inp)
-  if (inp.rdkit_conformers): generate_conformers(inp)
+  try:
+    if (inp.rdkit_visualize): visualize(inp)
+    if (inp.rdkit_file_conversion): file_conversion(inp)
+    if (inp.rdkit_opt and not inp.rdkit_conformers): force_field_optimization(inp)
+    if (inp.rdkit_conformers): generate_conformers(inp)
 
-  # Eliminate tmp folder containing xyz to pdb structure
-  if (inp.rdkit_mol_file_extension==".xyz"): shutil.rmtree(inp.tmp_folder)
+  # Eliminate scratch folder containing xyz to pdb structure, also after an error
+  finally:
+    if (inp.tmp_folder): shutil.rmtree(inp.tmp_folder, ignore_errors=True)
 # -------------------------------------------------------------------------------------
 def visualize(inp):
   """
@@ -72,7 +72,7 @@ def file_conversion(inp):
     
     # Write to output file
     out_file = os.path.join("results_geom",inp.rdkit_output_file)
-    save_rdkit_file(mol, out_file)
+    with output.atomic_path(out_file) as part_file: save_rdkit_file(mol, part_file)
 # -------------------------------------------------------------------------------------
 def force_field_optimization(inp):
     """
@@ -144,7 +144,7 @@ def force_field_optimization(inp):
 
     # Save to requested output
     out_file = os.path.join("results_geom", inp.rdkit_output_file)
-    save_rdkit_file(mol, out_file)
+    with output.atomic_path(out_file) as part_file: save_rdkit_file(mol, part_file)
 # -------------------------------------------------------------------------------------
 def generate_conformers(inp):
     """
@@ -345,7 +345,8 @@ def save_rdkit_conformers(mol, inp, out_dir="results_geom", max_digits=7):
         max_digits (int): Maximum digits for conformer numbering.
 
     Returns:
-        None: Saves each conformer to separate files.
+        None: Saves each conformer to separate files, or all of them as the frames
+        of a single multi-frame XYZ file if `inp.rdkit_confs_traj` is set.
     """
 
     param = parameters.parameters()
@@ -383,6 +384,24 @@ def save_rdkit_conformers(mol, inp, out_dir="results_geom", max_digits=7):
     tag_opt = bool(getattr(inp, "rdkit_opt", False))
     ff_tag  = str(getattr(inp, "rdkit_force_field", "")).strip()
 
+    if bool(getattr(inp, "rdkit_confs_traj", False)):
+        if ext != ".xyz":
+            output.error("-traj is only available for xyz conformers (-ext xyz).")
+
+        stem_traj = f"{stem}_opt_{ff_tag}" if tag_opt else stem
+        with output.open_geom_trajectory(f"{stem_traj}_confs", out_dir=out_dir) as f:
+            for i in range(nconfs):
+                status = ""
+                if tag_opt:
+                    conv = _conf_converged(mol, i)
+                    status = " ; " + ("CONV" if conv is True else ("NOTCONV" if conv is False else "UNKNOWN"))
+
+                # Replace the (empty) title line of each block with the conformer tag
+                lines = Chem.MolToXYZBlock(mol, confId=int(i)).splitlines()
+                lines[1] = f"conf = {i:0{width}d}{status}"
+                f.write("\n".join(lines) + "\n")
+        return
+
     for i in range(nconfs):
         idx_str = f"{i:0{width}d}"  # 1-based index in filenames
 
@@ -396,22 +415,23 @@ def save_rdkit_conformers(mol, inp, out_dir="results_geom", max_digits=7):
         out_path = os.path.join(out_dir, f"{stem_i}_conf_{idx_str}{ext}")
 
         if ext == ".sdf":
-            w = Chem.SDWriter(out_path)
-            try:
-                mol.SetIntProp("_ConfId", int(i))
-            except Exception:
-                pass
-            w.write(mol, confId=int(i))
-            w.close()
+            with output.atomic_path(out_path) as part_path:
+                w = Chem.SDWriter(part_path)
+                try:
+                    mol.SetIntProp("_ConfId", int(i))
+                except Exception:
+                    pass
+                w.write(mol, confId=int(i))
+                w.close()
 
         elif ext == ".pdb":
             block = Chem.MolToPDBBlock(mol, confId=int(i))
-            with open(out_path, "w") as f:
+            with output.open_output(out_path) as f:
                 f.write(block if block.endswith("\n") else block + "\n")
 
         elif ext == ".xyz":
             block = Chem.MolToXYZBlock(mol, confId=int(i))
-            with open(out_path, "w") as f:
+            with output.open_output(out_path) as f:
                 f.write(block if block.endswith("\n") else block + "\n")
 # -------------------------------------------------------------------------------------
 def embed_3d(mol):
@@ -612,6 +632,7 @@ def plot_2d_molecule(mol, inp, size=(800, 700)):
 
     png = drawer.GetDrawingText()
     import PIL.Image as Image, io
+    import matplotlib.pyplot as plt
     img = Image.open(io.BytesIO(png))
 
     # --- Pretty gnuplot-like legend to distinguish aromatic atoms/bond and matched structure ---
@@ -658,6 +679,7 @@ def plot_3d_molecule(mol, style="ballstick", width=1600, height=900, background=
     mol = embed_3d(mol)
 
     mblock = Chem.MolToMolBlock(mol)
+    import py3Dmol
     view = py3Dmol.view(width=width, height=height)
     view.addModel(mblock, 'mol')
 
@@ -685,16 +707,8 @@ def xyz_to_pdb(inp):
         input_class: Updated input object with PDB file path.
     """
 
-    # Determine the script's location
-    script_path = os.path.abspath(__file__)
-    script_dir  = os.path.dirname(script_path)
-    base_dir    = os.path.dirname(script_dir)
-
-    # Create tmp folder
-    inp.tmp_folder = os.path.join(base_dir, 'tmp')
-    if os.path.exists(inp.tmp_folder):
-        shutil.rmtree(inp.tmp_folder)
-    os.mkdir(inp.tmp_folder)
+    # Create a private scratch folder for the PDB (removed by `select_case`)
+    inp.tmp_folder = general.create_scratch_dir()
 
     # --- 1) Read XYZ ---
     tmp_mol = molecule.molecule()
@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+
+from geom.classes import parameters
+from geom.functions import output
+
+# Attributes that hold data derived from the parameters, not parameters
+DERIVED = {'bulk_atoms', 'bulk_xyz', 'mol_output', 'tmp_folder'}
+
+# Hit/miss counters of the store
+COUNTERS = 'counters.json'
+
+# Hash of the package sources (see `code_version`)
+_code_version = None
+
+# -------------------------------------------------------------------------------------
+def normalized_parameters(inp):
+   """
+   Parameters of a create command in canonical, JSON-serializable form.
+
+   Args:
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       dict: Every parameter attribute of `inp` (derived data excluded), with tuples
+       and NumPy values turned into lists and Python scalars.
+   """
+
+   def plain(value):
+      if isinstance(value, np.ndarray): return value.tolist()
+      if isinstance(value, np.generic): return value.item()
+      if isinstance(value, (list, tuple)): return [plain(item) for item in value]
+      return value
+
+   return {name: plain(value) for name, value in vars(inp).items() if name not in DERIVED}
+# -------------------------------------------------------------------------------------
+def code_version():
+   """
+   Version of the code that builds the structures.
+
+   Returns:
+       str: SHA-256 hex digest of the sources of `geom.classes` and `geom.functions`,
+       so that any change of the code invalidates the stored results.
+   """
+
+   global _code_version
+
+   if _code_version is None:
+      package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+      digest = hashlib.sha256()
+
+      for folder in ['classes', 'functions']:
+         for name in sorted(os.listdir(os.path.join(package, folder))):
+            if not name.endswith('.py'): continue
+            digest.update(f'{folder}/{name}'.encode())
+            with open(os.path.join(package, folder, name), 'rb') as source: digest.update(source.read())
+
+      _code_version = digest.hexdigest()
+
+   return _code_version
+# -------------------------------------------------------------------------------------
+def result_key(inp):
+   """
+   Content address of the result of a create command.
+
+   Args:
+       inp (input_class): An instance containing input parameters, as parsed.
+
+   Returns:
+       str or None: SHA-256 hex digest of the normalized parameters and the code version,
+       or None when the result is not reproducible (random alloys) or the store is disabled.
+   """
+
+   if inp.alloy or parameters.parameters().result_store_size <= 0: return None
+
+   request = {'parameters': normalized_parameters(inp), 'code': code_version()}
+
+   return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+# -------------------------------------------------------------------------------------
+def restore(key, inp):
+   """
+   Copies a stored result into `results_geom/`.
+
+   Args:
+       key (str or None): Result key (see `result_key`).
+       inp (input_class): An instance containing input parameters; the attributes set
+           by the original run (e.g. `xyz_output`) are restored.
+
+   Returns:
+       bool: True on a hit, False on a miss (or when `key` is None).
+
+   Notes:
+       - Files are copied atomically (`output.atomic_path`), and a hit refreshes the last
+         use of the entry, which orders the eviction.
+   """
+
+   if key is None: return False
+
+   entry = os.path.join(parameters.parameters().result_store_dir, key)
+
+   try:
+      with open(os.path.join(entry, 'meta.json')) as infile: meta = json.load(infile)
+   except (OSError, ValueError):
+      count('misses')
+      return False
+
+   os.makedirs('results_geom', exist_ok=True)
+
+   try:
+      for name in meta['files']:
+         with output.atomic_path(os.path.join('results_geom', name)) as part_file:
+            shutil.copyfile(os.path.join(entry, name), part_file)
+      os.utime(os.path.join(entry, 'meta.json'))
+   except OSError:
+      count('misses')
+      return False
+
+   for name, value in meta['attributes'].items(): setattr(inp, name, value)
+
+   count('hits')
+
+   return True
+# -------------------------------------------------------------------------------------
+def record(key, inp, before, outputs):
+   """
+   Stores the result of a create command with its metadata.
+
+   Args:
+       key (str or None): Result key (see `result_key`); nothing is stored if None.
+       inp (input_class): An instance containing input parameters, after the run.
+       before (dict): Normalized parameters before the run (see `normalized_parameters`).
+       outputs (list[str]): Output files of the run (see `output.record_outputs`).
+
+   Returns:
+       None
+
+   Notes:
+       - The entry is assembled in a temporary folder and renamed into place, so
+         concurrent runs never see a partial entry; if another run stored the same
+         result first, its entry is kept.
+       - The metadata holds the parameters, the code version, the output files and the
+         attributes the run set on `inp`, restored on a hit.
+       - Entries beyond `parameters.result_store_size` bytes are evicted, least recently
+         used first. A store folder that cannot be written only disables the store.
+   """
+
+   if key is None or not outputs: return
+
+   param = parameters.parameters()
+   after = normalized_parameters(inp)
+
+   meta = {'parameters': before, 'code': code_version(), 'created': time.time(),
+           'files': [os.path.basename(out_file) for out_file in outputs],
+           'attributes': {name: value for name, value in after.items() if before.get(name) != value}}
+
+   part_entry = output._part_file(os.path.join(param.result_store_dir, key))
+
+   try:
+      os.makedirs(param.result_store_dir, exist_ok=True)
+      os.mkdir(part_entry)
+
+      for out_file in outputs: shutil.copyfile(out_file, os.path.join(part_entry, os.path.basename(out_file)))
+      with open(os.path.join(part_entry, 'meta.json'), 'w') as outfile: json.dump(meta, outfile, sort_keys=True)
+
+      os.replace(part_entry, os.path.join(param.result_store_dir, key))
+   except (OSError, TypeError):
+      shutil.rmtree(part_entry, ignore_errors=True)
+      return
+
+   evict(param.result_store_size)
+# -------------------------------------------------------------------------------------
+def count(event):
+   """
+   Increments a hit/miss counter of the store.
+
+   Args:
+       event (str): "hits" or "misses".
+
+   Returns:
+       None
+
+   Notes:
+       - The counters file is replaced atomically; increments of runs finishing at the
+         same instant may be lost, so the counters are indicative.
+   """
+
+   store_dir = parameters.parameters().result_store_dir
+   counters = counts()
+   counters[event] += 1
+
+   try:
+      os.makedirs(store_dir, exist_ok=True)
+      with output.open_output(os.path.join(store_dir, COUNTERS)) as outfile: json.dump(counters, outfile)
+   except OSError:
+      pass
+# -------------------------------------------------------------------------------------
+def counts():
+   """
+   Returns the hit/miss counters of the store.
+
+   Returns:
+       dict: {"hits": int, "misses": int}.
+   """
+
+   try:
+      with open(os.path.join(parameters.parameters().result_store_dir, COUNTERS)) as infile: counters = json.load(infile)
+   except (OSError, ValueError):
+      counters = {}
+
+   return {'hits': int(counters.get('hits', 0)), 'misses': int(counters.get('misses', 0))}
+# -------------------------------------------------------------------------------------
+def entries():
+   """
+   Lists the stored results, least recently used first.
+
+   Returns:
+       list[tuple]: (path, size in bytes, last use as a POSIX timestamp) of every entry.
+   """
+
+   store_dir = parameters.parameters().result_store_dir
+   if not os.path.isdir(store_dir): return []
+
+   found = []
+   for name in os.listdir(store_dir):
+      entry = os.path.join(store_dir, name)
+      if name.startswith('.') or not os.path.isdir(entry): continue
+      try:
+         size = sum(os.path.getsize(os.path.join(entry, item)) for item in os.listdir(entry))
+         last_use = os.path.getmtime(os.path.join(entry, 'meta.json'))
+      except OSError:
+         continue
+      found.append((entry, size, last_use))
+
+   return sorted(found, key=lambda entry: entry[2])
+# -------------------------------------------------------------------------------------
+def evict(size_cap):
+   """
+   Removes the least recently used results until the store holds at most `size_cap` bytes.
+
+   Args:
+       size_cap (int): Maximum total size of the entries (bytes).
+
+   Returns:
+       int: Number of removed entries.
+   """
+
+   found = entries()
+   total = sum(size for _, size, _ in found)
+
+   removed = 0
+   for entry, size, _ in found:
+      if total <= size_cap: break
+      shutil.rmtree(entry, ignore_errors=True)
+      total -= size
+      removed += 1
+
+   return removed
+# -------------------------------------------------------------------------------------
+def stats():
+   """
+   Summary of the store contents.
+
+   Returns:
+       dict: Store folder, size cap, hit/miss counters, number of entries and total size (bytes).
+   """
+
+   param = parameters.parameters()
+   found = entries()
+
+   return {'dir': param.result_store_dir, 'size_cap': param.result_store_size, **counts(),
+           'entries': len(found), 'size': sum(size for _, size, _ in found)}
+# -------------------------------------------------------------------------------------
+def clear():
+   """
+   Removes every stored result and resets the counters.
+
+   Returns:
+       int: Number of removed entries.
+   """
+
+   removed = evict(-1)
+
+   try:
+      os.remove(os.path.join(parameters.parameters().result_store_dir, COUNTERS))
+   except OSError:
+      pass
+
+   return removed
+# -------------------------------------------------------------------------------------
@@ -1,7 +1,7 @@
-import math
-import copy
+import contextlib
+import numpy as np
 
-from geom.classes import molecule
+from geom.classes import molecule, parameters, transform
 from geom.functions import general, tools, output
 
 # -------------------------------------------------------------------------------------
@@ -16,8 +16,26 @@ def select_case(inp):
        None: Calls the corresponding rotation function.
    """
 
-   if (inp.rotate_angles): rotate_angles(inp)
-   if (inp.rotate_1):      rotate_1(inp)
+   if (inp.rotate_angles):   rotate_angles(inp)
+   if (inp.rotate_1):        rotate_1(inp)
+   if (inp.rotate_min_dist): rotate_min_dist(inp)
+# -------------------------------------------------------------------------------------
+def rotation_axis(inp):
+   """
+   Returns the rotation axis and sense given in the input.
+
+   Args:
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       tuple:
+           - str or list[float]: Cartesian axis ("x", "y", "z") or normalized direction vector.
+           - str: Sense of rotation, "+" or "-" ("+" for a direction vector).
+   """
+
+   if (inp.dir_axis_input.count(',') == 2): return(inp.dir_factor, '+')
+
+   return(inp.dir_axis_input[1], inp.dir_axis_input[0])
 # -------------------------------------------------------------------------------------
 def rotate_angles(inp):
    """ 
@@ -32,8 +50,12 @@ def rotate_angles(inp):
    Notes:
        - Reads the molecule from the specified geometry file.
        - Adjusts angles based on the specified axis direction.
-       - Iterates through the list of angles and applies rotation.
-       - Saves each rotated geometry as an output file.
+       - The rotations of all angles are applied in batches (`transform.apply_all`):
+         each batch produces the frames of several angles in one vectorized pass, and
+         holds at most `parameters.transform_batch_size` rotated coordinates.
+       - The axis is a Cartesian axis or an arbitrary direction vector.
+       - Saves each rotated geometry as an output file, or, in scan mode
+         (`inp.rotate_scan`), every angle as a frame of a single multi-frame XYZ file.
    """
 
    # Check input, create results folder, initialize logfile
@@ -43,23 +65,44 @@ def rotate_angles(inp):
 
    # Initialize molecules and read geometry
    mol = molecule.molecule()
-   mol_rot = molecule.molecule()
 
    mol.read_geom(inp.geom_file,inp.move_geom_to_000)
 
    # Adjust angles depending on direction
-   if inp.dir_axis_input[0] == '-': inp.angles = [360 - angle for angle in inp.angles]
- 
-   # Rotate over all angles
-   for angle in inp.angles:
+   axis, sense = rotation_axis(inp)
+   if sense == '-': inp.angles = [360 - angle for angle in inp.angles]
 
-      mol_rot = tools.rotate(mol,angle,inp.dir_axis_input,mol_rot)
+   # Scan mode: one open file for all frames, discarded if the scan fails
+   scan_file = contextlib.nullcontext()
+   if (inp.rotate_scan):
+      inp.file_geom_rotated = f"{general.geom_file_stem(inp.geom_file)}_{inp.dir_axis_input}_scan"
+      scan_file = output.open_geom_trajectory(inp.file_geom_rotated)
 
-      # Save rotate geometry
-      if inp.dir_axis_input[0] == '-': inp.file_geom_rotated = f"{inp.geom_file[:-4]}_{inp.dir_axis_input}_degree_{abs(angle - 360)}"
-      if inp.dir_axis_input[0] == '+': inp.file_geom_rotated = f"{inp.geom_file[:-4]}_{inp.dir_axis_input}_degree_{angle}" 
-       
-      output.print_geom(mol_rot, inp.file_geom_rotated)
+   # Rotation stack, applied in batches that fit the memory budget
+   rotations = [transform.transform.rotation(angle, axis) for angle in inp.angles]
+
+   batch_size = max(1, parameters.parameters().transform_batch_size // max(mol.nAtoms, 1))
+   frames = np.empty((min(batch_size, len(rotations)), 3, mol.nAtoms))
+
+   mol_rot = mol.transformed(transform.transform())
+
+   with scan_file:
+      for start in range(0, len(rotations), batch_size):
+         batch = rotations[start:start + batch_size]
+         transform.apply_all(batch, mol.xyz, frames[:len(batch)])
+
+         for angle, xyz in zip(inp.angles[start:start + batch_size], frames):
+            mol_rot.xyz = xyz
+
+            # Save rotate geometry
+            if sense == '-': degree = abs(angle - 360)
+            if sense == '+': degree = angle
+
+            if (inp.rotate_scan):
+               output.write_geom_frame(scan_file, mol_rot, comment=f'angle = {degree} degree ; axis = {inp.dir_axis_input}')
+            else:
+               inp.file_geom_rotated = f"{general.geom_file_stem(inp.geom_file)}_{inp.dir_axis_input}_degree_{degree}"
+               output.print_geom(mol_rot, inp.file_geom_rotated)
 
       # Close and save logfile
       #output.logfile_close(out_log)
@@ -88,22 +131,67 @@ def rotate_1(inp):
 
    # Initialize molecules and read geometry
    mol = molecule.molecule()
-   mol_rot = molecule.molecule()
 
    mol.read_geom(inp.geom_file,inp.move_geom_to_000)
 
    # Adjust angles depending on direction
-   if inp.dir_axis_input[0] == '-': inp.angle = 360.0 - inp.angle
+   axis, sense = rotation_axis(inp)
+   if sense == '-': inp.angle = 360.0 - inp.angle
  
    # Rotate 
-   mol_rot = tools.rotate(mol,inp.angle,inp.dir_axis_input,mol_rot)
+   mol_rot = mol.transformed(transform.transform.rotation(inp.angle, axis))
 
    # Save rotate geometry
-   if inp.dir_axis_input[0] == '-': inp.file_geom_rotated = f"{inp.geom_file[:-4]}_{inp.dir_axis_input}_degree_{abs(inp.angle - 360)}"
-   if inp.dir_axis_input[0] == '+': inp.file_geom_rotated = f"{inp.geom_file[:-4]}_{inp.dir_axis_input}_degree_{inp.angle}" 
+   if sense == '-': inp.file_geom_rotated = f"{general.geom_file_stem(inp.geom_file)}_{inp.dir_axis_input}_degree_{abs(inp.angle - 360)}"
+   if sense == '+': inp.file_geom_rotated = f"{general.geom_file_stem(inp.geom_file)}_{inp.dir_axis_input}_degree_{inp.angle}" 
        
    output.print_geom(mol_rot, inp.file_geom_rotated)
 
    # Close and save logfile
    #output.logfile_close(out_log)
 # -------------------------------------------------------------------------------------
+def rotate_min_dist(inp):
+   """
+   Scans the minimum distance between two geometries over orientations of the second one.
+
+   Args:
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       None: Saves the minimum-distance table and prints its extremes.
+
+   Notes:
+       - `geom2` is rotated about its geometrical center by every point of the angle
+         grid (all input angles about each of `inp.scan_axes`), while `geom1` stays fixed.
+       - The spatial index of `geom1` is built once for the whole scan, and the
+         orientations are distributed over `inp.n_procs` processes.
+       - The table has one row per orientation: the angle about every axis and the
+         minimum distance.
+   """
+
+   # Check input, create results folder
+   inp.check_input_case()
+   general.create_results_geom()
+
+   # Initialize molecules and read geometries
+   mol_1 = molecule.molecule()
+   mol_2 = molecule.molecule()
+
+   mol_1.read_geom(inp.geom1_file,False)
+   mol_2.read_geom(inp.geom2_file,False)
+
+   # Orientation grid and minimum-distance landscape
+   grid, orientations = tools.orientation_grid(inp.angles, inp.scan_axes, mol_2.xyz_center)
+
+   distances = tools.calc_orientation_min_distances(mol_1, mol_2, orientations, inp.n_procs)
+
+   # Save table
+   table_file = f"{general.geom_file_stem(inp.geom1_file)}_{general.geom_file_stem(inp.geom2_file)}_rmin_{inp.scan_axes}"
+
+   with output.open_output(f'results_geom/{table_file}.dat') as out_f:
+      columns = [f'angle_{axis} (deg)' for axis in inp.scan_axes] + ['d_min (A)']
+      out_f.write('#' + ' '.join(f'{column:>16}' for column in columns) + '\n')
+      np.savetxt(out_f, np.column_stack((grid, distances)), fmt='%17.8f', delimiter='')
+
+   output.print_orientation_scan(inp, table_file, grid, distances)
+# -------------------------------------------------------------------------------------
@@ -1,13 +1,12 @@
 import numpy as np
-import math
-import copy
-import shutil
-import os
-import glob
-
-from geom.classes import molecule
-from geom.functions import translate, output
-from geom.functions import rotate as rotate_module
+import concurrent.futures
+
+from geom.classes import molecule, parameters, spatial_index, transform
+from geom.functions import output
+
+# Per-process state of orientation and placement scans (see `_run_scan`)
+_scan = {}
+
 # -------------------------------------------------------------------------------------
 def calc_min_distance(geom1,geom2):
    """
@@ -21,15 +20,272 @@ def calc_min_distance(geom1,geom2):
        float: The minimum distance between the two geometries.
 
    Notes:
-       - Uses NumPy broadcasting for efficient pairwise distance computation.
+       - Queries the spatial index of `geom1`, which is built once and cached on
+         the molecule, so repeated calls against a fixed geometry (controlled
+         translations, dimers, bowties) do not rebuild it.
+       - Runs in O(N log N) time with bounded memory instead of a dense
+         N2×N1 distance matrix; the result is bit-identical to the dense one.
+   """
+
+   distance, _, _ = geom1.get_spatial_index().min_distance(geom2.xyz)
+
+   return distance
+# -------------------------------------------------------------------------------------
+def orientation_grid(angles, axes, center=(0.0, 0.0, 0.0)):
    """
+   Builds the rotations of an orientation scan over one to three Cartesian axes.
+
+   Args:
+       angles (list[float]): Angles in degrees scanned about every axis.
+       axes (str): Rotation axes, applied in order (e.g. "z", "xy", "xyz").
+       center (array-like): Rotation center (e.g. the geometrical center of the rotated geometry).
+
+   Returns:
+       tuple:
+           - numpy.ndarray: Grid of angles with shape (len(angles)**len(axes), len(axes)),
+             the last axis varying fastest.
+           - list[transform]: Rotation of every grid point; the rotation about
+             `axes[0]` is applied first.
+   """
+
+   grid = np.array(np.meshgrid(*[angles] * len(axes), indexing='ij')).reshape(len(axes), -1).T
+
+   to_center   = transform.transform.translation(-np.asarray(center, dtype=float))
+   from_center = transform.transform.translation(np.asarray(center, dtype=float))
+
+   orientations = []
+   for point in grid:
+      rotation = to_center
+      for angle, axis in zip(point, axes):
+         rotation = rotation.then(transform.transform.rotation(angle, axis))
+      orientations.append(rotation.then(from_center))
+
+   return grid, orientations
+# -------------------------------------------------------------------------------------
+def calc_orientation_min_distances(geom1, geom2, orientations, n_procs=1):
+   """
+   Calculates the minimum distance between two geometries for many orientations of the second one.
+
+   Args:
+       geom1 (molecule): The fixed molecule object.
+       geom2 (molecule): The molecule object to be rotated.
+       orientations (list[transform]): Transforms applied to `geom2` (see `orientation_grid`).
+       n_procs (int): Number of worker processes.
+
+   Returns:
+       numpy.ndarray: Minimum distance for every orientation.
+
+   Notes:
+       - The spatial index of `geom1` is built once and shared with every worker, so
+         each orientation only costs the rotation of `geom2` and one index query.
+       - Orientations are rotated in batches (`transform.apply_all`) and split into
+         chunks over a process pool; with `n_procs = 1` everything runs in-process.
+       - Each distance equals `calc_min_distance` on `geom2` rotated by the same transform.
+   """
+
+   distances = _run_scan(_orientation_scan_chunk, geom1, geom2, orientations, n_procs)
+
+   return np.concatenate(distances)
+# -------------------------------------------------------------------------------------
+def calc_placement_map(geom1, geom2, displacements, cutoff, n_procs=1):
+   """
+   Calculates the minimum distance and the contacts of a probe geometry over a set of rigid displacements.
+
+   Args:
+       geom1 (molecule): The fixed molecule object.
+       geom2 (molecule): The probe molecule object, displaced rigidly.
+       displacements (numpy.ndarray): Displacement vectors (K, 3) in Angstroms.
+       cutoff (float): Contact cutoff in Angstroms.
+       n_procs (int): Number of worker processes.
+
+   Returns:
+       tuple:
+           - numpy.ndarray: Minimum distance for every displacement (K,).
+           - numpy.ndarray: Number of probe atoms closer than `cutoff` to `geom1` (K,).
+
+   Notes:
+       - The spatial index of `geom1` is built once and shared with every worker.
+       - Several displaced copies of the probe are stacked into a single nearest-atom
+         query (at most `parameters.transform_batch_size` atoms at once), which gives
+         both the minimum distance and the contact count of every displacement.
+   """
+
+   displacements = np.asarray(displacements, dtype=float).reshape(-1, 3)
 
-   # Compute pairwise distance matrix using broadcasting
-   diffs = geom2.xyz[:, :, np.newaxis] - geom1.xyz[:, np.newaxis, :]
-   dist_matrix = np.sqrt(np.sum(diffs**2, axis=0))
+   maps = _run_scan(_placement_scan_chunk, geom1, geom2, displacements, n_procs, cutoff=cutoff)
 
-   # Return the minimum distance
-   return np.min(dist_matrix)
+   return np.concatenate([m[0] for m in maps]), np.concatenate([m[1] for m in maps])
+# -------------------------------------------------------------------------------------
+def best_placements(distances, target, n_best=5):
+   """
+   Ranks the displacements of a placement map by how close their minimum distance is to a target gap.
+
+   Args:
+       distances (numpy.ndarray): Minimum distance of every displacement.
+       target (float): Target gap in Angstroms.
+       n_best (int): Number of displacements returned.
+
+   Returns:
+       numpy.ndarray: Indices of the best displacements, best first.
+   """
+
+   order = np.argsort(np.abs(distances - target), kind='stable')
+
+   return order[:n_best]
+# -------------------------------------------------------------------------------------
+def _run_scan(chunk_function, geom1, geom2, items, n_procs, **options):
+   """
+   Evaluates a scan over chunks of items, in-process or over a process pool.
+
+   Args:
+       chunk_function (callable): Worker function taking a list of items.
+       geom1 (molecule): The fixed molecule object; its spatial index is shared.
+       geom2 (molecule): The moving molecule object; its coordinates are shared.
+       items (list or numpy.ndarray): Scan points (transforms, displacements, ...).
+       n_procs (int): Number of worker processes.
+       **options: Scan settings shared with the workers (e.g. `cutoff`).
+
+   Returns:
+       list: Result of every chunk, in order.
+   """
+
+   index = geom1.get_spatial_index()
+   xyz = np.ascontiguousarray(geom2.xyz, dtype=float)
+
+   bounds = np.linspace(0, len(items), max(1, min(len(items), 4 * n_procs)) + 1).astype(int)
+   chunks = [items[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+   if (n_procs <= 1):
+      _init_scan(index, xyz, options)
+      return [chunk_function(chunk) for chunk in chunks]
+
+   with concurrent.futures.ProcessPoolExecutor(max_workers=n_procs, initializer=_init_scan, initargs=(index, xyz, options)) as pool:
+      return list(pool.map(chunk_function, chunks))
+# -------------------------------------------------------------------------------------
+def _init_scan(index, xyz, options):
+   """
+   Stores the spatial index of the fixed geometry, the moving coordinates and the scan settings in a worker.
+   """
+
+   _scan.clear()
+   _scan.update(options, index=index, xyz=xyz)
+# -------------------------------------------------------------------------------------
+def _orientation_scan_chunk(orientations):
+   """
+   Minimum distances of a chunk of orientations, computed in a worker.
+   """
+
+   index, xyz = _scan['index'], _scan['xyz']
+
+   batch_size = max(1, parameters.parameters().transform_batch_size // max(xyz.shape[1], 1))
+   frames = np.empty((min(batch_size, len(orientations)), 3, xyz.shape[1]))
+
+   distances = np.empty(len(orientations))
+   for start in range(0, len(orientations), batch_size):
+      batch = orientations[start:start + batch_size]
+      transform.apply_all(batch, xyz, frames[:len(batch)])
+
+      for k in range(len(batch)):
+         distances[start + k] = index.min_distance(frames[k])[0]
+
+   return distances
+# -------------------------------------------------------------------------------------
+def _placement_scan_chunk(displacements):
+   """
+   Minimum distances and contact counts of a chunk of displacements, computed in a worker.
+   """
+
+   index, xyz, cutoff = _scan['index'], _scan['xyz'], _scan['cutoff']
+   nAtoms = xyz.shape[1]
+
+   batch_size = max(1, parameters.parameters().transform_batch_size // max(nAtoms, 1))
+
+   distances = np.empty(len(displacements))
+   contacts = np.empty(len(displacements), dtype=np.int64)
+   for start in range(0, len(displacements), batch_size):
+      batch = displacements[start:start + batch_size]
+
+      # Displaced copies of the probe, queried at once
+      queries = xyz[:, np.newaxis, :] + batch.T[:, :, np.newaxis]
+      nearest, _ = index.nearest(queries.reshape(3, -1))
+      nearest = nearest.reshape(len(batch), nAtoms)
+
+      distances[start:start + len(batch)] = nearest.min(axis=1)
+      contacts[start:start + len(batch)] = np.count_nonzero(nearest < cutoff, axis=1)
+
+   return distances, contacts
+# -------------------------------------------------------------------------------------
+def calc_contact_shifts(geom1,geom2,direction,distances):
+   """
+   Calculates the translations of `geom2` along a direction that set exact minimum distances to `geom1`.
+
+   Args:
+       geom1 (molecule): The fixed molecule object.
+       geom2 (molecule): The molecule object to be translated.
+       direction (numpy.ndarray): Translation direction (3,), any non-zero vector.
+       distances (list[float]): Target minimum distances in Angstroms.
+
+   Returns:
+       numpy.ndarray: Shift t for every distance, such that `geom2` translated by
+       t·direction/|direction| lies at exactly that minimum distance from `geom1`.
+
+   Notes:
+       - For an atom pair with separation w = b - a, the distance along the
+         translation is |w + t·u|, which equals d at the largest root
+         t = -(w·u) + sqrt(d² - |w⊥|²) if the pair's perpendicular offset |w⊥| <= d.
+         The requested shift is the largest root over all pairs, i.e. the first
+         contact as `geom2` approaches from far away along +u.
+       - Candidate pairs (|w⊥| <= max(distances)) come from a cutoff query on the
+         coordinates projected onto the plane perpendicular to u. Only the facing
+         slabs of both geometries are searched; the slabs are deepened until no
+         pair outside them can exceed the shift found.
+       - The final minimum distances match the targets to machine precision.
+   """
+
+   param = parameters.parameters()
+
+   u = np.asarray(direction, dtype=float)
+   u = u / np.linalg.norm(u)
+   distances = np.asarray(distances, dtype=float)
+   d_max = np.max(distances)
+
+   # Heights along u and projections onto the perpendicular plane
+   h1 = u @ geom1.xyz
+   h2 = u @ geom2.xyz
+   perp1 = geom1.xyz - np.outer(u, h1)
+   perp2 = geom2.xyz - np.outer(u, h2)
+
+   top1, bottom2 = np.max(h1), np.min(h2)
+   depth = 2.0 * d_max + 2.0 * param.spatial_index_cell_size
+
+   while True:
+      slab1 = np.flatnonzero(h1 >= top1 - depth)
+      slab2 = np.flatnonzero(h2 <= bottom2 + depth)
+
+      index = spatial_index.spatial_index(perp1[:, slab1])
+      shifts = np.full(len(distances), -np.inf)
+
+      for first in range(0, len(slab2), index.chunk):
+         block = slab2[first:first + index.chunk]
+         j, i, r = index.pairs_within(perp2[:, block], d_max)
+         if len(j) == 0: continue
+
+         s = h1[slab1[i]] - h2[block[j]]
+         for k, distance in enumerate(distances):
+            contact = r <= distance
+            if np.any(contact):
+               shifts[k] = max(shifts[k], np.max(s[contact] + np.sqrt(distance**2 - r[contact]**2)))
+
+      # Pairs outside the slabs give shifts below top1 - bottom2 + d - depth
+      whole = len(slab1) == geom1.nAtoms and len(slab2) == geom2.nAtoms
+      if whole or np.all(shifts >= top1 - bottom2 + distances - depth): break
+
+      depth = 2.0 * depth
+
+   if np.any(np.isinf(shifts)):
+      output.error('the geometries never come within the requested distance along the translation direction.')
+
+   return shifts
 # -------------------------------------------------------------------------------------
 def rotate(mol,angle,dir_axis_input,mol_rot):
    """
@@ -45,30 +301,40 @@ def rotate(mol,angle,dir_axis_input,mol_rot):
        molecule: The rotated molecule object.
 
    Notes:
-       - Rotation is performed using standard rotation matrices.
+       - Rotation is performed using standard rotation matrices (`transform.rotation`).
        - Supports rotation around x, y, and z axes.
+       - The coordinate buffer of `mol_rot` is reused when it matches, and `mol_rot`
+         may be `mol` itself for an in-place rotation.
    """
 
-   mol_rot = copy.deepcopy(mol)
+   rotation = transform.transform.rotation(angle, dir_axis_input[1])
 
-   theta = math.radians(angle)
+   return(mol.transformed(rotation, mol_rot))
+# -------------------------------------------------------------------------------------
+def find_overlapping_atoms(inp, geom1, geom2):
+   """
+   Finds the atoms of one geometry that overlap with another within a cutoff distance.
 
-   cos_theta = math.cos(theta)
-   sin_theta = math.sin(theta)
+   Args:
+       inp (input_class): Input object containing cutoff distance (`merge_cutoff`).
+       geom1 (molecule): The reference molecule object.
+       geom2 (molecule): The molecule object whose atoms are checked.
 
-   if (dir_axis_input[1]=='x'):
-      mol_rot.xyz[1, :] =  mol.xyz[1, :] * cos_theta - mol.xyz[2, :] * sin_theta
-      mol_rot.xyz[2, :] =  mol.xyz[1, :] * sin_theta + mol.xyz[2, :] * cos_theta
+   Returns:
+       tuple:
+           - numpy.ndarray: Boolean keep mask (N2,), True for atoms of `geom2`
+             whose distance to every atom of `geom1` is >= `inp.merge_cutoff`.
+           - int: Number of atoms of `geom2` that overlap (dropped).
 
-   elif (dir_axis_input[1]=='y'): 
-      mol_rot.xyz[0, :] =  mol.xyz[0, :] * cos_theta + mol.xyz[2, :] * sin_theta
-      mol_rot.xyz[2, :] = -mol.xyz[0, :] * sin_theta + mol.xyz[2, :] * cos_theta
+   Notes:
+       - Uses the cached spatial index of `geom1`, so only cells within the cutoff
+         are visited and memory stays bounded, instead of an (N2, N1) distance matrix.
+       - The mask is identical to `np.all(dist_matrix >= inp.merge_cutoff, axis=1)`.
+   """
 
-   elif (dir_axis_input[1]=='z'):
-      mol_rot.xyz[0, :] =  mol.xyz[0, :] * cos_theta - mol.xyz[1, :] * sin_theta
-      mol_rot.xyz[1, :] =  mol.xyz[0, :] * sin_theta + mol.xyz[1, :] * cos_theta
+   overlap = geom1.get_spatial_index().any_within(geom2.xyz, inp.merge_cutoff)
 
-   return(mol_rot)
+   return ~overlap, int(np.count_nonzero(overlap))
 # -------------------------------------------------------------------------------------
 def merge_geoms(inp, geom1, geom2):
     """
@@ -83,8 +349,7 @@ def merge_geoms(inp, geom1, geom2):
         molecule: The merged molecular geometry.
 
     Notes:
-        - Uses pairwise distance calculations to avoid overlapping atoms.
-        - Atoms from `geom2` that are too close to `geom1` are removed.
+        - Atoms from `geom2` that are too close to `geom1` are removed (see `find_overlapping_atoms`).
         - The merged geometry retains properties such as center and bounding box.
     """
 
@@ -92,15 +357,12 @@ def merge_geoms(inp, geom1, geom2):
     geom1_xyz = np.array(geom1.xyz)  # (3, N1)
     geom2_xyz = np.array(geom2.xyz)  # (3, N2)
 
-    # Compute pairwise distances efficiently using broadcasting
-    diff = geom2_xyz[:, :, None] - geom1_xyz[:, None, :]
-    dist_matrix = np.linalg.norm(diff, axis=0)  # Shape: (N2, N1)
-
     # Find atoms in geom2 that are farther than the cutoff from all atoms in geom1
-    keep_atoms = np.all(dist_matrix >= inp.merge_cutoff, axis=1)
+    keep_atoms, n_dropped = find_overlapping_atoms(inp, geom1, geom2)
+    if (inp.verbose): output.print_dropped_atoms(n_dropped, geom2.nAtoms)
 
     # Merge atoms that are not overlapping
-    merged_atoms = geom1.atoms + [geom2.atoms[i] for i in range(geom2.nAtoms) if keep_atoms[i]]
+    merged_codes = np.concatenate((geom1.codes, geom2.codes[keep_atoms]))
 
     # Merge XYZ coordinates
     merged_xyz = np.concatenate((geom1_xyz, geom2_xyz[:, keep_atoms]), axis=1)
@@ -108,13 +370,8 @@ def merge_geoms(inp, geom1, geom2):
     # Create new molecule
     geom3 = molecule.molecule()
     geom3.nAtoms = merged_xyz.shape[1]
-    geom3.atoms = copy.deepcopy(merged_atoms)
+    geom3.codes = merged_codes
     geom3.xyz = merged_xyz
-
-    # Calculate geometrical properties
-    geom3.xyz_center = np.mean(geom3.xyz, axis=1)
-    geom3.xyz_max = np.max(geom3.xyz, axis=1)
-    geom3.xyz_min = np.min(geom3.xyz, axis=1)
     geom3.remove_duplicate_xyz()
 
     return geom3
@@ -132,23 +389,19 @@ def subtract_geoms(inp, geom1, geom2):
         molecule: A new molecule object representing `geom2 - geom1`.
 
     Notes:
-        - Atoms from `geom2` that are within the cutoff distance of `geom1` are removed.
+        - Atoms from `geom2` that are within the cutoff distance of `geom1` are removed (see `find_overlapping_atoms`).
         - The resulting geometry retains calculated properties such as center and bounding box.
     """
 
     # Convert lists to NumPy arrays for efficiency
-    geom1_xyz = np.array(geom1.xyz)  # (3, N1)
     geom2_xyz = np.array(geom2.xyz)  # (3, N2)
 
-    # Compute pairwise distances efficiently using broadcasting
-    diff = geom2_xyz[:, :, None] - geom1_xyz[:, None, :]
-    dist_matrix = np.linalg.norm(diff, axis=0)  # Shape: (N2, N1)
-
     # Find atoms in geom2 that are farther than the cutoff from all atoms in geom1
-    keep_atoms = np.all(dist_matrix >= inp.merge_cutoff, axis=1)
+    keep_atoms, n_dropped = find_overlapping_atoms(inp, geom1, geom2)
+    if (inp.verbose): output.print_dropped_atoms(n_dropped, geom2.nAtoms)
 
     # Merge atoms that are not overlapping
-    merged_atoms = [geom2.atoms[i] for i in range(geom2.nAtoms) if keep_atoms[i]]
+    merged_codes = geom2.codes[keep_atoms]
 
     # Merge XYZ coordinates
     merged_xyz = geom2_xyz[:, keep_atoms]
@@ -156,14 +409,9 @@ def subtract_geoms(inp, geom1, geom2):
     # Create new molecule
     geom3 = molecule.molecule()
     geom3.nAtoms = merged_xyz.shape[1]
-    geom3.atoms = copy.deepcopy(merged_atoms)
+    geom3.codes = merged_codes
     geom3.xyz = merged_xyz
 
-    # Calculate geometrical properties
-    geom3.xyz_center = np.mean(merged_xyz, axis=1)
-    geom3.xyz_max = np.max(merged_xyz, axis=1)
-    geom3.xyz_min = np.min(merged_xyz, axis=1)
-
     return geom3
 # -------------------------------------------------------------------------------------
 def determine_sphere_center(inp,sense):
@@ -193,175 +441,108 @@ def determine_sphere_center(inp,sense):
    elif sense == '-':
        inp.sphere_center[index] = -((inp.rod_length - inp.rod_width)/2.0)
 # -------------------------------------------------------------------------------------
-def copy_geometry_file(source_file, destination_file):
+def place_at_distance(inp, geom1, geom2):
     """
-    Copies the geometry file from 'results_geom/' to the current working directory.
+    Translates a geometry to a controlled minimum distance from a fixed one.
 
     Args:
-        source_file (str): Path to the source geometry file.
-        destination_file (str): Path where the file should be copied.
-        output (module): The output module for error handling.
+        inp (input_class): Input object containing:
+            - `dir_factor` (list[float]): Translation direction.
+            - `distances` (list[float]): List whose first entry is the target distance.
+            - `verbose` (bool): Print the optimization progress.
+        geom1 (molecule): The fixed molecule object.
+        geom2 (molecule): The molecule object to translate (modified in place).
 
     Returns:
-        None
-    """
-    try:
-        shutil.copy(source_file, destination_file)
-    except FileNotFoundError:
-        output.error(f"File '{source_file}' not found. Ensure the geometry file exists in 'results_geom/'.")
-# -------------------------------------------------------------------------------------
-def delete_geometry_file(file_path):
+        float: The minimum distance reached between `geom1` and `geom2`.
+
+    Notes:
+        - Same shift as `translate.translate_controlled_distance` (see `calc_contact_shifts`),
+          applied in memory: nothing is read from or written to disk.
     """
-    Deletes the temporary geometry file from the execution directory.
 
-    Args:
-        file_path (str): Path to the temporary geometry file to be deleted.
-        output (module): The output module for error handling.
+    direction = np.array(inp.dir_factor, dtype=float)
+    direction = direction / np.linalg.norm(direction)
 
-    Returns:
-        None
-    """
-    try:
-        os.remove(file_path)
-    except OSError:
-        output.error(f"Failed to delete temporary file '{file_path}'.")
-# -------------------------------------------------------------------------------------
-def delete_all_files(pattern):
-    """
-    Deletes all files matching a given pattern in the execution directory.
+    distance = inp.distances[0]
+    shift = calc_contact_shifts(geom1, geom2, direction, [distance])[0]
 
-    Args:
-        pattern (str): File path pattern to match (e.g., "results_geom/*.xyz").
+    if (inp.verbose): output.print_optimizing_distance(distance)
 
-    Returns:
-        None
-    """
-    files_to_remove = glob.glob(pattern) 
-    
-    for file_path in files_to_remove:
-        try:
-            os.remove(file_path)  # Remove file
-        except Exception as e:
-            output.error(f"Failed deleting {file_path}: {e}")
+    geom2.translate_geom(shift, direction)
+    dist_new = calc_min_distance(geom1, geom2)
+
+    if (abs(dist_new - distance) > parameters.parameters().convergence): output.error(f'optimization error. Distance could not be optimized: dist_new = {dist_new} ; min_dist = {distance}')
+    if (inp.verbose): output.print_convergence_achieved(dist_new)
+
+    return dist_new
 # -------------------------------------------------------------------------------------
-def create_dimer(inp):
+def create_dimer(inp, mol):
     """
     Creates a molecular dimer by translating a geometry to a controlled distance.
 
     Args:
         inp (input_class): Input object containing:
-            - `xyz_output` (str): Name of the geometry file.
-            - `geom1_file`, `geom2_file` (str): Paths to the geometry files.
-            - `move_geom_1_to_000`, `move_geom_2_to_000` (bool): Flags to center geometries at the origin.
+            - `xyz_output` (str): Name of the geometry.
             - `dir_axis_input` (str): Translation direction (`+x`, `-y`, etc.).
+            - `dir_factor` (list[float]): Translation direction vector.
             - `distances` (list[float]): List containing the interatomic distance for the dimer.
-            - `file_geom2_translated` (str): Name of the translated geometry file.
+        mol (molecule): The generated geometry (unit of the dimer).
 
     Returns:
-        None: The function updates input parameters and generates output files.
+        None: Saves the dimer structure.
 
     Notes:
-        - Copies the initial geometry file from `results_geom/` to the execution directory.
-        - Prepares input parameters for translation.
-        - Translates the second molecule to maintain the specified interatomic distance.
-        - Reads and merges the initial and translated geometries.
-        - Saves the final dimer structure as an output file.
-        - Deletes temporary geometry files after processing.
+        - Both units are centered at the origin and the second one is translated to
+          the requested distance (see `place_at_distance`).
+        - The units are merged (see `merge_geoms`) and only the final dimer is written,
+          so several assemblies may run concurrently in the same directory.
     """
 
-    # Define file paths for the geometry
-    source_file = f'results_geom/{inp.xyz_output}.xyz'
-    destination_file = f'{inp.xyz_output}.xyz'  # Save in the current working directory
-
-    # Copy the structure from the results directory to the execution directory
-    copy_geometry_file(source_file, destination_file)
-
-    # Populate input class attributes for compatibility with translate function
-    inp.geom1_file, inp.geom2_file = destination_file, destination_file
-    inp.move_geom_1_to_000, inp.move_geom_2_to_000 = True, True
+    # Center the first unit at the origin and copy it as the second unit
+    mol_init_000 = mol.transformed(transform.transform())
+    mol_init_000.trans_geom_center_to_000()
 
-    # Create dimer by translating the geometry to a controlled distance
-    translate.translate_controlled_distance(inp)
+    mol_translated = mol_init_000.transformed(transform.transform())
 
-    # Remove the temporary file from the execution directory
-    delete_geometry_file(destination_file)
-
-    # Read the initial and translated geometries from the results directory
-    mol_init_000 = molecule.molecule()
-    mol_translated = molecule.molecule()
-
-    file_mol_init_000 = f'results_geom/{inp.xyz_output}_000.xyz'
-    file_mol_translated = f'results_geom/{inp.file_geom2_translated}.xyz'
-
-    mol_init_000.read_geom(file_mol_init_000, False)
-    mol_translated.read_geom(file_mol_translated, False)
+    # Translate the second unit to the controlled distance
+    place_at_distance(inp, mol_init_000, mol_translated)
 
     # Merge the two geometries to form the dimer and print the result
     dimer = merge_geoms(inp, mol_init_000, mol_translated)
     dimer_file = f'dimer_{inp.xyz_output}_{inp.dir_axis_input}_d_{inp.distances[0]}'
     output.print_geom(dimer, dimer_file)
-
-    # Eliminate temporary XYZ files created during the process
-    delete_geometry_file(f'results_geom/{inp.xyz_output}.xyz')
-    delete_geometry_file(f'results_geom/{inp.xyz_output}_000.xyz')
-    delete_geometry_file(f'results_geom/{inp.file_geom2_translated}.xyz')
 # -------------------------------------------------------------------------------------
-def create_bowtie(inp):
+def create_bowtie(inp, mol):
     """
     Generates a molecular bowtie structure by rotating and translating a geometry.
 
     Args:
         inp (input_class): Input object containing:
-            - `xyz_output` (str): Name of the geometry file.
-            - `geom1_file`, `geom2_file` (str): Paths to the geometry files.
-            - `move_geom_1_to_000`, `move_geom_2_to_000` (bool): Flags to center geometries at the origin.
-            - `dir_axis_input` (str): Translation direction (`+x`, `-y`, etc.).
+            - `xyz_output` (str): Name of the geometry.
             - `distances` (list[float]): List containing the interatomic distance for the bowtie.
-            - `file_geom2_translated` (str): Name of the translated geometry file.
-            - `angle` (float): Rotation angle in degrees.
+            - `gen_pyramid` (bool): Whether the unit is a pyramid (translated along `+z`).
+        mol (molecule): The generated geometry (unit of the bowtie).
 
     Returns:
-        None: The function updates input parameters and generates output files.
+        None: The function updates `inp.dir_axis_input` and `inp.dir_factor` and saves
+        the bowtie structure.
 
     Notes:
-        - Copies the initial geometry file from `results_geom/` to the execution directory.
-        - Rotates the geometry by 180 degrees around the `+x` axis.
-        - Copies the rotated geometries for translation.
-        - Translates one geometry along the `+z` or `-z` axis depending on the structure type.
-        - Merges the rotated and translated geometries into a final bowtie structure.
-        - Saves the final structure and deletes temporary files.
+        - Both units are centered at the origin, and the second one is rotated by
+          180 degrees around the `+x` axis.
+        - The rotated unit is translated along the `+z` or `-z` axis depending on the
+          structure type (see `place_at_distance`).
+        - The units are merged (see `merge_geoms`) and only the final bowtie is written.
     """
 
-    # Define file paths for the geometry to rotate
-    initial_name = f'results_geom/{inp.xyz_output}'
-    source_file_rot = f'results_geom/{inp.xyz_output}.xyz'
-    destination_file_rot = f'{inp.xyz_output}.xyz'  # Save in the current working directory
-
-    # Copy the structure from the results directory to the execution directory
-    copy_geometry_file(source_file_rot, destination_file_rot)
-
-    # Rotate molecule as required for bowtie creation
-    inp.move_geom_to_000 = True
-    inp.dir_axis_input   = '+x'
-    inp.angle            = 180.0
-    inp.geom_file        = destination_file_rot
-
-    rotate_module.rotate_1(inp)
-
-    # Define file paths for the geometry to translate
-    source_file_trans_1 = f'results_geom/{inp.xyz_output}_000.xyz'
-    destination_file_trans_1 = f'{inp.xyz_output}_000.xyz'
+    # Center the first unit at the origin and rotate a copy as the second unit
+    mol_init_000 = mol.transformed(transform.transform())
+    mol_init_000.trans_geom_center_to_000()
 
-    source_file_trans_2 = f'results_geom/{inp.xyz_output}_+x_degree_180.0.xyz'
-    destination_file_trans_2 = f'{inp.xyz_output}_+x_degree_180.0.xyz'
-
-    # Copy the structure from the results directory to the execution directory
-    copy_geometry_file(source_file_trans_1, destination_file_trans_1)
-    copy_geometry_file(source_file_trans_2, destination_file_trans_2)
-
-    # Populate input class attributes for compatibility with translate function
-    inp.geom1_file, inp.geom2_file = destination_file_trans_1, destination_file_trans_2
-    inp.move_geom_1_to_000, inp.move_geom_2_to_000 = True, True
+    mol_translated = mol_init_000.transformed(transform.transform.rotation(180.0, 'x'))
+    mol_translated.xyz = np.round(mol_translated.xyz, 8)  # drop the sin(180) noise below the XYZ precision
+    mol_translated.trans_geom_center_to_000()
 
     if inp.gen_pyramid:
        inp.dir_axis_input = '+z'
@@ -371,34 +552,13 @@ def create_bowtie(inp):
        inp.dir_axis_input = '-z'
        inp.dir_factor = [0.0,0.0,-1.0]
 
-    # Create dimer by translating the geometry to a controlled distance
-    translate.translate_controlled_distance(inp)
-
-    # Remove the temporary file from the execution directory
-    delete_geometry_file(destination_file_trans_1)
-    delete_geometry_file(destination_file_trans_2)
-    delete_geometry_file(destination_file_rot)
-
-    # Read the initial and translated geometries from the results directory
-    mol_init_000 = molecule.molecule()
-    mol_translated = molecule.molecule()
-
-    file_mol_init_000 = f'results_geom/{inp.xyz_output}_000.xyz'
-    file_mol_translated = f'results_geom/{inp.file_geom2_translated}.xyz'
+    # Translate the rotated unit to the controlled distance
+    place_at_distance(inp, mol_init_000, mol_translated)
 
-    mol_init_000.read_geom(file_mol_init_000, False)
-    mol_translated.read_geom(file_mol_translated, False)
-
-    # Merge the two geometries to form the dimer and print the result
+    # Merge the two geometries to form the bowtie and print the result
     dimer = merge_geoms(inp, mol_init_000, mol_translated)
     dimer_file = f'bowtie_{inp.xyz_output}_{inp.dir_axis_input}_d_{inp.distances[0]}'
     output.print_geom(dimer, dimer_file)
-
-    # Eliminate temporary XYZ files created during the process
-    delete_geometry_file(file_mol_init_000)
-    delete_geometry_file(file_mol_translated)
-
-    delete_all_files(f'{initial_name}*xyz')
 # -------------------------------------------------------------------------------------
 def calculate_normal_and_rhs(center_a, center_b, apex):
     """
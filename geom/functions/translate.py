@@ -1,4 +1,7 @@
 import math
+import time
+import contextlib
+import numpy as np
 
 from geom.classes import molecule, parameters
 from geom.functions import general, tools, output
@@ -20,6 +23,7 @@ def select_case(inp):
    if (inp.translate_controlled_distance): translate_controlled_distance(inp)
    if (inp.translate_1):                   translate_1(inp)
    if (inp.translate_center):              translate_center(inp)
+   if (inp.translate_place):               translate_place(inp)
 # -------------------------------------------------------------------------------------
 def translate_controlled_distance(inp):
    """ 
@@ -36,10 +40,13 @@ def translate_controlled_distance(inp):
 
    Notes:
        - Reads the molecular geometries from input files.
-       - Performs an initial shift to move `geom2` far from `geom1`.
-       - Adjusts the translation direction based on calculated minimum distance.
-       - Iteratively optimizes the distance between `geom1` and `geom2`.
-       - Saves the final translated geometry for each desired distance.
+       - Solves the exact shift along `inp.dir_factor` for every desired distance
+         at once (see `tools.calc_contact_shifts`), as the first contact of `geom2`
+         approaching `geom1` from far away along the direction.
+       - The direction may be any vector, not only ±x/y/z.
+       - Saves the final translated geometry for each desired distance, or, in
+         scan mode (`inp.translate_scan`), streams every distance as a frame of a
+         single multi-frame XYZ file and reports the time spent per frame.
        - If optimization fails, raises an error.
    """
 
@@ -55,123 +62,57 @@ def translate_controlled_distance(inp):
    mol_1.read_geom(inp.geom1_file,inp.move_geom_1_to_000)
    mol_2.read_geom(inp.geom2_file,inp.move_geom_2_to_000)
    
-   # =============================================================
-   # STEP 1: Perform an initial shift to move geom2 below min_dist
-   # =============================================================
-   
-   # 1.1 Move geom to a big distance
-   mol_2.translate_geom(99999999.9,inp.dir_factor)
-
-   # 1.2 Check if dist_opt < min_dist to evaluate dir_axis sense (-->  or <--)
-   dist_ini = tools.calc_min_distance(mol_1,mol_2)
-   
-   shift = dist_ini - param.min_dist_translate + 0.1
-   mol_2.translate_geom(shift, inp.dir_factor)
-
-   dist_opt = tools.calc_min_distance(mol_1,mol_2)
-
-   # -- If not, perform the same shift changing dir_axis sense
-   if (dist_opt > dist_ini):
-
-      # Modify translation sense
-      inp.change_trans_sense()
-
-      shift = dist_opt - param.min_dist_translate + 0.5
-      mol_2.translate_geom(shift, inp.dir_factor)
-
-      # Calculate new distance
-      dist_opt_2 = tools.calc_min_distance(mol_1,mol_2)
-
-      if(dist_opt_2 > dist_opt): output.error('something wrong happened. Please, check the geometries and try again.')
-   
-      dist_opt = dist_opt_2
-   
-   # 1.3 Now that we are below min_dist, change translation sense.
-   inp.change_trans_sense()
-
-   # Save the final minimum distance
-   dist_pre = dist_opt
-
+   # Translation direction (unit vector, any orientation)
+   direction = np.array(inp.dir_factor, dtype=float)
+   direction = direction / np.linalg.norm(direction)
 
-   # ===========================================
-   # STEP 2: Optimize geom2 to minimum distances
-   # ===========================================
+   # Exact shifts along the direction for every requested distance, from a single profile
+   start = time.perf_counter()
+   shifts = tools.calc_contact_shifts(mol_1, mol_2, direction, inp.distances)
+   shift_time = time.perf_counter() - start
 
    if (inp.verbose): output.print_optimization_starts()
 
-   for distance in inp.distances:
-      
-      if (inp.verbose): output.print_optimizing_distance(distance)
-
-      # Calculate difference between previous distance and desired one
-      shift = distance - dist_pre
-       
-      # Initial shift
-      mol_2.translate_geom(shift - 0.1, inp.dir_factor) # -0.1 as small shift to ensure translation sense
-
-      # Calculate distance
-      dist_new = tools.calc_min_distance(mol_1,mol_2) 
-
-      if (dist_new > distance):
-   
-         mol_2.translate_geom(shift - 0.5, inp.dir_factor) # Another shift with less tolerance to avoid problems
-
-         # Calculate distance
-         dist_new = tools.calc_min_distance(mol_1,mol_2)
-
-         if (dist_new > distance):
+   # Scan mode: one open file for all frames, discarded if the scan fails
+   scan_file = contextlib.nullcontext()
+   if (inp.translate_scan):
+      inp.file_geom2_translated = f"{general.geom_file_stem(inp.geom2_file)}_{inp.dir_axis_input}_scan"
+      scan_file = output.open_geom_trajectory(inp.file_geom2_translated)
+      scan_distances, frame_times = [], []
 
-            mol_2.translate_geom(shift - 0.5, inp.dir_factor) # Try again #1
+   xyz_ini = mol_2.xyz.copy()
 
-            # Calculate distance
-            dist_new = tools.calc_min_distance(mol_1,mol_2)
-
-            if (dist_new > distance):
+   with scan_file:
+      for distance, shift in zip(inp.distances, shifts):
+      
+         if (inp.verbose): output.print_optimizing_distance(distance)
 
-               mol_2.translate_geom(shift - 0.5, inp.dir_factor) # Try again #2
+         start = time.perf_counter()
 
-               # Calculate distance
-               dist_new = tools.calc_min_distance(mol_1,mol_2)
+         # Translate from the initial position, so that no rounding accumulates
+         mol_2.xyz = xyz_ini.copy()
+         mol_2.translate_geom(shift, direction)
 
-               if (dist_new > distance): output.error(f'optimization error 1. Distance could not be optimized: dist_new = {dist_new} ; min_dist = {distance}')
-   
-      # Move slowly towards desired distance
-      diff_dist = abs(dist_new - distance)
-   
-      # If after first translation we are quite far from the desire distance
-      # apply a new shift to be closer   
-      if (diff_dist > param.convergence and diff_dist > 0.02):
-         mol_2.translate_geom(diff_dist - param.convergence, inp.dir_factor)   
-
-         # Calculate distance
-         dist_new = tools.calc_min_distance(mol_1,mol_2)
-        
-         if (dist_new > distance): output.error('optimization error 2')
-   
+         dist_new = tools.calc_min_distance(mol_1, mol_2)
 
-      while (diff_dist > param.convergence):
-         mol_2.translate_geom(param.convergence_step, inp.dir_factor)
+         if (abs(dist_new - distance) > param.convergence): output.error(f'optimization error. Distance could not be optimized: dist_new = {dist_new} ; min_dist = {distance}')
+         if (inp.verbose): output.print_convergence_achieved(dist_new)
 
-         # Recalculate minimum distance and check difference with desired distance
-         dist_new  = tools.calc_min_distance(mol_1,mol_2)
+         #output.save_distance_opt(out_log,distance,dist_new,inp.dir_axis_input) # Save to logfile
 
-         diff_dist = abs(dist_new - distance)
+         # Save distance-optimized geometry
+         if (inp.translate_scan):
+            output.write_geom_frame(scan_file, mol_2, comment=f'd = {dist_new:.8f} A ; shift = {shift:.8f} A ; axis = {inp.dir_axis_input}')
 
-         if (inp.verbose): output.print_computed_distance(dist_new)
-         if (dist_new > distance): output.error('reduce convergence criteria for distance optimization')
-      
-         if(diff_dist < param.convergence): 
-            if (inp.verbose): output.print_convergence_achieved(dist_new)
-
-            #output.save_distance_opt(out_log,distance,dist_new,inp.dir_axis_input) # Save to logfile
-   
-            # Save distance-optimized geometry
-            dist_new_rounded = math.ceil(dist_new * 100) / 100
-            inp.file_geom2_translated = f"{inp.geom2_file[:-4]}_{inp.dir_axis_input}_d_{dist_new_rounded:.2f}"
+            scan_distances.append(dist_new)
+            frame_times.append(time.perf_counter() - start)
+         else:
+            inp.file_geom2_translated = f"{general.geom_file_stem(inp.geom2_file)}_{inp.dir_axis_input}_d_{dist_new:.2f}"
             
             output.print_geom(mol_2, inp.file_geom2_translated)
 
-      dist_pre = dist_new
+   if (inp.translate_scan):
+      output.print_scan_timing(inp.file_geom2_translated, scan_distances, shift_time, frame_times)
    
    # Close and save logfile
    #output.logfile_close(out_log)
@@ -206,7 +147,7 @@ def translate_1(inp):
 
    # Save shifted geometry
    shift_rounded = math.ceil(inp.shift_t1 * 100) / 100
-   file_geom_translated = f"{inp.geom_file[:-4]}_{inp.dir_axis_input}_d_{shift_rounded:.2f}"
+   file_geom_translated = f"{general.geom_file_stem(inp.geom_file)}_{inp.dir_axis_input}_d_{shift_rounded:.2f}"
 
    output.print_geom(mol, file_geom_translated)
 
@@ -241,3 +182,56 @@ def translate_center(inp):
    # Close and save logfile
    #output.logfile_close(out_log)
 # -------------------------------------------------------------------------------------
+def translate_place(inp):
+   """ 
+   Searches the placement of a probe molecule over a 3D grid of rigid displacements.
+
+   Args:
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       None: Saves the distance/collision map and the best-placed probe geometry.
+
+   Notes:
+       - `geom1` stays fixed; `geom2` is displaced by every vector of the grid
+         `inp.place_grid` (min, max, n per axis) from its current position.
+       - For every displacement the map holds the minimum distance and the number of
+         probe atoms closer than `inp.place_cutoff` (collisions), computed from one
+         spatial index of `geom1` over `inp.n_procs` processes.
+       - The probe is saved at the displacement whose minimum distance is closest to
+         the target gap `inp.place_target`.
+   """
+
+   # Check input, create results folder
+   inp.check_input_case()
+   general.create_results_geom()
+
+   # Initialize molecules and read geometries
+   mol_1 = molecule.molecule()
+   mol_2 = molecule.molecule()
+
+   mol_1.read_geom(inp.geom1_file,False)
+   mol_2.read_geom(inp.geom2_file,False)
+
+   # Displacement grid (z varying fastest)
+   axes = [np.linspace(lo, hi, n) for lo, hi, n in inp.place_grid]
+   displacements = np.array(np.meshgrid(*axes, indexing='ij')).reshape(3, -1).T
+
+   # Distance/collision map and best placements
+   distances, contacts = tools.calc_placement_map(mol_1, mol_2, displacements, inp.place_cutoff, inp.n_procs)
+   best = tools.best_placements(distances, inp.place_target)
+
+   # Save map
+   map_file = f"{general.geom_file_stem(inp.geom1_file)}_{general.geom_file_stem(inp.geom2_file)}_place"
+
+   with output.open_output(f'results_geom/{map_file}.dat') as out_f:
+      out_f.write(f'#{"dx (A)":>16} {"dy (A)":>16} {"dz (A)":>16} {"d_min (A)":>16} {"contacts":>10}\n')
+      for shift, distance, n_contacts in zip(displacements, distances, contacts):
+         out_f.write(f'{shift[0]:17.8f}{shift[1]:17.8f}{shift[2]:17.8f}{distance:17.8f}{n_contacts:11d}\n')
+
+   # Save best-placed probe
+   mol_2.translate_geom(1.0, displacements[best[0]])
+   output.print_geom(mol_2, f"{general.geom_file_stem(inp.geom2_file)}_place_d_{distances[best[0]]:.2f}")
+
+   output.print_placement(inp, map_file, displacements[best], distances[best], contacts[best])
+# -------------------------------------------------------------------------------------
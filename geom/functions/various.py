@@ -1,8 +1,9 @@
+import os
 import math
 import copy
 
-from geom.classes import molecule
-from geom.functions import tools, general, output
+from geom.classes import molecule, transform, parameters
+from geom.functions import tools, general, output, xyz_io, geomb_io, bulk_cache, result_store
 
 # -------------------------------------------------------------------------------------
 def select_case(inp):
@@ -17,7 +18,8 @@ def select_case(inp):
 
    Notes:
        - Supports calculating the minimum distance, geometrical center,
-         specular transformation, and merging geometries.
+         specular transformation, merging geometries, XYZ <-> .geomb conversion,
+         and inspecting or clearing the bulk lattice cache and the result store.
    """
 
    if (inp.min_dist):      min_dist(inp) 
@@ -25,6 +27,8 @@ def select_case(inp):
    if (inp.geom_specular): geom_specular(inp)
    if (inp.merge):         merge_geoms(inp)
    if (inp.create_dimer):  create_dimer(inp)
+   if (inp.convert):       convert_geom(inp)
+   if (inp.cache):         cache_task(inp)
 # -------------------------------------------------------------------------------------
 def min_dist(inp):
    """
@@ -97,6 +101,7 @@ def geom_specular(inp):
        - Reads the molecular geometry from an input file.
        - Reflects the molecule across the x-axis.
        - Translates the mirrored molecule by a shift distance (5 Å + molecule width).
+       - The reflection and the translation are fused into one transform.
        - Saves the new geometry file.
    """
 
@@ -111,14 +116,12 @@ def geom_specular(inp):
  
    # Create specular geometry along x and move at 5 Å 
    shift = (mol.xyz_max[0] - mol.xyz_min[0]) + 5.0
-   dir_factor = [1.0,0.0,0.0]
 
-   mol.xyz[0,:] = -mol.xyz[0,:]
-
-   mol.translate_geom(shift,dir_factor)
+   mirror = transform.transform.reflection('x').then(transform.transform.translation([shift, 0.0, 0.0]))
+   mol.transformed(mirror, mol)
  
    # Save specular geometry
-   output.print_geom(mol, inp.geom_file[:-4]+'_000_mirror')
+   output.print_geom(mol, general.geom_file_stem(inp.geom_file)+'_000_mirror')
 
    # Close and save logfile
    #output.logfile_close(out_log)
@@ -155,9 +158,78 @@ def merge_geoms(inp):
    mol_3 = tools.merge_geoms(inp,mol_1,mol_2)
 
    # Save merged geometry
-   file_geom_merged = f"{inp.geom1_file[:-4]}_MERGED_{inp.geom2_file[:-4]}"
+   file_geom_merged = f"{general.geom_file_stem(inp.geom1_file)}_MERGED_{general.geom_file_stem(inp.geom2_file)}"
    output.print_geom(mol_3, file_geom_merged)
 
    # Close and save logfile
    output.logfile_close(out_log)
 # -------------------------------------------------------------------------------------
+def convert_geom(inp):
+   """
+   Converts a geometry between the XYZ and the binary `.geomb` formats.
+
+   Args:
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       None: Saves the converted geometry in `results_geom/`.
+
+   Notes:
+       - XYZ -> .geomb keeps labels, coordinates (float64, unless `-float32`) and the
+         comment line; .geomb -> XYZ writes them back in the `print_geom` format, so
+         GEOM-generated XYZ files survive the round trip byte for byte.
+   """
+
+   # Check input
+   inp.check_input_case()   
+   general.create_results_geom()
+
+   file_name = os.path.basename(general.geom_file_stem(inp.geom_file))
+
+   if inp.geom_file.endswith('.geomb'):
+      try:
+         atoms, xyz, comment = geomb_io.read_geomb(inp.geom_file, mode='r')
+      except ValueError as exc:
+         output.error(str(exc))
+
+      mol = molecule.molecule()
+      mol.nAtoms, mol.atoms, mol.xyz = len(atoms), atoms, xyz
+
+      with output.open_geom_file(f'results_geom/{file_name}.xyz') as out_f:
+         output.write_geom_frame(out_f, mol, comment=comment)
+   else:
+      try:
+         with open(inp.geom_file, 'r', encoding='utf-8') as infile:
+            frame = xyz_io.read_xyz_frame(infile, inp.geom_file)
+      except ValueError:
+         frame = None
+
+      if frame is None: output.error('Corrupt geometry file "' + inp.geom_file + '"')
+      atoms, xyz, comment = frame
+
+      geomb_io.write_geomb(f'results_geom/{file_name}.geomb', atoms, xyz, comment, inp.convert_precision)
+# -------------------------------------------------------------------------------------
+def cache_task(inp):
+   """
+   Prints the contents of the bulk lattice cache and the result store, or clears them.
+
+   Args:
+       inp (input_class): An instance containing input parameters.
+
+   Returns:
+       None: Prints the cache summary (`stats`) or the number of removed entries (`clear`).
+   """
+
+   # Check input
+   inp.check_input_case()
+
+   param = parameters.parameters()
+
+   if (inp.cache_task == 'stats'):
+      output.print_cache_stats(bulk_cache.stats())
+      output.print_store_stats(result_store.stats())
+
+   if (inp.cache_task == 'clear'):
+      output.print_cache_cleared(param.bulk_cache_dir, bulk_cache.clear())
+      output.print_cache_cleared(param.result_store_dir, result_store.clear(), label='Result store')
+# -------------------------------------------------------------------------------------
@@ -0,0 +1,127 @@
+import gzip
+import lzma
+import numpy as np
+
+# Element label + x, y, z; any further columns (e.g. extended XYZ) are ignored
+XYZ_DTYPE = [('atoms', 'O'), ('x', 'f8'), ('y', 'f8'), ('z', 'f8')]
+
+# -------------------------------------------------------------------------------------
+def read_xyz(geom_file):
+   """
+   Reads a single-frame XYZ file.
+
+   Args:
+       geom_file (str or Path): Path to the XYZ file.
+
+   Returns:
+       tuple:
+           - list[str]: Atomic labels.
+           - numpy.ndarray: Atomic coordinates with shape (3, N).
+
+   Raises:
+       ValueError: If the file is not a valid single-frame XYZ file.
+   """
+
+   with open_xyz(geom_file) as infile:
+      frame = read_xyz_frame(infile, geom_file)
+
+      if frame is None: raise ValueError(f'Invalid XYZ file "{geom_file}".')
+
+      # Only blank lines may follow the frame
+      for line in infile:
+         if line.strip(): raise ValueError(f'XYZ atom count mismatch in "{geom_file}": extra lines after {len(frame[0])} atoms.')
+
+   return frame[0], frame[1]
+# -------------------------------------------------------------------------------------
+def iter_xyz(geom_file):
+   """
+   Lazily iterates over the frames of a multi-frame XYZ file.
+
+   Args:
+       geom_file (str or Path): Path to the XYZ file.
+
+   Yields:
+       tuple: (atoms, xyz, comment) of each frame, as returned by `read_xyz_frame`.
+
+   Raises:
+       ValueError: If a frame is truncated or malformed.
+
+   Notes:
+       - Only the current frame is held in memory, so trajectories larger than the
+         available memory can be processed frame by frame.
+   """
+
+   with open_xyz(geom_file) as infile:
+      while True:
+         frame = read_xyz_frame(infile, geom_file)
+         if frame is None: return
+         yield frame
+# -------------------------------------------------------------------------------------
+def read_xyz_frame(infile, geom_file=''):
+   """
+   Reads one XYZ frame from an open text handle, leaving it at the start of the next frame.
+
+   Args:
+       infile (TextIO): Open XYZ file, positioned at an atom-count line.
+       geom_file (str, optional): File name used in error messages.
+
+   Returns:
+       tuple or None: (atoms, xyz, comment) with atoms as list[str], xyz as a (3, N)
+       array and the comment line without its newline, or None at end of file.
+
+   Raises:
+       ValueError: If the frame is truncated or malformed.
+
+   Notes:
+       - The atom block is parsed in a single `np.loadtxt` pass over exactly N lines,
+         with the labels as a string column and the coordinates as float columns.
+       - Coordinates are parsed with correct rounding, so they are bit-identical to
+         `float()` on each field.
+   """
+
+   # Skip blank lines between frames
+   line = infile.readline()
+   while line and not line.strip(): line = infile.readline()
+   if not line: return None
+
+   try:
+      nAtoms = int(line.strip())
+   except ValueError as exc:
+      raise ValueError(f'Invalid atom count in "{geom_file}".') from exc
+
+   if nAtoms <= 0: raise ValueError(f'Invalid atom count in "{geom_file}".')
+
+   comment = infile.readline()
+   if not comment: raise ValueError(f'Invalid XYZ file "{geom_file}".')
+
+   try:
+      block = np.loadtxt(infile, dtype=XYZ_DTYPE, usecols=(0, 1, 2, 3), comments=None, ndmin=1, max_rows=nAtoms)
+   except (ValueError, IndexError) as exc:
+      raise ValueError(f'Invalid atom line in "{geom_file}": {exc}') from exc
+
+   if len(block) != nAtoms:
+      raise ValueError(f'XYZ atom count mismatch in "{geom_file}": expected {nAtoms}, got {len(block)}.')
+
+   xyz = np.empty((3, nAtoms))
+   xyz[0], xyz[1], xyz[2] = block['x'], block['y'], block['z']
+
+   return block['atoms'].tolist(), xyz, comment.rstrip('\r\n')
+# -------------------------------------------------------------------------------------
+def open_xyz(geom_file):
+   """
+   Opens an XYZ file for reading, decompressing ".gz" and ".xz" files on the fly.
+
+   Args:
+       geom_file (str or Path): Path to the XYZ file.
+
+   Returns:
+       TextIO: Open text handle.
+   """
+
+   geom_file = str(geom_file)
+
+   if geom_file.endswith('.gz'): return gzip.open(geom_file, 'rt', encoding='utf-8')
+   if geom_file.endswith('.xz'): return lzma.open(geom_file, 'rt', encoding='utf-8')
+
+   return open(geom_file, 'r', encoding='utf-8')
+# -------------------------------------------------------------------------------------
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
 import shutil
 import sys
+import tempfile
 import threading
 import uuid
 from dataclasses import dataclass
@@ -12,11 +14,12 @@ from pathlib import Path
 from typing import Callable
 
 from geom.classes.parameters import parameters
+from geom.functions import xyz_io
 
 
 _GENERATION_LOCK = threading.Lock()
 _CONVERSION_LOCK = threading.Lock()
-GUI_TMP_ROOT = Path(__file__).resolve().parent / "tmp"
+GUI_TMP_ROOT = Path(parameters().scratch_dir or tempfile.gettempdir()) / f"geom_gui_{os.getpid()}"
 
 
 @dataclass(frozen=True)
@@ -50,9 +53,9 @@ def supported_metals(arrangements: set[str] | None = None) -> list[str]:
 
 
 def supported_atomistic_metals() -> list[str]:
-    """Return FCC/BCC metals supported by the bulk-lattice atomistic generators."""
+    """Return FCC/BCC/HCP metals supported by the bulk-lattice atomistic generators."""
 
-    return supported_metals({"FCC", "BCC"})
+    return supported_metals({"FCC", "BCC", "HCP"})
 
 
 def supported_fcc_metals() -> list[str]:
@@ -291,26 +294,5 @@ def _newest_generated_xyz(results_dir: Path, before: dict[Path, int]) -> Path:
 def read_xyz(path: Path) -> tuple[AtomRecord, ...]:
     """Read the atom records from an XYZ file."""
 
-    path = Path(path)
-    with path.open("r", encoding="utf-8") as handle:
-        lines = handle.readlines()
-
-    if len(lines) < 2:
-        raise ValueError(f'Invalid XYZ file "{path}".')
-
-    try:
-        expected_atoms = int(lines[0].strip())
-    except ValueError as exc:
-        raise ValueError(f'Invalid atom count in "{path}".') from exc
-
-    atoms: list[AtomRecord] = []
-    for line in lines[2:]:
-        parts = line.split()
-        if len(parts) < 4:
-            continue
-        atoms.append(AtomRecord(parts[0], float(parts[1]), float(parts[2]), float(parts[3])))
-
-    if len(atoms) != expected_atoms:
-        raise ValueError(f'XYZ atom count mismatch in "{path}": expected {expected_atoms}, got {len(atoms)}.')
-
-    return tuple(atoms)
+    atoms, xyz = xyz_io.read_xyz(Path(path))
+    return tuple(map(AtomRecord, atoms, *xyz.tolist()))
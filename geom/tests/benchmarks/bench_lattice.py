@@ -0,0 +1,72 @@
+"""
+Benchmark: bulk FCC lattice generation.
+
+Compares the former ASE route (FaceCenteredCubic -> tmp_bulk.xyz -> molecule.read_geom)
+against the in-memory generator of `lattice.py` now behind `create_geom.create_bulk_metal`.
+
+Usage:
+    python bench_lattice.py [n_atoms ...]
+
+The ASE route is skipped above 2e6 atoms (text write and parse take minutes there).
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from geom.classes import molecule
+from geom.functions import lattice
+
+# -------------------------------------------------------------------------------------
+def ase_roundtrip(layers, lattice_constant, folder):
+   """
+   Former route: ASE cluster written to an XYZ file and parsed back (reference).
+   """
+
+   from ase.cluster.cubic import FaceCenteredCubic
+   from ase.io import write
+
+   geom_file = os.path.join(folder, 'tmp_bulk.xyz')
+   write(geom_file, FaceCenteredCubic('Ag', [(1, 0, 0), (0, 1, 0), (0, 0, 1)], layers, latticeconstant=lattice_constant))
+
+   return molecule.molecule().read_geom(geom_file, False)
+# -------------------------------------------------------------------------------------
+def in_memory(layers, lattice_constant):
+   """
+   New route: analytic lattice stored directly into a molecule.
+   """
+
+   xyz = lattice.cubic_bulk('FCC', lattice_constant, layers)
+
+   return molecule.molecule().set_geom(['Ag'] * xyz.shape[1], xyz)
+# -------------------------------------------------------------------------------------
+def run(n_atoms, lattice_constant=4.08):
+   """
+   Times both routes for a cubic FCC block holding about `n_atoms` atoms.
+   """
+
+   # An FCC block of l (100) layers per side holds about (2l + 1)^3 / 2 atoms
+   layers = [max(1, round(((2.0 * n_atoms)**(1.0 / 3.0) - 1.0) / 2.0))] * 3
+
+   start = time.perf_counter()
+   mol = in_memory(layers, lattice_constant)
+   t_new = time.perf_counter() - start
+
+   if n_atoms <= 2.0e6:
+      with tempfile.TemporaryDirectory() as folder:
+         start = time.perf_counter()
+         ref = ase_roundtrip(layers, lattice_constant, folder)
+         t_ase = f'{time.perf_counter() - start:10.3f}'
+      assert ref.xyz.tobytes() == mol.xyz.tobytes()
+   else:
+      t_ase = f'{"skipped":>10}'
+
+   print(f'{mol.nAtoms:>10d} {t_ase} {t_new:10.3f}')
+# -------------------------------------------------------------------------------------
+if __name__ == '__main__':
+
+   sizes = [int(float(n)) for n in sys.argv[1:]] or [100000, 1000000, 10000000]
+
+   print(f'{"N atoms":>10} {"ASE (s)":>10} {"lattice (s)":>10}')
+   for n_atoms in sizes: run(n_atoms)
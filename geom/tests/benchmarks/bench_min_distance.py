@@ -0,0 +1,84 @@
+"""
+Benchmark: minimum distance between two particles.
+
+Compares the dense broadcast implementation previously used by
+`tools.calc_min_distance` against the spatial index now behind it.
+
+Usage:
+    python bench_min_distance.py [n_atoms ...]
+
+The dense version is skipped when its distance matrix would exceed ~2 GB.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from geom.classes import molecule
+from geom.functions import tools
+
+# -------------------------------------------------------------------------------------
+def dense_min_distance(geom1, geom2):
+   """
+   Former broadcast implementation of `tools.calc_min_distance` (reference).
+   """
+
+   diffs = geom2.xyz[:, :, np.newaxis] - geom1.xyz[:, np.newaxis, :]
+   dist_matrix = np.sqrt(np.sum(diffs**2, axis=0))
+
+   return np.min(dist_matrix)
+# -------------------------------------------------------------------------------------
+def fcc_sphere(n_atoms, lattice_constant=4.08):
+   """
+   Builds a roughly spherical FCC particle with about `n_atoms` atoms.
+   """
+
+   basis = np.array([[0.0, 0.0, 0.0], [0.5, 0.5, 0.0], [0.5, 0.0, 0.5], [0.0, 0.5, 0.5]])
+   radius = (3.0 * n_atoms / (4.0 * np.pi * 4.0))**(1.0 / 3.0) + 1.0
+   n = int(np.ceil(radius))
+
+   cells = np.stack(np.meshgrid(*[np.arange(-n, n + 1)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+   points = (cells[:, np.newaxis, :] + basis[np.newaxis, :, :]).reshape(-1, 3)
+   points = points[np.argsort(np.sum(points**2, axis=1))[:n_atoms]]
+
+   mol = molecule.molecule()
+   mol.xyz = np.ascontiguousarray(points.T) * lattice_constant
+   mol.nAtoms = n_atoms
+   mol.atoms = ['ag'] * n_atoms
+
+   return mol
+# -------------------------------------------------------------------------------------
+def run(n_atoms):
+   """
+   Times both implementations for two particles separated by a 10 Å gap.
+   """
+
+   geom1 = fcc_sphere(n_atoms)
+   geom2 = fcc_sphere(n_atoms)
+   geom2.translate_geom(np.max(geom1.xyz[0]) - np.min(geom2.xyz[0]) + 10.0, [1.0, 0.0, 0.0])
+
+   start = time.perf_counter()
+   geom1.get_spatial_index()
+   t_build = time.perf_counter() - start
+
+   start = time.perf_counter()
+   d_index = tools.calc_min_distance(geom1, geom2)
+   t_index = time.perf_counter() - start
+
+   if 8.0 * 4.0 * n_atoms**2 < 2.0e9:
+      start = time.perf_counter()
+      d_dense = dense_min_distance(geom1, geom2)
+      t_dense = f'{time.perf_counter() - start:10.4f}'
+      assert d_dense == d_index
+   else:
+      t_dense = f'{"skipped":>10}'
+
+   print(f'{n_atoms:>10d} {t_build:10.4f} {t_index:10.4f} {t_dense} {d_index:12.6f}')
+# -------------------------------------------------------------------------------------
+if __name__ == '__main__':
+
+   sizes = [int(n) for n in sys.argv[1:]] or [1000, 5000, 10000, 50000, 200000]
+
+   print(f'{"N atoms":>10} {"build (s)":>10} {"index (s)":>10} {"dense (s)":>10} {"min dist":>12}')
+   for n_atoms in sizes: run(n_atoms)
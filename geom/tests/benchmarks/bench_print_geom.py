@@ -0,0 +1,71 @@
+"""
+Benchmark: XYZ writing throughput.
+
+Compares the former per-atom f-string loop of `output.print_geom` against the
+block-formatted `output.write_geom_frame`, plus its gzip and xz streams.
+
+Usage:
+    python bench_print_geom.py [n_atoms ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from geom.classes import molecule
+from geom.functions import output
+
+# -------------------------------------------------------------------------------------
+def per_atom(geom_file, mol):
+   """
+   Former route: one f-string and one write per atom (reference).
+   """
+
+   with open(geom_file, 'w') as out_f:
+      out_f.write(f"{mol.nAtoms}\n")
+      out_f.write('Generated with GEOM code\n')
+
+      for i in range(mol.nAtoms):
+         atom, x, y, z = mol.atoms[i], *mol.xyz[:, i]
+         out_f.write(f'{atom.capitalize():2} {x:20.8f} {y:20.8f} {z:20.8f}\n')
+# -------------------------------------------------------------------------------------
+def run(n_atoms):
+   """
+   Times every writer on a random particle of `n_atoms` atoms and prints atoms/s.
+   """
+
+   xyz = np.random.default_rng(0).uniform(-100.0, 100.0, (3, n_atoms))
+   mol = molecule.molecule().set_geom(['ag', 'au'] * (n_atoms // 2) + ['ag'] * (n_atoms % 2), xyz)
+
+   rates = []
+   with tempfile.TemporaryDirectory() as folder:
+      os.makedirs(os.path.join(folder, 'results_geom'))
+      cwd = os.getcwd()
+      os.chdir(folder)
+
+      try:
+         start = time.perf_counter()
+         per_atom('results_geom/old.xyz', mol)
+         rates.append(n_atoms / (time.perf_counter() - start))
+
+         for compression in [None, 'gzip', 'xz']:
+            start = time.perf_counter()
+            output.print_geom(mol, f'new_{compression}', compression=compression)
+            rates.append(n_atoms / (time.perf_counter() - start))
+
+         with open('results_geom/old.xyz', 'rb') as f_old, open('results_geom/new_None.xyz', 'rb') as f_new:
+            assert f_old.read() == f_new.read()
+      finally:
+         os.chdir(cwd)
+
+   print(f'{n_atoms:>10d}' + ''.join(f' {rate:14.3e}' for rate in rates))
+# -------------------------------------------------------------------------------------
+if __name__ == '__main__':
+
+   sizes = [int(float(n)) for n in sys.argv[1:]] or [10000, 100000, 1000000]
+
+   print(f'{"N atoms":>10} {"old (atoms/s)":>14} {"new (atoms/s)":>14} {"gzip (atoms/s)":>14} {"xz (atoms/s)":>14}')
+   for n_atoms in sizes: run(n_atoms)
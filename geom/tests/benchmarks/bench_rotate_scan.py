@@ -0,0 +1,82 @@
+"""
+Benchmark: rotational scan throughput.
+
+Compares the former per-angle route (deepcopy + rotation of one molecule at a
+time) against the batched rotation stack of `transform.apply_all`. File output
+is excluded, so only the rotation itself is timed.
+
+Usage:
+    python bench_rotate_scan.py [n_atoms ...]
+"""
+
+import copy
+import math
+import sys
+import time
+
+import numpy as np
+
+from geom.classes import molecule, parameters, transform
+
+# -------------------------------------------------------------------------------------
+def per_angle(mol, angles):
+   """
+   Former route: deepcopy and rotate the molecule once per angle (reference).
+   """
+
+   frames = []
+   for angle in angles:
+      mol_rot = copy.deepcopy(mol)
+
+      theta = math.radians(angle)
+      cos_theta, sin_theta = math.cos(theta), math.sin(theta)
+
+      mol_rot.xyz[1, :] = mol.xyz[1, :] * cos_theta - mol.xyz[2, :] * sin_theta
+      mol_rot.xyz[2, :] = mol.xyz[1, :] * sin_theta + mol.xyz[2, :] * cos_theta
+
+      frames.append(mol_rot.xyz[:, -1].copy())
+
+   return frames
+# -------------------------------------------------------------------------------------
+def batched(mol, angles):
+   """
+   Batched route: rotation stack applied in chunks that fit the memory budget.
+   """
+
+   rotations = [transform.transform.rotation(angle, 'x') for angle in angles]
+   batch_size = max(1, parameters.parameters().transform_batch_size // mol.nAtoms)
+   buffer = np.empty((min(batch_size, len(angles)), 3, mol.nAtoms))
+
+   frames = []
+   for start in range(0, len(rotations), batch_size):
+      batch = rotations[start:start + batch_size]
+      transform.apply_all(batch, mol.xyz, buffer[:len(batch)])
+      frames.extend(buffer[k, :, -1].copy() for k in range(len(batch)))
+
+   return frames
+# -------------------------------------------------------------------------------------
+def run(n_atoms, angles):
+   """
+   Times both routes on a random particle of `n_atoms` atoms and prints frames/s.
+   """
+
+   xyz = np.random.default_rng(0).uniform(-100.0, 100.0, (3, n_atoms))
+   mol = molecule.molecule().set_geom(['ag'] * n_atoms, xyz)
+
+   rates, results = [], []
+   for route in [per_angle, batched]:
+      start = time.perf_counter()
+      results.append(route(mol, angles))
+      rates.append(len(angles) / (time.perf_counter() - start))
+
+   assert all(np.array_equal(a, b) for a, b in zip(*results))
+
+   print(f'{n_atoms:>10d} {len(angles):>8d}' + ''.join(f' {rate:14.3e}' for rate in rates))
+# -------------------------------------------------------------------------------------
+if __name__ == '__main__':
+
+   sizes = [int(float(n)) for n in sys.argv[1:]] or [1000, 10000, 100000]
+   angles = [float(a) for a in range(360)]
+
+   print(f'{"N atoms":>10} {"N angles":>8} {"old (frame/s)":>14} {"new (frame/s)":>14}')
+   for n_atoms in sizes: run(n_atoms, angles)
@@ -0,0 +1,81 @@
+"""
+Benchmark: CLI startup cost.
+
+Runs `python -X importtime -m geom` for light commands and reports the import time
+of the package (`geom` modules and everything they pull in) and the wall time of the
+whole call. Heavy backends (gmsh, ASE, RDKit, py3Dmol, matplotlib) loaded by a
+command are listed, since only the tasks that use them should import them.
+
+The light commands (-h, -c, -min) must import within BUDGET seconds; the script
+exits with status 1 otherwise (loading the backends costs ~0.8 s).
+
+Usage:
+    python bench_startup.py [geom.xyz]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY = ('gmsh', 'ase', 'rdkit', 'py3Dmol', 'matplotlib')
+
+# Import-time budget of a light command (s)
+BUDGET = 0.4
+
+# -------------------------------------------------------------------------------------
+def import_profile(args, cwd=None):
+   """
+   Runs `python -m geom args` under `-X importtime`.
+
+   Args:
+       args (list[str]): Command-line arguments of geom.
+       cwd (str, optional): Working directory of the call.
+
+   Returns:
+       tuple:
+           - float: Cumulative import time of `geom.__main__` and the task modules (s).
+           - list[str]: Top-level heavy backends imported during the call.
+           - float: Wall time of the call (s).
+           - subprocess.CompletedProcess: The finished call (return code and output).
+   """
+
+   root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+   env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get('PYTHONPATH', ''))
+
+   start = time.perf_counter()
+   result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'geom'] + args,
+                           cwd=cwd, env=env, capture_output=True, text=True)
+   wall = time.perf_counter() - start
+
+   import_time, heavy = 0.0, set()
+   for line in result.stderr.splitlines():
+      if not line.startswith('import time:') or 'cumulative' in line: continue
+      _, cumulative, module = line[len('import time:'):].split('|')
+      name = module.strip()
+      if name.split('.')[0] in HEAVY: heavy.add(name.split('.')[0])
+      # Top-level geom modules (indentation of one space): the package and its task modules
+      if module.startswith(' geom'): import_time += int(cumulative) * 1e-6
+
+   return import_time, sorted(heavy), wall, result
+# -------------------------------------------------------------------------------------
+if __name__ == '__main__':
+
+   with tempfile.TemporaryDirectory() as folder:
+      geom_file = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else os.path.join(folder, 'geom.xyz')
+      if len(sys.argv) == 1:
+         with open(geom_file, 'w') as f: f.write('2\n\nAg 0.0 0.0 0.0\nAg 0.0 0.0 2.9\n')
+
+      over_budget = False
+
+      print(f'{"command":>28} {"imports (s)":>12} {"wall (s)":>10}  heavy backends')
+      for args in [['-h'], ['-c', geom_file], ['-min', geom_file, geom_file], ['-create', '-sphere', 'Ag', '5.0']]:
+         import_time, heavy, wall, _ = import_profile(args, cwd=folder)
+         label = ' '.join(os.path.basename(arg) for arg in args)
+         print(f'{label:>28} {import_time:12.3f} {wall:10.3f}  {", ".join(heavy) or "-"}')
+         if args[0] != '-create' and import_time > BUDGET: over_budget = True
+
+   if over_budget:
+      print(f'Light commands exceed the import-time budget of {BUDGET} s')
+      sys.exit(1)
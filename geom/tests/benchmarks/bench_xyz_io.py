@@ -0,0 +1,82 @@
+"""
+Benchmark: XYZ parsing throughput.
+
+Compares the former line-by-line parser of `molecule.read_geom` (split() and three
+float() calls per atom) against the single-pass reader of `xyz_io.read_xyz`.
+
+Usage:
+    python bench_xyz_io.py [n_atoms ...]
+
+The line-by-line parser is skipped above 2e6 atoms.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from geom.functions import xyz_io
+
+# -------------------------------------------------------------------------------------
+def line_by_line(geom_file):
+   """
+   Former route: per-line split() and float() (reference).
+   """
+
+   with open(geom_file, 'r') as infile:
+      nAtoms = int(infile.readline())
+      infile.readline()
+
+      atoms = []
+      xyz = np.zeros((3, nAtoms))
+      for i, line in enumerate(infile):
+         line = line.split()
+         atoms.append(line[0])
+         xyz[0][i] = float(line[1])
+         xyz[1][i] = float(line[2])
+         xyz[2][i] = float(line[3])
+
+   return atoms, xyz
+# -------------------------------------------------------------------------------------
+def write_particle(geom_file, n_atoms):
+   """
+   Writes a random particle in the `output.print_geom` format.
+   """
+
+   xyz = np.random.default_rng(0).uniform(-100.0, 100.0, (n_atoms, 3))
+
+   with open(geom_file, 'w') as outfile:
+      outfile.write(f'{n_atoms}\n\n')
+      outfile.writelines(f'Ag{x:17.8f}{y:17.8f}{z:17.8f}\n' for x, y, z in xyz)
+# -------------------------------------------------------------------------------------
+def run(n_atoms):
+   """
+   Times both parsers on a particle of `n_atoms` atoms and prints atoms/s.
+   """
+
+   with tempfile.TemporaryDirectory() as folder:
+      geom_file = os.path.join(folder, 'particle.xyz')
+      write_particle(geom_file, n_atoms)
+
+      start = time.perf_counter()
+      atoms, xyz = xyz_io.read_xyz(geom_file)
+      rate_new = n_atoms / (time.perf_counter() - start)
+
+      if n_atoms <= 2.0e6:
+         start = time.perf_counter()
+         ref_atoms, ref_xyz = line_by_line(geom_file)
+         rate_old = f'{n_atoms / (time.perf_counter() - start):14.3e}'
+         assert ref_atoms == atoms and ref_xyz.tobytes() == xyz.tobytes()
+      else:
+         rate_old = f'{"skipped":>14}'
+
+   print(f'{n_atoms:>10d} {rate_old} {rate_new:14.3e}')
+# -------------------------------------------------------------------------------------
+if __name__ == '__main__':
+
+   sizes = [int(float(n)) for n in sys.argv[1:]] or [10000, 100000, 1000000, 2000000]
+
+   print(f'{"N atoms":>10} {"old (atoms/s)":>14} {"new (atoms/s)":>14}')
+   for n_atoms in sizes: run(n_atoms)
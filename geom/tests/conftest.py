@@ -0,0 +1,24 @@
+import pytest
+
+# -------------------------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def isolated_caches(monkeypatch, tmp_path_factory):
+   """
+   Points the result store, the bulk lattice cache and the scratch directories of every
+   test at a private temporary folder, so that no test reads or writes the user caches.
+
+   Notes:
+       - The result store is disabled (GEOM_STORE_SIZE=0), so the reference tests always
+         run the generators; tests of the store enable it themselves.
+       - The folder is not the test's `tmp_path`, which some tests expect to hold only
+         their own outputs.
+   """
+
+   folder = tmp_path_factory.mktemp("geom_env")
+
+   monkeypatch.setenv("GEOM_STORE_DIR", str(folder / "results"))
+   monkeypatch.setenv("GEOM_STORE_SIZE", "0")
+   monkeypatch.setenv("GEOM_CACHE_DIR", str(folder / "bulk"))
+   monkeypatch.setenv("GEOM_CACHE_SIZE", str(1 << 30))
+   monkeypatch.setenv("GEOM_SCRATCH", str(folder))
+# -------------------------------------------------------------------------------------
@@ -39,6 +39,651 @@ def test_remove_duplicate_xyz_preserves_first_atom_labels():
       ]),
    )
 # -------------------------------------------------------------------------------------
+def test_spatial_index_matches_dense_distances():
+   """
+   Tests that min-distance and nearest-neighbour queries match a dense distance matrix.
+   """
+
+   from geom.functions import tools
+
+   rng = np.random.default_rng(0)
+
+   mol_1 = molecule.molecule()
+   mol_1.xyz = rng.normal(size=(3, 300)) * 10.0
+   mol_1.nAtoms = 300
+
+   mol_2 = molecule.molecule()
+   mol_2.xyz = rng.normal(size=(3, 200)) * 5.0
+   mol_2.nAtoms = 200
+
+   for shift in [0.0, 30.0, 1.0e8]:
+      mol_2.translate_geom(shift, [0.0, 1.0, 0.0])
+
+      dense = np.sqrt(np.sum((mol_2.xyz[:, :, np.newaxis] - mol_1.xyz[:, np.newaxis, :])**2, axis=0))
+
+      assert tools.calc_min_distance(mol_1, mol_2) == np.min(dense)
+
+      distances, indices = mol_1.get_spatial_index().nearest(mol_2.xyz)
+      assert np.array_equal(distances, np.min(dense, axis=1))
+      assert np.array_equal(indices, np.argmin(dense, axis=1))
+
+   # A translated molecule keeps (and shifts) its cached index
+   index = mol_2.get_spatial_index()
+   mol_2.translate_geom(2.5, [1.0, 0.0, 0.0])
+   assert mol_2.get_spatial_index() is index
+   assert index.describes(mol_2.xyz)
+# -------------------------------------------------------------------------------------
+def test_find_overlapping_atoms_matches_dense_mask():
+   """
+   Tests that the cutoff query returns the same keep mask as a dense distance matrix.
+   """
+
+   from geom.functions import tools
+
+   rng = np.random.default_rng(1)
+
+   mol_1 = molecule.molecule()
+   mol_1.xyz = rng.uniform(-10.0, 10.0, size=(3, 400))
+   mol_1.nAtoms = 400
+
+   # Half of the atoms duplicate atoms of mol_1, so the cutoff is hit exactly at 0.0
+   mol_2 = molecule.molecule()
+   mol_2.xyz = np.concatenate((mol_1.xyz[:, :150], rng.uniform(-15.0, 15.0, size=(3, 150))), axis=1)
+   mol_2.nAtoms = 300
+
+   inp = input_class.input_class()
+
+   for cutoff in [0.0, 1.0, 2.88]:
+      inp.merge_cutoff = cutoff
+
+      dist_matrix = np.linalg.norm(mol_2.xyz[:, :, None] - mol_1.xyz[:, None, :], axis=0)
+      expected = np.all(dist_matrix >= cutoff, axis=1)
+
+      keep_atoms, n_dropped = tools.find_overlapping_atoms(inp, mol_1, mol_2)
+
+      assert np.array_equal(keep_atoms, expected)
+      assert n_dropped == np.count_nonzero(~expected)
+# -------------------------------------------------------------------------------------
+def test_remove_undercoordinated_atoms_matches_naive_passes():
+   """
+   Tests that incremental coordination updates remove the same atoms as naive per-pass recounts.
+   """
+
+   rng = np.random.default_rng(2)
+
+   mol = molecule.molecule()
+   mol.xyz = rng.uniform(0.0, 12.0, size=(3, 500))
+   mol.nAtoms = 500
+   mol.atoms = [f"C{i}" for i in range(500)]
+
+   # Naive reference: recount all neighbors (0 < d <= cutoff) after every pass
+   xyz, atoms = mol.xyz.copy(), list(mol.atoms)
+   for iteration in range(3):
+      dist_matrix = np.linalg.norm(xyz.T[:, None, :] - xyz.T[None, :, :], axis=2)
+      coordination = np.sum((dist_matrix > 0) & (dist_matrix <= 1.5), axis=1)
+      keep = coordination >= 2
+      xyz, atoms = xyz[:, keep], [atoms[i] for i in np.flatnonzero(keep)]
+
+   n_dangling = mol.remove_undercoordinated_atoms(cutoff=1.5, min_neighbors=2, max_iterations=3)
+
+   dist_matrix = np.linalg.norm(xyz.T[:, None, :] - xyz.T[None, :, :], axis=2)
+   assert n_dangling == np.count_nonzero(np.sum((dist_matrix > 0) & (dist_matrix <= 1.5), axis=1) < 2)
+   assert mol.atoms == atoms
+   assert np.array_equal(mol.xyz, xyz)
+# -------------------------------------------------------------------------------------
+def test_lattice_bulk_matches_ase_xyz_roundtrip(tmp_path):
+   """
+   Tests that the in-memory lattices reproduce, bit for bit, the ASE bulks written to and read from XYZ files.
+   """
+
+   from ase.cluster.cubic import FaceCenteredCubic, BodyCenteredCubic
+   from ase.build import graphene_nanoribbon, graphene
+   from ase.io import write
+   from geom.functions import lattice
+
+   def roundtrip(atoms):
+      write(str(tmp_path / "bulk.xyz"), atoms)
+      return molecule.molecule().read_geom(str(tmp_path / "bulk.xyz"), False).xyz
+
+   surfaces = [(1, 0, 0), (0, 1, 0), (0, 0, 1)]
+   for layers in ([5, 7, 9], [12, 12, 12]):
+      assert roundtrip(FaceCenteredCubic("Ag", surfaces, layers, latticeconstant=4.08)).tobytes() == lattice.cubic_bulk("FCC", 4.08, layers).tobytes()
+      assert roundtrip(BodyCenteredCubic("Fe", surfaces, layers, latticeconstant=2.87)).tobytes() == lattice.cubic_bulk("BCC", 2.87, layers).tobytes()
+
+   ribbon = graphene_nanoribbon(n=28, m=14, type="armchair")
+   ribbon.rotate(90, "x", rotate_cell=True)
+   ribbon.translate(-ribbon.get_center_of_mass())
+   assert roundtrip(ribbon).tobytes() == lattice.graphene_ribbon_bulk(28, 14).tobytes()
+
+   sheet = graphene(a=2.46, size=(40, 40, 1))
+   sheet.translate(-sheet.get_center_of_mass())
+   assert roundtrip(sheet).tobytes() == lattice.graphene_sheet_bulk(2.46, (40, 40)).tobytes()
+
+   # HCP: 6 in-plane neighbors at a and 6 out-of-plane neighbors at sqrt(a^2/3 + c^2/4)
+   a, c = 3.21, 5.21
+   xyz = lattice.hcp_bulk((a, c), [6, 6, 6])
+   dist = np.linalg.norm(xyz.T[:, None, :] - xyz.T[None, :, :], axis=2)
+   central = np.argmin(np.linalg.norm(xyz, axis=0))
+   assert np.allclose(np.sort(dist[central])[1:13], sorted([a] * 6 + [np.sqrt(a**2 / 3.0 + c**2 / 4.0)] * 6), atol=1e-7)
+# -------------------------------------------------------------------------------------
+def test_lattice_region_clipping_keeps_every_atom_of_the_shape():
+   """
+   Tests that clipped enumeration returns, in the same order, every atom of the full block inside the shape.
+   """
+
+   from geom.functions import lattice
+
+   def inside_sphere(xyz):  return np.linalg.norm(xyz - np.array([[1.0], [0.0], [-2.0]]), axis=0) <= 9.0
+   def inside_rod(xyz):     return (xyz[1]**2 + xyz[2]**2 <= 25.0) & (np.abs(xyz[0]) <= 12.0)
+   def inside_tip(xyz):     return (xyz[2] >= 0.1 * xyz[0]**2 - 0.02 * xyz[1]**2) & (xyz[2] >= 0.0) & (xyz[2] <= 15.0)
+
+   cases = [(lattice.sphere_region([1.0, 0.0, -2.0], 9.0),            inside_sphere),
+            (lattice.capsule_region("x", 34.0, 10.0),                 inside_rod),
+            (lattice.paraboloid_region(0.1, -0.02, 0.0, 0.0, 15.0),   inside_tip),
+            (lattice.union_regions(lattice.sphere_region([1.0, 0.0, -2.0], 9.0),
+                                   lattice.box_region([-3.0, -3.0, 0.0], [3.0, 3.0, 14.0])), inside_sphere)]
+
+   for generate in (lambda region: lattice.cubic_bulk("FCC", 4.08, [10, 10, 10], region),
+                    lambda region: lattice.hcp_bulk(3.21, [10, 10, 10], region)):
+      full = generate(None)
+      for region, inside in cases:
+         clipped = generate(region)
+         assert clipped.shape[1] < full.shape[1]
+         assert clipped[:, inside(clipped)].tobytes() == full[:, inside(full)].tobytes()
+# -------------------------------------------------------------------------------------
+def test_bulk_cache_reuses_blocks_and_evicts_least_recently_used(monkeypatch, tmp_path):
+   """
+   Tests that cached bulks equal freshly built ones, that reuse skips the lattice
+   construction, and that the size cap evicts the least recently used entry.
+   """
+
+   from geom.functions import lattice, bulk_cache
+
+   monkeypatch.setenv("GEOM_CACHE_DIR", str(tmp_path))
+   monkeypatch.setenv("GEOM_CACHE_SIZE", str(1 << 30))
+
+   sphere = lattice.sphere_region([0.0, 0.0, 0.0], 12.0)
+   cone   = lattice.cone_region(10.0, 15.0)
+
+   expected = {name: lattice.cubic_bulk("FCC", 4.08, [14, 14, 14], region) for name, region in [("sphere", sphere), ("cone", cone)]}
+
+   assert np.array_equal(bulk_cache.metal_bulk("ag", "FCC", 4.08, [14, 14, 14], sphere), expected["sphere"])
+   [(first, size, _)] = bulk_cache.entries()
+
+   def no_lattice(*args): raise AssertionError("lattice rebuilt")
+   with monkeypatch.context() as patch:
+      patch.setattr(lattice, "cubic_bulk", no_lattice)
+      hit = bulk_cache.metal_bulk("ag", "FCC", 4.08, [14, 14, 14], sphere)
+   assert hit.tobytes() == expected["sphere"].tobytes()
+
+   monkeypatch.setenv("GEOM_CACHE_SIZE", str(size + 1))
+   assert np.array_equal(bulk_cache.metal_bulk("ag", "FCC", 4.08, [14, 14, 14], cone), expected["cone"])
+
+   assert [path for path, _, _ in bulk_cache.entries()] != [first]
+   assert len(bulk_cache.entries()) == 1 and bulk_cache.stats()["entries"][0]["spec"]["element"] == "ag"
+   assert bulk_cache.clear() == 1 and bulk_cache.entries() == []
+# -------------------------------------------------------------------------------------
+def test_result_store_restores_create_results_without_generating(monkeypatch, tmp_path):
+   """
+   Tests that a repeated create command restores identical files from the result store
+   without building anything, and that other parameters miss.
+   """
+
+   from geom.functions import result_store
+
+   monkeypatch.setenv("GEOM_STORE_DIR", str(tmp_path / "store"))
+   monkeypatch.setenv("GEOM_STORE_SIZE", str(1 << 30))
+   monkeypatch.setenv("GEOM_CACHE_DIR", str(tmp_path / "bulk"))
+
+   def run(folder, args):
+      os.makedirs(tmp_path / folder)
+      monkeypatch.chdir(tmp_path / folder)
+      monkeypatch.setattr(sys, "argv", ["dummy", "-create"] + args)
+      inp = input_class.input_class()
+      general.read_command_line(sys.argv, inp)
+      create_geom.select_case(inp)
+      return inp
+
+   first = run("first", ["-sphere", "Ag", "8.0"])
+
+   def no_build(*args): raise AssertionError("geometry rebuilt")
+   monkeypatch.setattr(create_geom, "create_bulk_metal", no_build)
+   monkeypatch.setattr(create_geom, "sphere", no_build)
+   second = run("second", ["-sphere", "Ag", "8.0"])
+
+   assert second.xyz_output == first.xyz_output
+   assert filecmp.cmp(tmp_path / "first" / "results_geom" / f"{first.xyz_output}.xyz",
+                      tmp_path / "second" / "results_geom" / f"{second.xyz_output}.xyz", shallow=False)
+
+   with pytest.raises(AssertionError): run("third", ["-sphere", "Ag", "9.0"])
+
+   summary = result_store.stats()
+   assert (summary["entries"], summary["hits"], summary["misses"]) == (1, 1, 2)
+   assert result_store.clear() == 1 and result_store.entries() == []
+# -------------------------------------------------------------------------------------
+def test_unwritable_result_store_only_disables_it(monkeypatch, tmp_path):
+   """
+   Tests that a create command still writes its outputs when the store folder cannot be created.
+   """
+
+   from geom.functions import result_store
+
+   (tmp_path / "file").write_text("")
+   monkeypatch.setenv("GEOM_STORE_DIR", str(tmp_path / "file" / "store"))
+   monkeypatch.setenv("GEOM_STORE_SIZE", str(1 << 30))
+
+   monkeypatch.chdir(tmp_path)
+   monkeypatch.setattr(sys, "argv", ["dummy", "-create", "-sphere", "Ag", "8.0"])
+   inp = input_class.input_class()
+   general.read_command_line(sys.argv, inp)
+   create_geom.select_case(inp)
+
+   assert os.listdir(tmp_path / "results_geom") == [f"{inp.xyz_output}.xyz"]
+   assert result_store.entries() == []
+# -------------------------------------------------------------------------------------
+def test_light_commands_skip_heavy_imports(tmp_path):
+   """
+   Tests that light commands succeed without importing any heavy backend.
+
+   Notes:
+       - `output.error` exits with status 0, so failures are also detected by its message.
+       - The import-time budget is enforced by `benchmarks/bench_startup.py`, not here,
+         since timings are unreliable on shared runners.
+   """
+
+   from geom.tests.benchmarks.bench_startup import import_profile
+
+   geom_file = os.path.join(test_folder_path, "tc_center", "doxorubicin.xyz")
+
+   for args in [["-c", geom_file], ["-min", geom_file, geom_file]]:
+      _, heavy, _, result = import_profile(args, cwd=str(tmp_path))
+      assert result.returncode == 0 and "ERROR" not in result.stdout
+      assert heavy == []
+# -------------------------------------------------------------------------------------
+def test_shape_expressions_match_filters_and_merges():
+   """
+   Tests that CSG unions reproduce the atom order of filtering each primitive and merging, and that the boolean operators combine masks.
+   """
+
+   from types import SimpleNamespace
+   from geom.classes import shape
+   from geom.functions import lattice, tools
+
+   xyz = lattice.cubic_bulk("FCC", 4.08, [12, 12, 12])
+   atoms = ["Ag"] * xyz.shape[1]
+   inp = SimpleNamespace(atomtype="Ag", merge_cutoff=2.88, verbose=False, main_axis="z", rod_length=40.0, rod_width=16.0)
+
+   mols = [molecule.molecule().set_geom(atoms, xyz) for _ in range(3)]
+   tools.determine_sphere_center(inp, "+")
+   mols[0].filter_xyz_in_sphere(inp)
+   tools.determine_sphere_center(inp, "-")
+   mols[1].filter_xyz_in_sphere(inp)
+   mols[2].filter_xyz_in_cylinder(inp)
+   merged = tools.merge_geoms(inp, mols[2], tools.merge_geoms(inp, mols[0], mols[1]))
+
+   rod = molecule.molecule().set_geom(atoms, xyz).filter_xyz_in_shape(inp, shape.shape.rod("z", 40.0, 16.0))
+   assert rod.xyz.tobytes() == merged.xyz.tobytes()
+
+   ball = shape.shape.sphere([0.0, 0.0, 0.0], 14.0)
+   slab = shape.shape.half_space([0.0, 0.0, 1.0], -2.0)
+   r, z = np.linalg.norm(xyz, axis=0), xyz[2]
+   assert np.array_equal((ball & slab).contains(xyz), (r <= 14.0) & (z <= 2.0))
+   assert np.array_equal((ball - slab).contains(xyz), (r <= 14.0) & (z > 2.0))
+   assert np.array_equal((ball | slab).contains(xyz), (r <= 14.0) | (z <= 2.0))
+# -------------------------------------------------------------------------------------
+def test_region_labels_of_onion_particles():
+   """
+   Tests that nested solids label every atom with its innermost region, core first, as the subtract-and-merge core-shell route.
+   """
+
+   from types import SimpleNamespace
+   from geom.classes import shape
+   from geom.functions import lattice, tools
+
+   xyz = lattice.cubic_bulk("FCC", 4.08, [12, 12, 12])
+   atoms = ["Ag"] * xyz.shape[1]
+   radii = [6.0, 10.0, 15.0, 20.0]
+
+   mol = molecule.molecule().set_geom(atoms, xyz)
+   mol.filter_xyz_in_regions([shape.shape.sphere([0.0, 0.0, 0.0], r) for r in radii], ["Au", "Ag", "Pd", "Pt"])
+
+   r = np.linalg.norm(mol.xyz, axis=0)
+   assert mol.nAtoms == np.count_nonzero(np.linalg.norm(xyz, axis=0) <= radii[-1])
+   assert np.array_equal(mol.regions, np.searchsorted(radii, r))
+   assert np.all(np.diff(mol.regions) >= 0)
+   assert mol.atoms == [["Au", "Ag", "Pd", "Pt"][i] for i in mol.regions]
+
+   # Two regions: same atoms and order as filtering the core out of the shell and merging
+   inp = SimpleNamespace(atomtype="Ag", merge_cutoff=2.88, verbose=False, sphere_center=[0.0, 0.0, 0.0], radius=radii[2])
+   mol_out = molecule.molecule().set_geom(atoms, xyz).filter_xyz_in_sphere(inp)
+   inp.radius = radii[0]
+   mol_in = molecule.molecule().set_geom(mol_out.atoms, mol_out.xyz).filter_xyz_in_sphere(inp)
+   merged = tools.merge_geoms(inp, mol_in, tools.subtract_geoms(inp, mol_in, mol_out))
+
+   mol = molecule.molecule().set_geom(atoms, xyz)
+   mol.filter_xyz_in_regions([shape.shape.sphere([0.0, 0.0, 0.0], radii[0]), shape.shape.sphere([0.0, 0.0, 0.0], radii[2])], ["Au", "Ag"])
+   assert mol.xyz.tobytes() == merged.xyz.tobytes()
+# -------------------------------------------------------------------------------------
+def test_radius_sweep_matches_standalone_particles(monkeypatch, tmp_path):
+   """
+   Tests that every particle of a radius sweep is byte-identical to its standalone run.
+   """
+
+   def run(folder, args):
+      os.makedirs(tmp_path / folder)
+      monkeypatch.chdir(tmp_path / folder)
+      monkeypatch.setattr(sys, "argv", ["dummy", "-create"] + args)
+      inp = input_class.input_class()
+      general.read_command_line(sys.argv, inp)
+      create_geom.select_case(inp)
+
+   for option, metal, radii in [("-sphere", "Ag", ["6.0", "9.5", "12.0"]),
+                                ("-sphere", "Fe", ["6.0", "9.5"]),
+                                ("-sphere", "Mg", ["6.0", "9.5"]),
+                                ("-ico",    "Au", ["5.0", "9.0", "12.0"])]:
+      sweep = f"sweep{option}_{metal}"
+      run(sweep, [option, metal, radii[0], "-sweep"] + radii[1:])
+      for radius in radii:
+         single = f"single{option}_{metal}_{radius}"
+         run(single, [option, metal, radius])
+         [name] = os.listdir(tmp_path / single / "results_geom")
+         assert filecmp.cmp(tmp_path / sweep / "results_geom" / name, tmp_path / single / "results_geom" / name, shallow=False)
+# -------------------------------------------------------------------------------------
+def test_xyz_reader_matches_line_by_line_parsing(tmp_path):
+   """
+   Tests that the single-pass XYZ reader returns the labels and exact floats of a
+   per-line split()/float() parse, and rejects corrupt files.
+   """
+
+   from geom.functions import xyz_io
+
+   lines = ["Ag   -0.00000000    1.23456789e-05  2.0  0.5", "Au 3 -4.5 0.1", "C   -1e300  7.000000000000001   -0.3"]
+   geom_file = tmp_path / "mixed.xyz"
+   geom_file.write_text("3\ncomment\n" + "\n".join(lines) + "\n\n")
+
+   atoms, xyz = xyz_io.read_xyz(geom_file)
+   assert atoms == [line.split()[0] for line in lines]
+   assert xyz.flags.c_contiguous
+   assert xyz.T.tobytes() == np.array([[float(v) for v in line.split()[1:4]] for line in lines]).tobytes()
+
+   mol = molecule.molecule().read_geom(str(geom_file), False)
+   assert mol.nAtoms == 3 and mol.atoms == atoms and np.array_equal(mol.xyz_max, xyz.max(axis=1))
+
+   for body in ["4\n\n" + "\n".join(lines), "2\n\n" + "\n".join(lines), "3\n\nAg 0 0\nAg 0 0 0\nAg 0 0 0", "x\n\n"]:
+      geom_file.write_text(body + "\n")
+      with pytest.raises(ValueError):
+         xyz_io.read_xyz(geom_file)
+# -------------------------------------------------------------------------------------
+def test_geomb_round_trip_is_lossless(tmp_path):
+   """
+   Tests that the binary `.geomb` format keeps labels, coordinates and comment, and
+   that `molecule.read_geom` maps it from disk like the XYZ file it came from.
+   """
+
+   from geom.functions import geomb_io, output
+
+   xyz_file = os.path.join(test_folder_path, "sphere", "reference", "sphere_ag_r_20.0.xyz")
+   mol = molecule.molecule().read_geom(xyz_file, False)
+   atoms = mol.atoms
+   atoms[::7] = ["Au"] * len(atoms[::7])
+   mol.atoms = atoms
+
+   geomb_file = str(tmp_path / "sphere.geomb")
+   geomb_io.write_geomb(geomb_file, mol.atoms, mol.xyz, comment="round trip")
+
+   atoms, xyz, comment = geomb_io.read_geomb(geomb_file)
+   assert isinstance(xyz, np.memmap) and xyz.offset % geomb_io.ALIGNMENT == 0
+   assert atoms == mol.atoms and xyz.tobytes() == mol.xyz.tobytes() and comment == "round trip"
+
+   # Same molecule as from XYZ; copy-on-write leaves the file untouched
+   mol_b = molecule.molecule().read_geom(geomb_file, False)
+   assert np.array_equal(mol_b.xyz_center, mol.xyz_center) and np.array_equal(mol_b.xyz_max, mol.xyz_max)
+   mol_b.translate_geom(1.0, [1.0, 0.0, 0.0])
+   assert geomb_io.read_geomb(geomb_file)[1].tobytes() == mol.xyz.tobytes()
+
+   # XYZ written back from .geomb is byte-identical
+   with open(tmp_path / "a.xyz", "w") as f: output.write_geom_frame(f, mol)
+   with open(tmp_path / "b.xyz", "w") as f: output.write_geom_frame(f, molecule.molecule().set_geom(atoms, xyz))
+   assert filecmp.cmp(tmp_path / "a.xyz", tmp_path / "b.xyz", shallow=False)
+
+   geomb_io.write_geomb(geomb_file, mol.atoms, mol.xyz, precision="float32")
+   assert np.array_equal(geomb_io.read_geomb(geomb_file)[1], mol.xyz.astype(np.float32))
+
+   with open(geomb_file, "r+b") as f: f.truncate(os.path.getsize(geomb_file) - 1)
+   with pytest.raises(ValueError):
+      geomb_io.read_geomb(geomb_file)
+# -------------------------------------------------------------------------------------
+def test_block_xyz_writer_matches_per_atom_formatting(monkeypatch, tmp_path):
+   """
+   Tests that the block writer of `output.print_geom` gives the per-atom f-string text,
+   and that its precision and gzip/xz streams read back through `xyz_io`.
+   """
+
+   from geom.functions import output, xyz_io
+
+   monkeypatch.setattr(output, "WRITE_BLOCK", 7)
+   monkeypatch.chdir(tmp_path)
+   os.makedirs("results_geom")
+
+   xyz = np.random.default_rng(3).uniform(-50.0, 50.0, (3, 30))
+   xyz[:, 0] = [-0.0, 0.0, -1.0e-12]
+   mol = molecule.molecule().set_geom(["ag", "Au", "c", "XX"] * 7 + ["ag", "c"], xyz)
+
+   expected = f"{mol.nAtoms}\nGenerated with GEOM code\n" + "".join(
+      f"{atom.capitalize():2} {x:20.8f} {y:20.8f} {z:20.8f}\n" for atom, (x, y, z) in zip(mol.atoms, xyz.T))
+
+   output.print_geom(mol, "plain")
+   with open("results_geom/plain.xyz") as f: assert f.read() == expected
+
+   output.print_geom(mol, "short", decimals=3)
+   with open("results_geom/short.xyz") as f: assert f.read().splitlines()[2] == f"Ag {-0.0:15.3f} {0.0:15.3f} {-1.0e-12:15.3f}"
+
+   for compression, suffix in [("gzip", ".gz"), ("xz", ".xz")]:
+      output.print_geom(mol, "packed", compression=compression)
+      with xyz_io.open_xyz(f"results_geom/packed.xyz{suffix}") as f: assert f.read() == expected
+      assert xyz_io.read_xyz(f"results_geom/packed.xyz{suffix}")[1].tobytes() == xyz_io.read_xyz("results_geom/plain.xyz")[1].tobytes()
+# -------------------------------------------------------------------------------------
+def test_outputs_are_atomic_and_scratch_is_private(monkeypatch, tmp_path):
+   """
+   Tests that outputs only appear once complete, that failed writes leave nothing behind,
+   and that scratch directories are unique and created outside the package.
+   """
+
+   from geom.functions import output
+
+   monkeypatch.chdir(tmp_path)
+   general.create_results_geom()
+   general.create_results_geom()
+
+   mol = molecule.molecule().set_geom(["ag", "au"], np.arange(6.0).reshape(3, 2))
+
+   with output.open_geom_file("results_geom/done.xyz") as out_f:
+      output.write_geom_frame(out_f, mol)
+      assert not os.path.exists("results_geom/done.xyz")
+
+   with pytest.raises(RuntimeError):
+      with output.open_output("results_geom/failed.dat") as out_f:
+         out_f.write("partial\n")
+         raise RuntimeError
+
+   assert os.listdir("results_geom") == ["done.xyz"]
+   assert molecule.molecule().read_geom("results_geom/done.xyz", False).xyz.tolist() == mol.xyz.tolist()
+
+   monkeypatch.setenv("GEOM_SCRATCH", str(tmp_path))
+   scratch = [general.create_scratch_dir() for _ in range(2)]
+
+   assert scratch[0] != scratch[1]
+   assert all(os.path.dirname(folder) == str(tmp_path) and os.path.isdir(folder) for folder in scratch)
+# -------------------------------------------------------------------------------------
+def test_failed_scan_leaves_no_partial_file(monkeypatch, tmp_path):
+   """
+   Tests that a distance scan stopped by an error leaves no scan file, complete or partial.
+   """
+
+   import shutil
+   from geom.functions import tools
+
+   for name in ["doxorubicin.xyz", "sphere_r_10.0_center_0.0_0.0_0.0.xyz"]:
+      shutil.copy(os.path.join(test_folder_path, "control_distance", name), tmp_path)
+
+   monkeypatch.chdir(tmp_path)
+   with open("distances", "w") as f: f.write("5.0\n10.0\n")
+
+   monkeypatch.setattr(sys, "argv", ["dummy", "-t", "distances", "doxorubicin.xyz", "no", "sphere_r_10.0_center_0.0_0.0_0.0.xyz", "no", "+x", "verbose_no", "-scan"])
+   inp = input_class.input_class()
+   general.read_command_line(sys.argv, inp)
+
+   monkeypatch.setattr(tools, "calc_min_distance", lambda *args: 0.0)
+
+   with pytest.raises(SystemExit): translate.select_case(inp)
+
+   assert os.listdir("results_geom") == []
+# -------------------------------------------------------------------------------------
+def test_molecule_stores_atoms_as_element_codes():
+   """
+   Tests that atom labels live in the element-code column and `.atoms` stays a list view.
+   """
+
+   from types import SimpleNamespace
+   from geom.functions import tools
+
+   xyz = np.array([[0.0, 3.0, 6.0, 9.0], [0.0, 0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 0.0]])
+   mol = molecule.molecule().set_geom(["Ag", "Zz1", "ag", "Ag"], xyz)
+
+   assert mol.codes.dtype == molecule.ELEMENT_DTYPE and mol.atoms == ["Ag", "Zz1", "ag", "Ag"]
+   assert mol.codes[0] == mol.codes[3] != mol.codes[2]
+   assert [molecule.molecule().element_table()[c] for c in mol.codes] == mol.atoms
+   with pytest.raises(AttributeError):
+      mol.label = "not a slot"
+
+   inp = SimpleNamespace(merge_cutoff=1.0, verbose=False)
+   other = molecule.molecule().set_geom(["C", "H"], xyz[:, :2] + [[1.5], [0.0], [0.0]])
+   merged = tools.merge_geoms(inp, mol, other)
+   assert merged.atoms == ["Ag", "Zz1", "ag", "Ag", "C", "H"]
+   assert tools.subtract_geoms(inp, other, merged).atoms == ["Ag", "Zz1", "ag", "Ag"]
+
+   mol.keep_atoms(np.array([3, 1]), "Cu")
+   assert mol.atoms == ["Cu", "Cu"] and np.array_equal(mol.xyz[0], [9.0, 3.0])
+# -------------------------------------------------------------------------------------
+def test_center_and_bounds_are_cached_per_coordinate_version():
+   """
+   Tests that center and bounds follow translations, assignments and in-place edits.
+   """
+
+   rng = np.random.default_rng(7)
+   xyz = rng.uniform(-20.0, 20.0, (3, 500))
+   mol = molecule.molecule().set_geom(["Ag"] * 500, xyz)
+
+   center = mol.xyz_center
+   assert mol.xyz_center is center and not center.flags.writeable
+   assert np.array_equal(center, np.mean(xyz, axis=1))
+
+   mol.xyz_min
+   version = mol.version
+   mol.translate_geom(3.7, [0.0, 0.6, -0.8])
+   assert mol.version > version
+   for value, reduction in ((mol.xyz_min, np.min), (mol.xyz_max, np.max), (mol.xyz_center, np.mean)):
+      assert np.array_equal(value, reduction(mol.xyz, axis=1))
+
+   mol.trans_geom_center_to_000()
+   assert np.allclose(mol.xyz_center, 0.0, atol=1.0e-12)
+
+   mol.xyz[2, :] = -mol.xyz[2, :]
+   mol.mark_modified()
+   assert np.array_equal(mol.xyz_max, np.max(mol.xyz, axis=1))
+# -------------------------------------------------------------------------------------
+def test_affine_transforms_compose_and_apply_in_one_pass():
+   """
+   Tests composed, batched and in-place transforms against explicit formulas.
+   """
+
+   import math
+   from geom.classes.transform import transform, apply_all
+
+   rng = np.random.default_rng(3)
+   xyz = rng.uniform(-10.0, 10.0, (3, 200))
+
+   # Cartesian rotations reproduce the explicit formulas bit by bit
+   c, s = math.cos(math.radians(30.0)), math.sin(math.radians(30.0))
+   rotated = transform.rotation(30.0, '+y').apply(xyz)
+   assert np.array_equal(rotated[0], xyz[0] * c + xyz[2] * s)
+   assert np.array_equal(rotated[2], -xyz[0] * s + xyz[2] * c)
+   assert np.array_equal(rotated[1], xyz[1])
+
+   # Arbitrary axes, quaternions and composition agree
+   axis = np.array([1.0, 2.0, -0.5]) / np.linalg.norm([1.0, 2.0, -0.5])
+   half = math.radians(40.0) / 2.0
+   by_axis = transform.rotation(40.0, axis)
+   by_quaternion = transform.quaternion([math.cos(half), *(math.sin(half) * axis)])
+   assert np.allclose(by_axis.apply(xyz), by_quaternion.apply(xyz), atol=1.0e-12)
+
+   shift = transform.translation([1.0, -2.0, 3.0])
+   chain = by_axis.then(transform.reflection([0.0, 0.0, 1.0])).then(shift)
+   expected = by_axis.apply(xyz) * np.array([[1.0], [1.0], [-1.0]]) + np.array([[1.0], [-2.0], [3.0]])
+   assert np.allclose(chain.apply(xyz), expected, atol=1.0e-12)
+   assert np.allclose(chain.inverse().apply(chain.apply(xyz)), xyz, atol=1.0e-12)
+
+   # Batched application matches one-by-one application, also into a buffer
+   angles = [0.0, 45.0, 90.0, 275.0]
+   batch = apply_all([transform.rotation(a, 'z') for a in angles], xyz)
+   for k, angle in enumerate(angles):
+      assert np.array_equal(batch[k], transform.rotation(angle, 'z').apply(xyz))
+
+   buffer = xyz.copy()
+   assert transform.rotation(90.0, 'x').apply(buffer, out=buffer) is buffer
+   assert np.array_equal(buffer, transform.rotation(90.0, 'x').apply(xyz))
+# -------------------------------------------------------------------------------------
+def test_contact_shifts_hit_target_distances_along_any_direction():
+   """
+   Tests that the exact controlled-distance shifts reach the target minimum distances.
+   """
+
+   from geom.functions import tools
+
+   rng = np.random.default_rng(3)
+
+   mol_1 = molecule.molecule()
+   mol_1.xyz = rng.normal(size=(3, 250)) * 6.0
+   mol_1.nAtoms = 250
+
+   mol_2 = molecule.molecule()
+   mol_2.xyz = rng.normal(size=(3, 150)) * 4.0
+   mol_2.nAtoms = 150
+
+   distances = [2.0, 5.0, 10.0, 25.0]
+   xyz_ini = mol_2.xyz.copy()
+
+   for direction in [[1.0, 0.0, 0.0], [0.0, 0.0, -1.0], [1.0, 2.0, -0.5]]:
+      mol_2.xyz = xyz_ini.copy()
+      shifts = tools.calc_contact_shifts(mol_1, mol_2, direction, distances)
+
+      for distance, shift in zip(distances, shifts):
+         mol_2.xyz = xyz_ini.copy()
+         mol_2.translate_geom(shift, np.array(direction) / np.linalg.norm(direction))
+
+         assert tools.calc_min_distance(mol_1, mol_2) == pytest.approx(distance, abs=1e-9)
+
+         # Any further approach along the direction brings the geometries closer
+         mol_2.translate_geom(-1.0e-3, np.array(direction) / np.linalg.norm(direction))
+         assert tools.calc_min_distance(mol_1, mol_2) < distance
+# -------------------------------------------------------------------------------------
+def test_scan_commands_parse_processes_alike():
+   """
+   Tests that -rmin and -place accept -np at any position and reject bad values alike.
+   """
+
+   commands = [["dummy", "-rmin", "angles", "a.xyz", "b.xyz", "xy"],
+               ["dummy", "-place", "a.xyz", "b.xyz", "0,0,1", "0,0,1", "-5,5,11", "3.0"]]
+
+   for argv in commands:
+      for options, n_procs in [([], 1), (["-np", "4"], 4), (["-np", "3", "-cutoff", "4.0"], 3)]:
+         inp = input_class.input_class()
+         general.read_command_line(argv + options, inp)
+         assert inp.n_procs == n_procs
+
+      with pytest.raises(ValueError):
+         general.read_command_line(argv + ["-np", "four"], input_class.input_class())
+# -------------------------------------------------------------------------------------
 def move_input_geom(folder, geom_file, optional_file=None):
    """
    Moves the input geometry file into the scratch folder.
@@ -76,15 +721,15 @@ def move_managed_geom(folder, remove_optional_file=None):
        None: The function executes shell commands to move and remove files.
 
    Notes:
-       - Moves generated `.xyz` files from `results_geom` to the specified folder.
+       - Moves the generated files from `results_geom` to the specified folder.
        - Deletes temporary geometry files and the `results_geom` directory.
    """
 
    file_path = os.path.join(os.path.dirname(__file__))
    file_path_results = os.path.join(file_path, "results_geom")
-   file_path_results_xyz  = os.path.join(file_path_results, "*xyz")
+   file_path_results_all  = os.path.join(file_path_results, "*")
 
-   os.system(f'mv {file_path_results_xyz} {folder}')
+   os.system(f'mv {file_path_results_all} {folder}')
    os.system(f'rm -rf {file_path}/*xyz {file_path_results} ')
 
    if remove_optional_file: os.system(f'rm -rf {remove_optional_file}')
@@ -200,7 +845,9 @@ def test_create_sphere(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_rdkit_optimization(monkeypatch):
    """
@@ -217,7 +864,7 @@ def test_rdkit_optimization(monkeypatch):
        - Temporarily moves the input `.smi` file into the test directory.
        - Executes the optimization routine using the specified force field (e.g., MMFF94s).
        - Moves the generated files back to their managed location after execution.
-       - Compares the generated `.sdf` file with an expected reference file.
+       - Compares the generated `.sdf` structure with the reference after a rigid alignment.
    """
 
    # Test folder
@@ -245,8 +892,17 @@ def test_rdkit_optimization(monkeypatch):
 
    move_managed_geom(test_folder, remove_optional_file = rdkit_input_file)
    
-   # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated RDKit file does not match the expected output"
+   # Compare the generated structure with the reference: the optimized geometry must match
+   # after a rigid alignment, since the embedding frame depends on the RDKit version
+   from rdkit import Chem
+   from rdkit.Chem import rdMolAlign
+
+   generated = Chem.MolFromMolFile(generated_file, removeHs=False)
+   expected  = Chem.MolFromMolFile(expected_file, removeHs=False)
+   os.remove(generated_file)
+
+   assert Chem.MolToSmiles(generated) == Chem.MolToSmiles(expected), "Generated RDKit file does not match the expected output"
+   assert rdMolAlign.GetBestRMS(generated, expected) < 1e-3, "Generated RDKit file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_sphere_core_shell(monkeypatch):
    """
@@ -286,7 +942,9 @@ def test_create_sphere_core_shell(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_rod(monkeypatch):
    """
@@ -326,7 +984,9 @@ def test_create_rod(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_rod_core_shell(monkeypatch):
    """
@@ -366,7 +1026,9 @@ def test_create_rod_core_shell(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_tip(monkeypatch):
    """
@@ -406,7 +1068,9 @@ def test_create_tip(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_pyramid(monkeypatch):
    """
@@ -446,7 +1110,9 @@ def test_create_pyramid(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_cone(monkeypatch):
    """
@@ -486,7 +1152,9 @@ def test_create_cone(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_icosahedra(monkeypatch):
    """
@@ -526,7 +1194,9 @@ def test_create_icosahedra(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_cuboctahedra(monkeypatch):
    """
@@ -566,7 +1236,9 @@ def test_create_cuboctahedra(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_decahedra(monkeypatch):
    """
@@ -606,7 +1278,9 @@ def test_create_decahedra(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_microscope(monkeypatch):
    """
@@ -646,7 +1320,9 @@ def test_create_microscope(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_graphene_ribbon(monkeypatch):
    """
@@ -686,7 +1362,9 @@ def test_create_graphene_ribbon(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_graphene_disk(monkeypatch):
    """
@@ -726,7 +1404,9 @@ def test_create_graphene_disk(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_graphene_ring(monkeypatch):
    """
@@ -766,7 +1446,9 @@ def test_create_graphene_ring(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_graphene_triangle_armchair(monkeypatch):
    """
@@ -806,7 +1488,9 @@ def test_create_graphene_triangle_armchair(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_graphene_triangle_zigzag(monkeypatch):
    """
@@ -846,7 +1530,9 @@ def test_create_graphene_triangle_zigzag(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_specular_geometry(monkeypatch):
    """
@@ -889,8 +1575,11 @@ def test_specular_geometry(monkeypatch):
 
    move_managed_geom(test_folder)
    
-   # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   # Compare the generated file with the reference (the centered input is written too)
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   os.remove(f"{test_folder}/{inp.geom_file[:-4]}_000.xyz")
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_controlled_distance(monkeypatch):
    """
@@ -937,7 +1626,65 @@ def test_controlled_distance(monkeypatch):
    move_managed_geom(test_folder, remove_optional_file = distances_input)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
+# -------------------------------------------------------------------------------------
+def test_controlled_distance_scan(monkeypatch):
+   """
+   Tests that a distance scan writes every distance as a frame of one multi-frame XYZ file.
+
+   Args:
+       monkeypatch (pytest.MonkeyPatch): A fixture to modify `sys.argv` for command-line argument simulation.
+
+   Returns:
+       None: Uses assertions to verify the frames of the generated `.xyz` file.
+
+   Notes:
+       - Uses the same geometries as `test_controlled_distance`, scanning three distances.
+       - The 10 Å frame must match the single-distance reference file.
+   """
+
+   # Test folder
+   test_folder      = 'control_distance'
+   xyz_input_file_1 = 'doxorubicin.xyz'
+   xyz_input_file_2 = 'sphere_r_10.0_center_0.0_0.0_0.0.xyz'
+   distances_input  = 'scan_distances_input'
+
+   with open(distances_input, 'w') as f: f.write('5.0\n10.0\n15.0\n')
+
+   # Mock sys.argv to simulate the command line input
+   mock_args = ["dummy", "-t", distances_input, "doxorubicin.xyz", "no", "sphere_r_10.0_center_0.0_0.0_0.0.xyz", "no", "+x", "verbose_no", "-scan"]
+   monkeypatch.setattr(sys, "argv", mock_args)
+   
+   # Manually create and populate the input class
+   inp = input_class.input_class()
+   general.read_command_line(sys.argv, inp)
+
+   # Temporaly move input file
+   move_input_geom(test_folder,xyz_input_file_1)
+   move_input_geom(test_folder,xyz_input_file_2)
+
+   # Translate controlled distances
+   translate.select_case(inp)
+
+   # Define the expected and actual output files
+   expected_file = os.path.join(os.path.dirname(__file__), test_folder, "reference", "sphere_r_10.0_center_0.0_0.0_0.0_+x_d_10.00.xyz")
+   generated_file = f"{test_folder}/sphere_r_10.0_center_0.0_0.0_0.0_+x_scan.xyz"
+
+   move_managed_geom(test_folder, remove_optional_file = distances_input)
+
+   with open(generated_file) as f: lines = f.read().splitlines()
+   with open(expected_file) as f: expected = f.read().splitlines()
+
+   n_atoms = int(lines[0])
+   frames = [lines[i:i + n_atoms + 2] for i in range(0, len(lines), n_atoms + 2)]
+
+   os.remove(generated_file)
+
+   assert len(frames) == 3
+   assert [frame[1].split()[2] for frame in frames] == ['5.00000000', '10.00000000', '15.00000000']
+   assert frames[1][2:] == expected[2:]
 # -------------------------------------------------------------------------------------
 def test_controlled_rotation(monkeypatch):
    """
@@ -982,7 +1729,165 @@ def test_controlled_rotation(monkeypatch):
    move_managed_geom(test_folder, remove_optional_file = angles_input)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
+# -------------------------------------------------------------------------------------
+def test_controlled_rotation_scan(monkeypatch):
+   """
+   Tests that an angle scan writes every angle as a frame of one multi-frame XYZ file,
+   read back lazily by `molecule.read_frames`.
+
+   Args:
+       monkeypatch (pytest.MonkeyPatch): A fixture to modify `sys.argv`.
+
+   Returns:
+       None: Uses assertions to verify the frames of the generated `.xyz` file.
+
+   Notes:
+       - The 90 degree frame must match the single-rotation reference file.
+       - Appending to the scan file adds frames after the existing ones.
+   """
+
+   from geom.functions import output
+
+   # Test folder
+   test_folder    = 'control_rotation'
+   xyz_input_file = 'doxorubicin.xyz'
+   angles_input   = 'scan_angles_input'
+
+   with open(angles_input, 'w') as f: f.write('45.0\n90.0\n180.0\n')
+
+   # Mock sys.argv to simulate the command line input
+   mock_args = ["dummy", "-r", angles_input, "doxorubicin.xyz", "no", "+x", "-scan"]
+   monkeypatch.setattr(sys, "argv", mock_args)
+
+   # Manually create and populate the input class
+   inp = input_class.input_class()
+   general.read_command_line(sys.argv, inp)
+
+   # Temporaly move input file
+   move_input_geom(test_folder,xyz_input_file)
+
+   # Rotate over all angles
+   rotate.select_case(inp)
+
+   # Append the input geometry as a fourth frame
+   with output.open_geom_trajectory("doxorubicin_+x_scan", append=True) as f:
+      output.write_geom_frame(f, molecule.molecule().read_geom(xyz_input_file, False))
+
+   # Define the expected and actual output files
+   expected_file = os.path.join(os.path.dirname(__file__), test_folder, "reference", "doxorubicin_+x_degree_90.0.xyz")
+   generated_file = f"{test_folder}/doxorubicin_+x_scan.xyz"
+
+   move_managed_geom(test_folder, remove_optional_file = angles_input)
+
+   frames = list(molecule.molecule.read_frames(generated_file))
+   expected = molecule.molecule().read_geom(expected_file, False)
+   source = molecule.molecule().read_geom(f"{test_folder}/{xyz_input_file}", False)
+
+   with open(generated_file) as f: comments = [line for line in f if line.startswith('angle')]
+
+   os.remove(generated_file)
+
+   assert len(frames) == 4
+   assert comments == ['angle = 45.0 degree ; axis = +x\n', 'angle = 90.0 degree ; axis = +x\n', 'angle = 180.0 degree ; axis = +x\n']
+   assert frames[1].atoms == expected.atoms and np.array_equal(frames[1].xyz, expected.xyz)
+   assert frames[3].atoms == source.atoms and np.array_equal(frames[3].xyz, source.xyz)
+# -------------------------------------------------------------------------------------
+def test_batched_rotation_scan_about_a_vector_axis(monkeypatch):
+   """
+   Tests a scan about an arbitrary axis, split in several batches of rotations.
+   """
+
+   from geom.classes import parameters, transform
+
+   # Test folder
+   test_folder    = 'control_rotation'
+   xyz_input_file = 'doxorubicin.xyz'
+   angles_input   = 'vector_angles_input'
+   angles         = [10.0, 135.0, 200.0, 330.0, 359.0]
+
+   with open(angles_input, 'w') as f: f.write(''.join(f'{angle}\n' for angle in angles))
+
+   # Two rotated frames per batch
+   source = molecule.molecule().read_geom(os.path.join(os.path.dirname(__file__), test_folder, xyz_input_file), False)
+
+   class small_batches(parameters.parameters):
+      def __init__(self):
+         super().__init__()
+         self.transform_batch_size = 2 * source.nAtoms
+
+   monkeypatch.setattr(rotate.parameters, "parameters", small_batches)
+
+   mock_args = ["dummy", "-r", angles_input, xyz_input_file, "no", "1,-1,2", "-scan"]
+   monkeypatch.setattr(sys, "argv", mock_args)
+
+   inp = input_class.input_class()
+   general.read_command_line(sys.argv, inp)
+
+   move_input_geom(test_folder, xyz_input_file)
+   rotate.select_case(inp)
+
+   generated_file = f"{test_folder}/doxorubicin_1,-1,2_scan.xyz"
+   move_managed_geom(test_folder, remove_optional_file = angles_input)
+
+   frames = list(molecule.molecule.read_frames(generated_file))
+   os.remove(generated_file)
+
+   axis = np.array([1.0, -1.0, 2.0])
+   assert len(frames) == len(angles)
+   for frame, angle in zip(frames, angles):
+      expected = transform.transform.rotation(angle, axis).apply(source.xyz)
+      assert frame.atoms == source.atoms and np.allclose(frame.xyz, expected, atol=1.0e-8)
+# -------------------------------------------------------------------------------------
+def test_orientation_scan_matches_rotate_and_min_distance():
+   """
+   Tests the parallel orientation scan against one rotation and one minimum distance per angle.
+   """
+
+   from geom.functions import tools
+
+   source = os.path.join(os.path.dirname(__file__), 'control_rotation', 'doxorubicin.xyz')
+   mol_1 = molecule.molecule().read_geom(source, False)
+   mol_2 = molecule.molecule().read_geom(source, False).translate_geom(18.0, [0.0, 0.6, 0.8])
+
+   angles = [0.0, 60.0, 150.0, 270.0]
+   grid, orientations = tools.orientation_grid(angles, 'zx', mol_2.xyz_center)
+   distances = tools.calc_orientation_min_distances(mol_1, mol_2, orientations, n_procs=2)
+
+   assert grid.shape == (16, 2) and np.array_equal(grid[5], [60.0, 60.0])
+
+   center = mol_2.xyz_center.copy()
+   for (angle_z, angle_x), distance in zip(grid, distances):
+      mol_rot = molecule.molecule().set_geom(mol_2.atoms, mol_2.xyz - center[:, np.newaxis])
+      mol_rot = tools.rotate(mol_rot, angle_z, '+z', mol_rot)
+      mol_rot = tools.rotate(mol_rot, angle_x, '+x', mol_rot)
+      mol_rot.translate_geom(1.0, center)
+      assert distance == pytest.approx(tools.calc_min_distance(mol_1, mol_rot), abs=1.0e-10)
+# -------------------------------------------------------------------------------------
+def test_placement_map_matches_translate_and_min_distance():
+   """
+   Tests the placement grid search against one translation and one distance query per displacement.
+   """
+
+   from geom.functions import tools
+
+   source = os.path.join(os.path.dirname(__file__), 'control_rotation', 'doxorubicin.xyz')
+   mol_1 = molecule.molecule().read_geom(source, False)
+   mol_2 = molecule.molecule().read_geom(source, False).translate_geom(15.0, [1.0, 0.0, 0.0])
+
+   grid = np.array(np.meshgrid([-12.0, -6.0, 0.0], [-3.0, 0.0, 4.0], [0.0, 2.5], indexing='ij')).reshape(3, -1).T
+   distances, contacts = tools.calc_placement_map(mol_1, mol_2, grid, 2.5, n_procs=2)
+
+   for shift, distance, n_contacts in zip(grid, distances, contacts):
+      probe = molecule.molecule().set_geom(mol_2.atoms, mol_2.xyz).translate_geom(1.0, shift)
+      assert distance == tools.calc_min_distance(mol_1, probe)
+      assert n_contacts == np.count_nonzero(mol_1.get_spatial_index().any_within(probe.xyz, 2.5))
+
+   best = tools.best_placements(distances, 3.0, n_best=3)
+   assert np.all(np.diff(np.abs(distances[best] - 3.0)) >= 0.0)
+   assert np.abs(distances[best[0]] - 3.0) == np.min(np.abs(distances - 3.0))
 # -------------------------------------------------------------------------------------
 def test_create_dimer(monkeypatch):
    """
@@ -1023,7 +1928,9 @@ def test_create_dimer(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
 # -------------------------------------------------------------------------------------
 def test_create_bowtie(monkeypatch):
    """
@@ -1064,5 +1971,25 @@ def test_create_bowtie(monkeypatch):
    move_created_geom(test_folder)
    
    # Compare the generated file with the reference
-   assert filecmp.cmp(generated_file, expected_file, shallow=False), "Generated XYZ file does not match the expected output"
+   matches = filecmp.cmp(generated_file, expected_file, shallow=False)
+   os.remove(generated_file)
+   assert matches, "Generated XYZ file does not match the expected output"
+# -------------------------------------------------------------------------------------
+def test_bowtie_is_assembled_in_memory(monkeypatch, tmp_path):
+   """
+   Tests that a bowtie writes only its final structure, with no intermediate files.
+   """
+
+   monkeypatch.chdir(tmp_path)
+   monkeypatch.setattr(sys, "argv", ["dummy", "-create", "-cone", "ag", "30.0", "40.0", "-bowtie", "10.0"])
+
+   inp = input_class.input_class()
+   general.read_command_line(sys.argv, inp)
+   create_geom.select_case(inp)
+
+   expected_file = os.path.join(os.path.dirname(__file__), "bowtie", "reference", "bowtie_cone_ag_radius-40.0_zmin-0.0_zmax-30.0_-z_d_10.0.xyz")
+
+   assert os.listdir(tmp_path) == ["results_geom"]
+   assert os.listdir(tmp_path / "results_geom") == [os.path.basename(expected_file)]
+   assert filecmp.cmp(tmp_path / "results_geom" / os.path.basename(expected_file), expected_file, shallow=False)
 # -------------------------------------------------------------------------------------